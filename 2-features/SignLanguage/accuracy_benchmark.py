@@ -0,0 +1,362 @@
+"""
+Accuracy versus speed of the server's processing settings.
+
+Runs recorded clips through the same per-session pipeline the server uses
+(HolisticSessionPipeline: scaling, region of interest cropping, the model)
+under a grid of settings:
+
+    complexity  model complexity (0 = performance mode, 1)
+    width       processing width
+    roi         region of interest cropping off / on
+    refine      hand refinement on full-resolution wrist crops off / on
+    skip        infer every Nth frame and extrapolate the others, as the
+                server's frame skipping does
+
+Every run is compared with a reference run of the same clips at full
+resolution, without cropping or skipping, using the most accurate model
+(complexity 1, or 2 with --reference-complexity 2 - MediaPipe downloads
+the heavy pose model on first use). Reported per setting:
+
+    hand_error / pose_error / face_error
+                     mean distance of matched landmarks from the reference,
+                     in percent of the frame width (pose: landmarks the
+                     reference sees with visibility >= 0.5)
+    hand_recall      share of the reference's hand detections also found
+    hand_false_rate  share of frames without a reference hand where one was found
+    pose_recall      same as hand_recall, for the pose
+    fps, ms_p50/p90  pipeline throughput and per-frame time (decoding excluded)
+    quality_error_correlation
+                     Pearson correlation of assess_detection_quality() with
+                     the per-frame error; strongly negative means the score
+                     is a usable proxy for accuracy
+
+The fastest setting within --max-hand-error and --min-hand-recall is
+reported as the recommendation.
+
+Usage:
+    python accuracy_benchmark.py clips/ [--complexity 0,1] [--widths 320,480,640,960]
+        [--roi off,on] [--refine off,on] [--skip 1,2,3] [--max-frames 300] [--json] [--output results.json]
+"""
+import argparse
+import itertools
+import json
+import logging
+import time
+
+import numpy as np
+
+from batch_landmarks import find_videos
+from landmark_protocol import COMPONENT_SLICES, COMPONENTS, FLAG_PREDICTED
+from mediapipe_webrtc_server import (
+    HolisticLandmarksTracker, HolisticSessionPipeline, I420Frame, LANDMARK_COMPONENTS, mp, parse_components
+)
+
+logger = logging.getLogger("HolisticAccuracy")
+
+# Presence columns, in landmark_protocol order
+FACE, POSE, LEFT_HAND, RIGHT_HAND = range(len(COMPONENTS))
+HANDS = (LEFT_HAND, RIGHT_HAND)
+
+# Reference pose landmarks below this visibility are not scored
+MIN_VISIBILITY = 0.5
+
+
+class Clip:
+    """Decoded frames of one video, kept in memory so every setting sees the same input"""
+
+    def __init__(self, path, max_frames=0):
+        import av
+
+        self.path = path
+        self.frames = []
+        with av.open(path) as container:
+            stream = container.streams.video[0]
+            fps = float(stream.average_rate) if stream.average_rate else 30.0
+            for index, frame in enumerate(container.decode(stream)):
+                planes = I420Frame.from_av(frame)
+                # Copies, so the decoder's buffers can be released
+                copy = I420Frame(planes.y.copy(), planes.u.copy(), planes.v.copy())
+                self.frames.append((copy, frame.time if frame.time is not None else index / fps))
+                if max_frames and len(self.frames) >= max_frames:
+                    break
+        if not self.frames:
+            raise ValueError(f"No video frames in {path}")
+        self.width, self.height = self.frames[0][0].width, self.frames[0][0].height
+
+
+def processing_options(clip, setting, components):
+    """The per-frame options HolisticVideoTrack would hand the pipeline for this setting"""
+    should_scale = setting['width'] < clip.width
+    if should_scale:
+        size = (setting['width'], max(2, int(clip.height * setting['width'] / clip.width) // 2 * 2))
+    else:
+        size = (clip.width, clip.height)
+    return {
+        'render': False,
+        'roi': setting['roi'],
+        'hand_refinement': setting.get('refine', False),
+        'motion_gating': False,
+        'components': components,
+        'should_scale': should_scale,
+        'processing_size': size,
+        'original_size': (clip.width, clip.height)
+    }
+
+
+def run_setting(clip, setting, components=LANDMARK_COMPONENTS):
+    """
+    Run one clip under one setting.
+
+    Returns:
+        tuple: (landmark arrays as in HolisticLandmarksTracker.get_window(),
+            per-frame processing times in seconds)
+    """
+    complexity = setting['complexity']
+    pipeline = HolisticSessionPipeline(performance_mode=complexity == 0, components=components,
+                                       hand_refinement=setting.get('refine', False))
+    pooled_model = pipeline.holistic_model
+    if complexity >= 2:
+        # Not something the server runs; only built for the reference
+        pipeline.holistic_model = mp.solutions.holistic.Holistic(
+            static_image_mode=False, model_complexity=complexity, smooth_landmarks=True,
+            min_detection_confidence=0.5, min_tracking_confidence=0.5
+        )
+    options = processing_options(clip, setting, components)
+    tracker = HolisticLandmarksTracker(history_size=len(clip.frames))
+    times = []
+    try:
+        for index, (frame, timestamp) in enumerate(clip.frames):
+            started = time.perf_counter()
+            predicted = None
+            if setting['skip'] > 1 and index % setting['skip']:
+                predicted = tracker.predict_landmarks(timestamp)
+            if predicted is None:
+                output = pipeline.process(frame, options)
+                results, quality_score, flags = output['results'], output['quality_score'], 0
+            else:
+                results = predicted
+                quality_score = HolisticLandmarksTracker.assess_detection_quality(predicted)
+                flags = FLAG_PREDICTED
+            times.append(time.perf_counter() - started)
+            tracker.add_landmarks(results, quality_score, timestamp=timestamp, flags=flags)
+    finally:
+        if pipeline.holistic_model is not pooled_model:
+            pipeline.holistic_model.close()
+            pipeline.holistic_model = pooled_model
+        pipeline.close()
+    return {key: value.copy() for key, value in tracker.get_window().items()}, times
+
+
+class Comparison:
+    """Running totals of a setting's differences from the reference, over all clips"""
+
+    def __init__(self):
+        self.errors = {'face': [0.0, 0], 'pose': [0.0, 0], 'hand': [0.0, 0]}
+        self.hands_in_reference = 0
+        self.hands_found = 0
+        self.hand_free_slots = 0
+        self.false_hands = 0
+        self.poses_in_reference = 0
+        self.poses_found = 0
+        self.frame_errors = []
+        self.quality_scores = []
+        self.times = []
+
+    def add(self, clip, reference, run, times):
+        ref_presence, run_presence = reference['presence'], run['presence']
+        # Landmark offsets in percent of the frame width
+        offset = (run['landmarks'][..., :2] - reference['landmarks'][..., :2]) * [clip.width, clip.height]
+        distance = np.linalg.norm(offset, axis=-1) / clip.width * 100
+        frame_error = np.zeros(len(distance))
+        frame_count = np.zeros(len(distance))
+
+        for name, bit, key in (('face_landmarks', FACE, 'face'), ('pose_landmarks', POSE, 'pose'),
+                               ('left_hand_landmarks', LEFT_HAND, 'hand'),
+                               ('right_hand_landmarks', RIGHT_HAND, 'hand')):
+            rows = COMPONENT_SLICES[name]
+            both = ref_presence[:, bit] & run_presence[:, bit]
+            scored = np.broadcast_to(both[:, None], distance[:, rows].shape)
+            if bit == POSE:
+                scored = scored & (reference['landmarks'][:, rows, 3] >= MIN_VISIBILITY)
+            component_distance = np.where(scored, distance[:, rows], 0.0)
+            self.errors[key][0] += float(component_distance.sum())
+            self.errors[key][1] += int(scored.sum())
+            if bit != FACE:
+                counted = scored.sum(axis=1)
+                frame_error += component_distance.sum(axis=1)
+                frame_count += counted
+
+        for bit in HANDS:
+            self.hands_in_reference += int(ref_presence[:, bit].sum())
+            self.hands_found += int((ref_presence[:, bit] & run_presence[:, bit]).sum())
+            self.hand_free_slots += int((~ref_presence[:, bit]).sum())
+            self.false_hands += int((~ref_presence[:, bit] & run_presence[:, bit]).sum())
+        self.poses_in_reference += int(ref_presence[:, POSE].sum())
+        self.poses_found += int((ref_presence[:, POSE] & run_presence[:, POSE]).sum())
+
+        scored_frames = frame_count > 0
+        self.frame_errors.extend((frame_error[scored_frames] / frame_count[scored_frames]).tolist())
+        self.quality_scores.extend(run['quality_scores'][scored_frames].tolist())
+        self.times.extend(times)
+
+    def summary(self):
+        def mean_error(key):
+            total, count = self.errors[key]
+            return total / count if count else None
+
+        def ratio(numerator, denominator):
+            return numerator / denominator if denominator else None
+
+        correlation = None
+        if len(self.frame_errors) > 2 and np.std(self.frame_errors) > 0 and np.std(self.quality_scores) > 0:
+            correlation = float(np.corrcoef(self.quality_scores, self.frame_errors)[0, 1])
+        total_time = sum(self.times)
+        return {
+            'hand_error': mean_error('hand'),
+            'pose_error': mean_error('pose'),
+            'face_error': mean_error('face'),
+            'hand_recall': ratio(self.hands_found, self.hands_in_reference),
+            'hand_false_rate': ratio(self.false_hands, self.hand_free_slots),
+            'pose_recall': ratio(self.poses_found, self.poses_in_reference),
+            'fps': len(self.times) / total_time if total_time else None,
+            'ms_p50': float(np.percentile(self.times, 50)) * 1000 if self.times else None,
+            'ms_p90': float(np.percentile(self.times, 90)) * 1000 if self.times else None,
+            'quality_score': float(np.mean(self.quality_scores)) if self.quality_scores else None,
+            'quality_error_correlation': correlation
+        }
+
+
+def evaluate(clips, settings, reference_complexity=1, components=LANDMARK_COMPONENTS):
+    """
+    Run every setting over every clip and compare it with the reference.
+
+    Returns:
+        tuple: (reference summary, list of setting dicts with their summary merged in)
+    """
+    references = []
+    reference_comparison = Comparison()
+    for clip in clips:
+        reference_setting = {'complexity': reference_complexity, 'width': clip.width, 'roi': False, 'refine': False,
+                             'skip': 1}
+        arrays, times = run_setting(clip, reference_setting, components)
+        references.append(arrays)
+        reference_comparison.add(clip, arrays, arrays, times)
+        logger.info(f"Reference for {clip.path}: {len(times)} frames at {len(times) / sum(times):.1f} fps")
+
+    results = []
+    for setting in settings:
+        comparison = Comparison()
+        for clip, reference in zip(clips, references):
+            arrays, times = run_setting(clip, setting, components)
+            comparison.add(clip, reference, arrays, times)
+        results.append(dict(setting, **comparison.summary()))
+        logger.info(f"{format_setting(setting)}: {results[-1]['fps']:.1f} fps")
+    reference = reference_comparison.summary()
+    return {
+        'complexity': reference_complexity,
+        'fps': reference['fps'],
+        'ms_p50': reference['ms_p50'],
+        'hands': reference_comparison.hands_in_reference,
+        'poses': reference_comparison.poses_in_reference,
+        'frames': len(reference_comparison.times)
+    }, results
+
+
+def recommend(results, max_hand_error, min_hand_recall):
+    """The fastest setting that stays within the accuracy limits, or None"""
+    acceptable = [
+        result for result in results
+        if (result['hand_error'] is None or result['hand_error'] <= max_hand_error)
+        and (result['hand_recall'] is None or result['hand_recall'] >= min_hand_recall)
+        and result['fps'] is not None
+    ]
+    return max(acceptable, key=lambda result: result['fps'], default=None)
+
+
+def format_setting(setting):
+    return (f"complexity {setting['complexity']}, width {setting['width']}, "
+            f"roi {'on' if setting['roi'] else 'off'}, refine {'on' if setting['refine'] else 'off'}, "
+            f"skip {setting['skip']}")
+
+
+def _int_list(value):
+    return [int(part) for part in value.split(",") if part]
+
+
+def _switch_list(value):
+    switches = {"on": True, "off": False}
+    try:
+        return [switches[part] for part in value.split(",") if part]
+    except KeyError as e:
+        raise argparse.ArgumentTypeError(f"Expected on/off, got {e.args[0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare processing settings against a reference run")
+    parser.add_argument("inputs", nargs="+", help="Video files or directories")
+    parser.add_argument("--complexity", type=_int_list, default=[0, 1], help="Model complexities to try")
+    parser.add_argument("--widths", type=_int_list, default=[320, 480, 640, 960], help="Processing widths to try")
+    parser.add_argument("--roi", type=_switch_list, default=[False, True], help="Region of interest cropping: off,on")
+    parser.add_argument("--refine", type=_switch_list, default=[False],
+                        help="Hand refinement on full-resolution crops: off,on")
+    parser.add_argument("--skip", type=_int_list, default=[1, 2, 3], help="Frame skip factors to try")
+    parser.add_argument("--reference-complexity", type=int, choices=(1, 2), default=1,
+                        help="Model complexity of the reference run")
+    parser.add_argument("--components", default=None,
+                        help="Comma separated subset of face,pose,hands (default: all)")
+    parser.add_argument("--max-frames", type=int, default=300, help="Frames used per clip (0 = all)")
+    parser.add_argument("--max-hand-error", type=float, default=1.5,
+                        help="Hand error limit for the recommendation, percent of the frame width")
+    parser.add_argument("--min-hand-recall", type=float, default=0.9,
+                        help="Hand recall limit for the recommendation")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    parser.add_argument("--output", default=None, help="Also write the JSON results to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logging.getLogger("HolisticSignLanguage").setLevel(logging.WARNING)
+    clips = [Clip(path, args.max_frames) for path, _ in find_videos(args.inputs)]
+    if not clips:
+        parser.error("No videos found")
+    settings = [
+        {'complexity': complexity, 'width': width, 'roi': roi, 'refine': refine, 'skip': skip}
+        for complexity, width, roi, refine, skip in itertools.product(
+            args.complexity, args.widths, args.roi, args.refine, args.skip
+        )
+    ]
+    reference, results = evaluate(clips, settings, args.reference_complexity, parse_components(args.components))
+    best = recommend(results, args.max_hand_error, args.min_hand_recall)
+    report = {
+        'clips': [{'path': clip.path, 'frames': len(clip.frames), 'width': clip.width, 'height': clip.height}
+                  for clip in clips],
+        'reference': reference,
+        'results': results,
+        'recommended': best
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    def show(value, pattern):
+        return pattern.format(value) if value is not None else "-".rjust(len(pattern.format(0)))
+
+    print(f"{len(clips)} clip(s), {reference['frames']} frames; reference complexity {reference['complexity']} "
+          f"at full resolution: {reference['fps']:.1f} fps, {reference['hands']} hands, {reference['poses']} poses")
+    print("cplx width roi ref skip    fps  ms_p90  hand_err  pose_err  hand_rec  hand_fp  q~err")
+    for result in sorted(results, key=lambda result: -(result['fps'] or 0)):
+        print(f"{result['complexity']:4d} {result['width']:5d} {'on' if result['roi'] else 'off':>3s} "
+              f"{'on' if result['refine'] else 'off':>3s} {result['skip']:4d} {show(result['fps'], '{:6.1f}')} {show(result['ms_p90'], '{:7.1f}')} "
+              f"{show(result['hand_error'], '{:9.2f}')} {show(result['pose_error'], '{:9.2f}')} "
+              f"{show(result['hand_recall'], '{:9.2f}')} {show(result['hand_false_rate'], '{:8.2f}')} "
+              f"{show(result['quality_error_correlation'], '{:6.2f}')}")
+    if best is not None:
+        print(f"Recommended: {format_setting(best)} ({best['fps']:.1f} fps)")
+    else:
+        print("No setting meets the accuracy limits")
+
+
+if __name__ == "__main__":
+    main()
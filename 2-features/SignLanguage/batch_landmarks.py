@@ -0,0 +1,283 @@
+"""
+Offline landmark extraction for recorded sign language videos.
+
+Decodes video files with PyAV, runs them through the same MediaPipe
+configuration as the live server (create_holistic_model) on a pool of worker
+processes, one model per worker, and writes one .npz file of landmark arrays
+per video:
+
+    landmarks       (T, TOTAL_LANDMARKS, 4) float32 x, y, z, visibility in
+                    landmark_protocol component order (face, pose, left
+                    hand, right hand); zeros where a component is missing
+    presence        (T, 4) bool, one column per component
+    timestamps      (T,) float64 presentation time in seconds
+    frame_ids       (T,) int64 decode index
+    quality_scores  (T,) float64 HolisticLandmarksTracker quality score
+    metadata        JSON string: source, fps, size, model settings
+
+Frames are collected in a HolisticLandmarksTracker, so the arrays have
+exactly the layout the live server keeps in its history.
+
+Outputs are written atomically, and videos whose output already exists are
+skipped, so an interrupted run resumes where it stopped. Every finished or
+failed video is appended to batch_manifest.jsonl in the output directory.
+
+Usage:
+    python batch_landmarks.py videos/ --output landmarks/ [--workers 8]
+        [--max-width 640] [--complexity 0] [--components hands,pose]
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from mediapipe_webrtc_server import (
+    HolisticLandmarksTracker, HolisticResult, LANDMARK_COMPONENTS, _model_pool, parse_components
+)
+
+logger = logging.getLogger("HolisticBatch")
+
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".avi", ".mkv", ".webm", ".m4v")
+MANIFEST_NAME = "batch_manifest.jsonl"
+
+# Frames collected in the tracker before they are copied out
+CHUNK_FRAMES = 512
+
+
+def find_videos(inputs):
+    """
+    Expand files and directories into (video path, output name) pairs.
+
+    Videos found under a directory keep their path relative to it, so
+    archives with the same file name in different folders do not collide.
+    """
+    videos = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.lower().endswith(VIDEO_EXTENSIONS):
+                        full_path = os.path.join(root, name)
+                        videos.append((full_path, os.path.relpath(full_path, path)))
+        else:
+            videos.append((path, os.path.basename(path)))
+    return videos
+
+
+def output_path(output_dir, relative_name):
+    return os.path.join(output_dir, os.path.splitext(relative_name)[0] + ".npz")
+
+
+def extract_landmarks(source, model, components=LANDMARK_COMPONENTS, max_width=0):
+    """
+    Run a model over every frame of a video.
+
+    Args:
+        source: Path of the video file
+        model: Model from create_holistic_model (or the model pool)
+        components: Components to keep, see parse_components()
+        max_width: Downscale wider frames to this width before inference (0 = never)
+
+    Returns:
+        tuple: (dict of landmark arrays, metadata dict)
+    """
+    import av
+
+    tracker = HolisticLandmarksTracker(history_size=CHUNK_FRAMES)
+    chunks = []
+    with av.open(source) as container:
+        stream = container.streams.video[0]
+        stream.thread_type = "AUTO"
+        fps = float(stream.average_rate) if stream.average_rate else 0.0
+        width, height = stream.codec_context.width, stream.codec_context.height
+        size = {}
+        if max_width and width > max_width:
+            # Let swscale resize and convert to RGB in a single pass
+            size = {'width': max_width, 'height': int(height * max_width / width) // 2 * 2}
+
+        for index, frame in enumerate(container.decode(stream)):
+            rgb = frame.to_ndarray(format="rgb24", **size)
+            results = HolisticResult.from_mediapipe(model.process(rgb), components)
+            timestamp = frame.time if frame.time is not None else (index / fps if fps else float(index))
+            tracker.add_landmarks(
+                results, HolisticLandmarksTracker.assess_detection_quality(results), timestamp=timestamp
+            )
+            if tracker.frame_counter % CHUNK_FRAMES == 0:
+                chunks.append({key: value.copy() for key, value in tracker.get_window().items()})
+
+    remainder = tracker.frame_counter % CHUNK_FRAMES
+    if remainder:
+        chunks.append({key: value.copy() for key, value in tracker.get_window(remainder).items()})
+
+    keys = ('landmarks', 'presence', 'timestamps', 'frame_ids', 'quality_scores')
+    if chunks:
+        arrays = {key: np.concatenate([chunk[key] for chunk in chunks]) for key in keys}
+    else:
+        empty = HolisticLandmarksTracker(history_size=1).get_window(0)
+        arrays = {key: empty[key].copy() for key in keys}
+    metadata = {
+        'source': os.path.abspath(source),
+        'fps': fps,
+        'width': width,
+        'height': height,
+        'processed_width': size.get('width', width),
+        'frames': int(tracker.frame_counter),
+        'duration_s': tracker.frame_counter / fps if fps else None
+    }
+    return arrays, metadata
+
+
+def save_landmarks(path, arrays, metadata):
+    """Write the arrays to path through a temporary file, so a crash never leaves a partial output"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as output:
+        np.savez(output, metadata=np.array(json.dumps(metadata)), **arrays)
+    os.replace(temporary, path)
+
+
+def _init_worker(performance_mode, components):
+    """Process pool initializer: build and warm this worker's model"""
+    _model_pool.warm(1, performance_mode=performance_mode, components=components)
+
+
+def _process_video(source, destination, performance_mode, components, max_width):
+    """Worker entry point: extract and save one video, returning its statistics"""
+    started = time.perf_counter()
+    model = _model_pool.checkout(None, performance_mode, components)
+    try:
+        arrays, metadata = extract_landmarks(source, model, components, max_width)
+    finally:
+        # Resets tracking state so the next video starts fresh
+        _model_pool.checkin(model, performance_mode, components)
+    metadata.update({
+        'model_complexity': 0 if performance_mode else 1,
+        'components': list(components),
+        'max_width': max_width
+    })
+    save_landmarks(destination, arrays, metadata)
+    elapsed = time.perf_counter() - started
+    return {
+        'frames': metadata['frames'],
+        'duration_s': metadata['duration_s'],
+        'elapsed_s': elapsed,
+        'fps': metadata['frames'] / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def process_videos(inputs, output_dir, workers=None, performance_mode=True,
+                   components=LANDMARK_COMPONENTS, max_width=0, overwrite=False):
+    """
+    Extract landmarks from every video under inputs into output_dir.
+
+    Args:
+        inputs: Video files and/or directories to scan
+        output_dir: Where the .npz files and the manifest go
+        workers: Worker processes (defaults to the CPU count)
+        performance_mode: Model complexity 0 (True) or 1 (False)
+        components: Components to compute, see parse_components()
+        max_width: Downscale wider frames to this width (0 = never)
+        overwrite: Reprocess videos that already have an output
+
+    Returns:
+        dict: Throughput summary of the run
+    """
+    workers = max(1, workers or os.cpu_count() or 1)
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+
+    pending = []
+    skipped = 0
+    for source, relative_name in find_videos(inputs):
+        destination = output_path(output_dir, relative_name)
+        if not overwrite and os.path.exists(destination):
+            skipped += 1
+        else:
+            pending.append((source, destination))
+    logger.info(f"{len(pending)} video(s) to process, {skipped} already done, {workers} worker(s)")
+
+    summary = {'videos': 0, 'failed': 0, 'skipped': skipped, 'frames': 0, 'video_seconds': 0.0}
+    started = time.perf_counter()
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(performance_mode, components)) as pool, \
+            open(manifest_path, "a") as manifest:
+        futures = {
+            pool.submit(_process_video, source, destination, performance_mode, components, max_width):
+                (source, destination)
+            for source, destination in pending
+        }
+        for future in as_completed(futures):
+            source, destination = futures[future]
+            entry = {'source': source, 'output': destination, 'finished_at': time.time()}
+            try:
+                stats = future.result()
+            except Exception as e:
+                summary['failed'] += 1
+                entry.update(status='failed', error=str(e))
+                logger.error(f"Failed {source}: {e}")
+            else:
+                summary['videos'] += 1
+                summary['frames'] += stats['frames']
+                summary['video_seconds'] += stats['duration_s'] or 0.0
+                entry.update(status='done', **stats)
+                realtime = (stats['duration_s'] or 0.0) / stats['elapsed_s'] if stats['elapsed_s'] else 0.0
+                logger.info(
+                    f"[{summary['videos'] + summary['failed']}/{len(pending)}] {source}: "
+                    f"{stats['frames']} frames in {stats['elapsed_s']:.1f}s "
+                    f"({stats['fps']:.1f} fps, {realtime:.1f}x real time)"
+                )
+            manifest.write(json.dumps(entry) + "\n")
+            manifest.flush()
+
+    elapsed = time.perf_counter() - started
+    summary.update({
+        'workers': workers,
+        'elapsed_s': elapsed,
+        'fps': summary['frames'] / elapsed if elapsed > 0 else 0.0,
+        'realtime_factor': summary['video_seconds'] / elapsed if elapsed > 0 else 0.0
+    })
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract holistic landmarks from recorded videos")
+    parser.add_argument("inputs", nargs="+", help="Video files or directories")
+    parser.add_argument("--output", required=True, help="Output directory for .npz files")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--complexity", type=int, choices=(0, 1), default=1,
+                        help="Model complexity (default 1: offline extraction favours accuracy, while the "
+                             "live server starts at 0 and lets its latency controller move up)")
+    parser.add_argument("--components", default=None,
+                        help="Comma separated subset of face,pose,hands (default: all)")
+    parser.add_argument("--max-width", type=int, default=0,
+                        help="Downscale wider videos to this width before inference (0 = never)")
+    parser.add_argument("--overwrite", action="store_true", help="Reprocess videos that already have an output")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    summary = process_videos(
+        args.inputs, args.output,
+        workers=args.workers,
+        performance_mode=args.complexity == 0,
+        components=parse_components(args.components),
+        max_width=args.max_width,
+        overwrite=args.overwrite
+    )
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"Processed {summary['videos']} video(s), {summary['failed']} failed, "
+              f"{summary['skipped']} skipped")
+        print(f"{summary['frames']} frames in {summary['elapsed_s']:.1f}s with {summary['workers']} worker(s): "
+              f"{summary['fps']:.1f} fps, {summary['realtime_factor']:.1f}x real time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Compact binary wire format for holistic landmarks.
+
+JSON spends most of its bytes (and CPU) on repeating 'x', 'y', 'z' and
+'visibility' keys for 543 points per frame. This module packs a frame into a
+small fixed header followed by the raw coordinates of every detected
+component, which is roughly an order of magnitude smaller.
+
+Frame layout (little endian):
+
+    magic      4s   b"HLMK"
+    version    B    PROTOCOL_VERSION
+    encoding   B    0 = float32, 1 = float16, 2 = int16 (quantized)
+    presence   B    bitmask: 1 face, 2 pose, 4 left hand, 8 right hand
+    flags      B    bit 0: landmarks reused from an earlier frame
+                    bit 1: landmarks predicted (no inference on this frame)
+    frame_id   I
+    timestamp  d    seconds since the epoch
+    quality    f    detection quality score
+    payload         for each present component, in the order above,
+                    an (N, 4) array of x, y, z, visibility
+
+A batch (used for history responses) is a b"HLMB" header with the version,
+encoding and frame count, followed by that many frames back to back.
+"""
+import struct
+
+import numpy as np
+
+PROTOCOL_VERSION = 1
+
+# Landmark counts per component, in wire order
+FACE_LANDMARKS = 468
+POSE_LANDMARKS = 33
+HAND_LANDMARKS = 21
+COMPONENTS = (
+    ('face_landmarks', FACE_LANDMARKS),
+    ('pose_landmarks', POSE_LANDMARKS),
+    ('left_hand_landmarks', HAND_LANDMARKS),
+    ('right_hand_landmarks', HAND_LANDMARKS),
+)
+VALUES_PER_LANDMARK = 4  # x, y, z, visibility
+TOTAL_LANDMARKS = sum(count for _, count in COMPONENTS)
+
+
+def _component_slices():
+    slices = {}
+    start = 0
+    for name, count in COMPONENTS:
+        slices[name] = slice(start, start + count)
+        start += count
+    return slices
+
+
+# Row ranges of each component when all landmarks are stacked into one
+# (TOTAL_LANDMARKS, 4) array
+COMPONENT_SLICES = _component_slices()
+
+FRAME_MAGIC = b"HLMK"
+BATCH_MAGIC = b"HLMB"
+FRAME_HEADER = struct.Struct("<4sBBBBIdf")
+BATCH_HEADER = struct.Struct("<4sBBH")
+# The batch header stores the frame count as uint16
+MAX_BATCH_FRAMES = 0xFFFF
+
+# Wire encodings. int16 stores round(value * QUANT_SCALE), which covers
+# normalized coordinates in [-4, 4) at ~0.0001 resolution.
+ENCODINGS = {
+    'f32': (0, np.dtype('<f4')),
+    'f16': (1, np.dtype('<f2')),
+    'i16': (2, np.dtype('<i2')),
+}
+ENCODING_NAMES = {code: name for name, (code, _) in ENCODINGS.items()}
+QUANT_SCALE = 8192.0
+
+# Frame flags
+FLAG_REUSED = 0x01
+FLAG_PREDICTED = 0x02
+
+
+class ProtocolError(ValueError):
+    """Raised when a binary landmark message cannot be decoded"""
+
+
+def _pack_component(landmarks, encoding):
+    _, dtype = ENCODINGS[encoding]
+    if encoding == 'i16':
+        quantized = np.clip(np.rint(landmarks * QUANT_SCALE), -32768, 32767)
+        return quantized.astype(dtype).tobytes()
+    return np.asarray(landmarks).astype(dtype).tobytes()
+
+
+def encode_frame(frame_id, timestamp, quality_score, components, encoding='f16', flags=0):
+    """
+    Encode one frame of landmarks.
+
+    Args:
+        frame_id: Frame number
+        timestamp: Capture/processing time in seconds
+        quality_score: Detection quality (None is sent as 0)
+        components: Sequence of four (N, 4) arrays or None, in COMPONENTS order
+        encoding: 'f32', 'f16' or 'i16'
+        flags: Bitwise OR of FLAG_* values
+
+    Returns:
+        bytes: The encoded frame
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown landmark encoding: {encoding}")
+
+    presence = 0
+    payload = []
+    for bit, landmarks in enumerate(components):
+        if landmarks is not None:
+            presence |= 1 << bit
+            payload.append(_pack_component(landmarks, encoding))
+
+    header = FRAME_HEADER.pack(
+        FRAME_MAGIC, PROTOCOL_VERSION, ENCODINGS[encoding][0], presence, flags,
+        frame_id & 0xFFFFFFFF, timestamp, quality_score or 0.0
+    )
+    return header + b"".join(payload)
+
+
+def encode_batch(frames, encoding='f16'):
+    """
+    Encode several frames into one message.
+
+    Args:
+        frames: Iterable of (frame_id, timestamp, quality_score, components) tuples
+        encoding: 'f32', 'f16' or 'i16'
+
+    Raises:
+        ValueError: For more than MAX_BATCH_FRAMES frames (use encode_batches)
+    """
+    return _pack_batch([encode_frame(*frame, encoding=encoding) for frame in frames], encoding)
+
+
+def encode_batches(frames, encoding='f16', max_bytes=65536):
+    """
+    Encode frames into as many batch messages as needed to keep each one
+    under max_bytes and MAX_BATCH_FRAMES frames (a single frame larger
+    than max_bytes still gets its own batch). Data channels deliver large
+    messages poorly, so long histories are split rather than sent as one
+    message.
+
+    Args:
+        frames: Iterable of (frame_id, timestamp, quality_score, components) tuples
+        encoding: 'f32', 'f16' or 'i16'
+        max_bytes: Size limit per message
+
+    Returns:
+        list: Encoded batch messages
+    """
+    messages = []
+    pending = []
+    size = BATCH_HEADER.size
+    for frame in frames:
+        encoded = encode_frame(*frame, encoding=encoding)
+        if pending and (size + len(encoded) > max_bytes or len(pending) == MAX_BATCH_FRAMES):
+            messages.append(_pack_batch(pending, encoding))
+            pending = []
+            size = BATCH_HEADER.size
+        pending.append(encoded)
+        size += len(encoded)
+    if pending:
+        messages.append(_pack_batch(pending, encoding))
+    return messages
+
+
+def _pack_batch(encoded_frames, encoding):
+    if len(encoded_frames) > MAX_BATCH_FRAMES:
+        raise ValueError(f"A batch holds at most {MAX_BATCH_FRAMES} frames, got {len(encoded_frames)}")
+    header = BATCH_HEADER.pack(BATCH_MAGIC, PROTOCOL_VERSION, ENCODINGS[encoding][0], len(encoded_frames))
+    return header + b"".join(encoded_frames)
+
+
+def decode_frame(buffer, offset=0):
+    """
+    Decode one frame starting at offset.
+
+    Returns:
+        tuple: (frame dict, offset just past the frame). The dict holds
+            frame_id, timestamp, quality_score, encoding, reused, predicted and one (N, 4)
+            float32 array or None per component.
+    """
+    if len(buffer) - offset < FRAME_HEADER.size:
+        raise ProtocolError("Truncated landmark frame header")
+    magic, version, code, presence, flags, frame_id, timestamp, quality = FRAME_HEADER.unpack_from(buffer, offset)
+    if magic != FRAME_MAGIC:
+        raise ProtocolError(f"Bad landmark frame magic: {magic!r}")
+    if version != PROTOCOL_VERSION:
+        raise ProtocolError(f"Unsupported landmark protocol version: {version}")
+    if code not in ENCODING_NAMES:
+        raise ProtocolError(f"Unknown landmark encoding code: {code}")
+
+    encoding = ENCODING_NAMES[code]
+    dtype = ENCODINGS[encoding][1]
+    offset += FRAME_HEADER.size
+    frame = {
+        'frame_id': frame_id,
+        'timestamp': timestamp,
+        'quality_score': quality,
+        'encoding': encoding,
+        'reused': bool(flags & FLAG_REUSED),
+        'predicted': bool(flags & FLAG_PREDICTED),
+    }
+    for bit, (name, count) in enumerate(COMPONENTS):
+        if not presence & (1 << bit):
+            frame[name] = None
+            continue
+        nbytes = count * VALUES_PER_LANDMARK * dtype.itemsize
+        if len(buffer) - offset < nbytes:
+            raise ProtocolError(f"Truncated {name} payload")
+        values = np.frombuffer(buffer, dtype=dtype, count=count * VALUES_PER_LANDMARK, offset=offset)
+        values = values.astype(np.float32).reshape(count, VALUES_PER_LANDMARK)
+        if encoding == 'i16':
+            values /= QUANT_SCALE
+        frame[name] = values
+        offset += nbytes
+    return frame, offset
+
+
+def decode_message(buffer):
+    """Decode a frame or batch message into a list of frame dicts"""
+    magic = bytes(buffer[:4])
+    if magic == FRAME_MAGIC:
+        return [decode_frame(buffer)[0]]
+    if magic != BATCH_MAGIC:
+        raise ProtocolError(f"Not a landmark message: {magic!r}")
+    if len(buffer) < BATCH_HEADER.size:
+        raise ProtocolError("Truncated landmark batch header")
+    _, version, _, count = BATCH_HEADER.unpack_from(buffer)
+    if version != PROTOCOL_VERSION:
+        raise ProtocolError(f"Unsupported landmark protocol version: {version}")
+    frames = []
+    offset = BATCH_HEADER.size
+    for _ in range(count):
+        frame, offset = decode_frame(buffer, offset)
+        frames.append(frame)
+    return frames
@@ -0,0 +1,223 @@
+"""
+Fan-out of a session's landmark stream to any number of subscribers.
+
+The peer that sends the video gets its landmarks on its own data channel;
+other consumers (sidebar, text to speech, captioning, recorders) subscribe
+to the same session over WebSocket or Server-Sent Events instead of opening
+a second video session with a second inference.
+
+Each processed frame is published once as a LandmarkFrame, which
+serializes itself at most once per format no matter how many subscribers
+(the data channel included) ask for that format:
+
+    summary    the JSON message the data channel sends JSON clients
+    json       every landmark as JSON (type "landmarks_frame")
+    f32/f16/i16  landmark_protocol binary frames
+
+Every subscriber has a small queue of serialized messages drained by its
+own writer task, which waits on the transport, so a slow consumer only
+slows itself down. When its queue is full the oldest message is dropped
+(landmarks are a live stream, newer always wins) and the subscriber is told
+how many it missed; a subscriber that stays full for longer than
+stall_timeout is disconnected.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+
+from landmark_protocol import ENCODINGS, encode_frame
+
+# Formats a subscriber can ask for
+FORMATS = ("summary", "json") + tuple(ENCODINGS)
+
+# Messages buffered per subscriber and how long it may stay full
+SUBSCRIBER_QUEUE = 32
+STALL_TIMEOUT = 10.0
+
+
+class LandmarkFrame:
+    """
+    One published frame.
+
+    Args:
+        frame_id: Wire frame id
+        timestamp: Capture time in seconds since the epoch
+        quality_score: Detection quality score
+        components: (face, pose, left hand, right hand) arrays or None
+        flags: landmark_protocol FLAG_* bits
+        summary: Callable returning the data channel's JSON summary dict
+        formatter: Callable (frame_id, timestamp, quality_score, components)
+            returning the full JSON frame dict
+    """
+
+    def __init__(self, frame_id, timestamp, quality_score, components, flags=0, summary=None, formatter=None):
+        self.frame_id = frame_id
+        self.timestamp = timestamp
+        self.quality_score = quality_score
+        self.components = components
+        self.flags = flags
+        self._summary = summary
+        self._formatter = formatter
+        self._serialized = {}
+
+    def serialize(self, fmt):
+        """The frame in one of FORMATS (str for JSON, bytes for binary), cached"""
+        message = self._serialized.get(fmt)
+        if message is None:
+            if fmt == "summary":
+                message = json.dumps(self._summary())
+            elif fmt == "json":
+                frame = self._formatter(self.frame_id, self.timestamp, self.quality_score, self.components)
+                message = json.dumps(dict(frame, type='landmarks_frame', flags=self.flags))
+            else:
+                message = encode_frame(self.frame_id, self.timestamp, self.quality_score, self.components,
+                                       encoding=fmt, flags=self.flags)
+            self._serialized[fmt] = message
+        return message
+
+
+class LandmarkSubscriber:
+    """
+    A bounded queue of serialized messages for one consumer.
+
+    Args:
+        fmt: One of FORMATS
+        max_queue: Messages kept before the oldest is dropped
+        stall_timeout: Seconds the queue may stay full before the subscriber is closed
+    """
+
+    def __init__(self, fmt, max_queue=SUBSCRIBER_QUEUE, stall_timeout=STALL_TIMEOUT):
+        self.format = fmt
+        self.stall_timeout = stall_timeout
+        self.delivered = 0
+        self.dropped = 0
+        self.close_reason = None
+        self.created_at = time.time()
+        self._messages = deque(maxlen=max(1, max_queue))
+        self._ready = asyncio.Event()
+        self._unreported_drops = 0
+        self._full_since = None
+
+    @property
+    def closed(self):
+        return self.close_reason is not None
+
+    def offer(self, message, now=None):
+        """Queue a message without waiting, dropping the oldest one if full"""
+        if self.closed:
+            return
+        now = time.time() if now is None else now
+        if len(self._messages) == self._messages.maxlen:
+            if self._full_since is None:
+                self._full_since = now
+            elif now - self._full_since > self.stall_timeout:
+                self.close("stalled")
+                return
+            self.dropped += 1
+            self._unreported_drops += 1
+        else:
+            self._full_since = None
+        self._messages.append(message)
+        self._ready.set()
+
+    def close(self, reason="closed"):
+        """Stop the subscription; the writer finishes after the queued messages"""
+        if self.close_reason is None:
+            self.close_reason = reason
+        self._ready.set()
+
+    async def next(self):
+        """
+        Wait for the next message.
+
+        Returns:
+            tuple: (message, messages dropped just before it), or None once closed
+        """
+        while not self._messages:
+            if self.closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        if self.close_reason == "stalled":
+            return None
+        dropped, self._unreported_drops = self._unreported_drops, 0
+        self.delivered += 1
+        return self._messages.popleft(), dropped
+
+    def get_status(self):
+        return {
+            'format': self.format,
+            'queued': len(self._messages),
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'age_s': time.time() - self.created_at
+        }
+
+
+class LandmarkTopic:
+    """The subscribers of one session's landmark stream"""
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.subscribers = set()
+        self.published = 0
+        self.closed = False
+
+    def subscribe(self, fmt, **options):
+        """Add a subscriber (see LandmarkSubscriber for the options)"""
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown landmark format: {fmt}")
+        subscriber = LandmarkSubscriber(fmt, **options)
+        if self.closed:
+            subscriber.close("session_ended")
+        else:
+            self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        subscriber.close()
+        self.subscribers.discard(subscriber)
+
+    def publish(self, frame):
+        """Hand a LandmarkFrame to every subscriber, serializing each format once"""
+        if not self.subscribers:
+            return
+        self.published += 1
+        now = time.time()
+        for subscriber in list(self.subscribers):
+            subscriber.offer(frame.serialize(subscriber.format), now)
+            if subscriber.closed:
+                self.subscribers.discard(subscriber)
+
+    def close(self):
+        """End every subscription (the session is gone)"""
+        self.closed = True
+        for subscriber in self.subscribers:
+            subscriber.close("session_ended")
+        self.subscribers.clear()
+
+    def get_status(self):
+        return [subscriber.get_status() for subscriber in self.subscribers]
+
+
+async def pump(subscriber, send, notify):
+    """
+    Writer loop of one subscriber: sends messages until the subscription
+    closes. Awaiting send() is the backpressure - while the transport is
+    slow, messages pile up in the subscriber's queue and the oldest drop.
+
+    Args:
+        subscriber: LandmarkSubscriber
+        send: Coroutine function taking a str or bytes message
+        notify: Coroutine function taking a JSON-serializable control dict
+    """
+    while True:
+        item = await subscriber.next()
+        if item is None:
+            break
+        message, dropped = item
+        if dropped:
+            await notify({'type': 'landmarks_dropped', 'dropped': dropped, 'total_dropped': subscriber.dropped})
+        await send(message)
+    await notify({'type': 'subscription_closed', 'reason': subscriber.close_reason or "closed"})
@@ -0,0 +1,310 @@
+"""
+Append-only columnar recordings of landmark sessions.
+
+A recording is a directory with one raw little-endian file per column, so
+every column can be opened with numpy.memmap and sliced without loading
+the session into memory:
+
+    meta.json          format version, landmark layout, column dtypes and
+                       shapes, and whatever the recorder was told about the session
+    landmarks.f32      (N, TOTAL_LANDMARKS, 4) float32, landmark_protocol order
+    presence.b1        (N, 4) bool, one column per component
+    timestamps.f8      (N,) float64 seconds since the epoch
+    frame_ids.i8       (N,) int64
+    quality_scores.f4  (N,) float32, NaN when unknown
+    flags.u1           (N,) uint8 landmark_protocol FLAG_* bits
+    index.bin          one INDEX_RECORD per chunk: first row, row count,
+                       first/last frame id and first/last timestamp
+
+Rows are written in chunks. A chunk's column data is appended first and
+its index record last, so readers only trust rows covered by the index;
+a crash can lose at most the chunk being written, never corrupt the rest.
+Frame ids and timestamps grow monotonically, which lets the index narrow
+a time or frame range down to a few chunks before a binary search.
+
+LandmarkRecorder buffers rows in preallocated chunk arrays and hands full
+(or aged) chunks to a single background writer thread, so the event loop
+only ever copies one row; LandmarkRecording reads a finished or still
+growing recording.
+"""
+import json
+import logging
+import os
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from landmark_protocol import COMPONENTS, TOTAL_LANDMARKS, VALUES_PER_LANDMARK
+
+logger = logging.getLogger("HolisticRecorder")
+
+FORMAT_NAME = "holistic-landmarks"
+FORMAT_VERSION = 1
+
+# (name, file, dtype, per-row shape)
+COLUMNS = (
+    ('landmarks', 'landmarks.f32', '<f4', (TOTAL_LANDMARKS, VALUES_PER_LANDMARK)),
+    ('presence', 'presence.b1', '|b1', (len(COMPONENTS),)),
+    ('timestamps', 'timestamps.f8', '<f8', ()),
+    ('frame_ids', 'frame_ids.i8', '<i8', ()),
+    ('quality_scores', 'quality_scores.f4', '<f4', ()),
+    ('flags', 'flags.u1', '|u1', ()),
+)
+
+INDEX_FILE = "index.bin"
+META_FILE = "meta.json"
+INDEX_RECORD = struct.Struct("<QIqqdd")
+INDEX_DTYPE = np.dtype([
+    ('first_row', '<u8'), ('rows', '<u4'),
+    ('first_frame_id', '<i8'), ('last_frame_id', '<i8'),
+    ('first_timestamp', '<f8'), ('last_timestamp', '<f8'),
+])
+
+# Rows per chunk and the longest a partial chunk may wait in memory
+CHUNK_FRAMES = 256
+FLUSH_INTERVAL = 2.0
+
+# One writer thread for every recorder in the process keeps disk writes in
+# order and off the event loop
+_writer = None
+
+
+def _shared_writer():
+    global _writer
+    if _writer is None:
+        _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="landmark-recorder")
+    return _writer
+
+
+class LandmarkRecorder:
+    """
+    Streams one session's landmarks into a recording directory.
+
+    A disk error (full or read-only disk, missing permissions) stops the
+    recording: it is logged once, kept in error, and later frames are
+    dropped instead of buffered.
+
+    Args:
+        directory: Recording directory (created if missing)
+        session: JSON-serializable session details stored in meta.json
+        chunk_frames: Rows per chunk
+        flush_interval: Seconds after which a partial chunk is written anyway
+        executor: Executor for the disk writes (defaults to a shared writer thread)
+    """
+
+    def __init__(self, directory, session=None, chunk_frames=CHUNK_FRAMES,
+                 flush_interval=FLUSH_INTERVAL, executor=None):
+        self.directory = directory
+        self.chunk_frames = max(1, chunk_frames)
+        self.flush_interval = flush_interval
+        self.executor = executor or _shared_writer()
+        self.frames_recorded = 0
+        self.closed = False
+        self.error = None              # Set by the writer thread when a write fails
+        self._rows_written = 0
+        self._files = None
+        self._chunk = self._new_chunk()
+        self._chunk_rows = 0
+        self._chunk_started = None
+        meta = {
+            'format': FORMAT_NAME,
+            'version': FORMAT_VERSION,
+            'created_at': time.time(),
+            'components': [[name, count] for name, count in COMPONENTS],
+            'columns': {
+                name: {'file': filename, 'dtype': dtype, 'shape': list(shape)}
+                for name, filename, dtype, shape in COLUMNS
+            },
+            'chunk_frames': self.chunk_frames,
+            'session': session or {}
+        }
+        self.executor.submit(self._open, meta)
+
+    @property
+    def recording(self):
+        """True until the recorder is closed or a write fails"""
+        return not self.closed and self.error is None
+
+    def _new_chunk(self):
+        return {
+            name: np.zeros((self.chunk_frames,) + shape, dtype=dtype)
+            for name, _, dtype, shape in COLUMNS
+        }
+
+    def append(self, landmarks, presence, timestamp, frame_id, quality_score=None, flags=0):
+        """
+        Add one frame. Only copies into the current chunk; full chunks are
+        written in the background.
+
+        Args:
+            landmarks: (TOTAL_LANDMARKS, 4) array
+            presence: Four booleans, one per component
+            timestamp: Seconds since the epoch
+            frame_id: Frame number, increasing
+            quality_score: Detection quality or None
+            flags: landmark_protocol FLAG_* bits
+        """
+        if not self.recording:
+            return
+        row = self._chunk_rows
+        chunk = self._chunk
+        chunk['landmarks'][row] = landmarks
+        chunk['presence'][row] = presence
+        chunk['timestamps'][row] = timestamp
+        chunk['frame_ids'][row] = frame_id
+        chunk['quality_scores'][row] = np.nan if quality_score is None else quality_score
+        chunk['flags'][row] = flags
+        self._chunk_rows += 1
+        self.frames_recorded += 1
+        if self._chunk_started is None:
+            self._chunk_started = time.time()
+        if self._chunk_rows >= self.chunk_frames or time.time() - self._chunk_started >= self.flush_interval:
+            self.flush()
+
+    def append_window(self, window, row=-1):
+        """Append one row of a HolisticLandmarksTracker.get_window() result"""
+        quality = window['quality_scores'][row]
+        self.append(
+            window['landmarks'][row], window['presence'][row], window['timestamps'][row],
+            window['frame_ids'][row], None if np.isnan(quality) else quality, window['flags'][row]
+        )
+
+    def flush(self):
+        """Hand the current partial chunk to the writer"""
+        if not self._chunk_rows:
+            return
+        chunk, rows = self._chunk, self._chunk_rows
+        self._chunk = self._new_chunk()
+        self._chunk_rows = 0
+        self._chunk_started = None
+        self.executor.submit(self._write_chunk, chunk, rows)
+
+    def close(self):
+        """Write what is left and close the files (in the background)"""
+        if self.closed:
+            return
+        self.flush()
+        self.closed = True
+        self.executor.submit(self._close)
+
+    # The methods below only ever run on the writer thread
+
+    def _fail(self, action, error):
+        self.error = f"{action} failed: {error}"
+        logger.error(f"Recording to {self.directory} stopped: {self.error}")
+        self._close()
+
+    def _open(self, meta):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, META_FILE), "w") as f:
+                json.dump(meta, f, indent=2)
+            self._files = {}
+            for name, filename, _, _ in COLUMNS:
+                self._files[name] = open(os.path.join(self.directory, filename), "ab")
+            self._files['index'] = open(os.path.join(self.directory, INDEX_FILE), "ab")
+        except OSError as e:
+            self._fail("Opening the recording", e)
+
+    def _write_chunk(self, chunk, rows):
+        if self._files is None:
+            return
+        try:
+            self._append_chunk(chunk, rows)
+        except OSError as e:
+            self._fail("Writing a chunk", e)
+
+    def _append_chunk(self, chunk, rows):
+        for name, _, _, _ in COLUMNS:
+            self._files[name].write(chunk[name][:rows].tobytes())
+            self._files[name].flush()
+        index = self._files['index']
+        index.write(INDEX_RECORD.pack(
+            self._rows_written, rows,
+            int(chunk['frame_ids'][0]), int(chunk['frame_ids'][rows - 1]),
+            float(chunk['timestamps'][0]), float(chunk['timestamps'][rows - 1])
+        ))
+        index.flush()
+        self._rows_written += rows
+
+    def _close(self):
+        if self._files is None:
+            return
+        files, self._files = self._files, None
+        for f in files.values():
+            try:
+                f.close()
+            except OSError as e:
+                if self.error is None:
+                    self._fail("Closing the recording", e)
+
+
+class LandmarkRecording:
+    """
+    Read access to a recording directory through numpy.memmap.
+
+    Only rows covered by index.bin are visible; call refresh() to pick up
+    chunks written after opening a recording that is still growing.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, META_FILE)) as f:
+            self.meta = json.load(f)
+        if self.meta.get('format') != FORMAT_NAME or self.meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Not a version {FORMAT_VERSION} landmark recording: {directory}")
+        self.refresh()
+
+    def refresh(self):
+        """Re-read the index and remap the columns"""
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        self.index = np.fromfile(index_path, dtype=INDEX_DTYPE) if os.path.exists(index_path) else \
+            np.zeros(0, dtype=INDEX_DTYPE)
+        # A record cut short by a crash is ignored by fromfile's whole-record read
+        self.rows = int(self.index['first_row'][-1] + self.index['rows'][-1]) if len(self.index) else 0
+        self.columns = {}
+        for name, column in self.meta['columns'].items():
+            dtype = np.dtype(column['dtype'])
+            shape = (self.rows,) + tuple(column['shape'])
+            if self.rows:
+                self.columns[name] = np.memmap(os.path.join(self.directory, column['file']),
+                                               dtype=dtype, mode="r", shape=shape)
+            else:
+                self.columns[name] = np.zeros(shape, dtype=dtype)
+
+    def __len__(self):
+        return self.rows
+
+    def _rows_between(self, first_key, last_key, column, first, last):
+        """Row slice whose column values lie in [first, last], narrowed by the chunk index"""
+        if not self.rows:
+            return slice(0, 0)
+        # Chunks that can contain the range
+        start_chunk = int(np.searchsorted(self.index[last_key], first, side="left"))
+        end_chunk = int(np.searchsorted(self.index[first_key], last, side="right"))
+        if start_chunk >= end_chunk:
+            return slice(0, 0)
+        lo = int(self.index['first_row'][start_chunk])
+        hi = int(self.index['first_row'][end_chunk - 1] + self.index['rows'][end_chunk - 1])
+        values = self.columns[column][lo:hi]
+        return slice(lo + int(np.searchsorted(values, first, side="left")),
+                     lo + int(np.searchsorted(values, last, side="right")))
+
+    def rows_for_frames(self, first_frame_id, last_frame_id):
+        """Row slice for frame ids in [first_frame_id, last_frame_id]"""
+        return self._rows_between('first_frame_id', 'last_frame_id', 'frame_ids', first_frame_id, last_frame_id)
+
+    def rows_for_time(self, start, end):
+        """Row slice for timestamps in [start, end]"""
+        return self._rows_between('first_timestamp', 'last_timestamp', 'timestamps', start, end)
+
+    def read(self, rows):
+        """
+        Columns for a row slice.
+
+        Returns:
+            dict: column name -> memmap slice (no data is read until used)
+        """
+        return {name: column[rows] for name, column in self.columns.items()}
@@ -0,0 +1,189 @@
+"""
+Per-stage latency metrics for the landmark server.
+
+Every frame goes through a few distinct stages (decode, resize, color
+conversion, inference, drawing, serialization of the landmark message and
+conversion of the overlay back into a video frame). StageTimings keeps a
+streaming quantile sketch per stage, so p50/p95/p99 are available at any
+time in constant memory, and render_prometheus() turns them into the
+Prometheus text exposition format.
+
+The sketch is a log-bucketed histogram in the style of DDSketch: a value v
+lands in bucket ceil(log(v) / log(gamma)), which bounds the relative error
+of every quantile by relative_accuracy, and two sketches merge by adding
+their bucket counts.
+"""
+import math
+import time
+
+# Stages in pipeline order ("resize" is only reported by pipelines that
+# scale separately; the I420 ingest scales as part of "color"; "hands" is
+# the full-resolution hand refinement pass)
+STAGES = ("decode", "resize", "color", "inference", "hands", "draw", "serialize", "encode")
+
+# Quantiles reported by default
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class QuantileSketch:
+    """
+    Streaming quantile estimate with bounded relative error.
+
+    Args:
+        relative_accuracy: Maximum relative error of a quantile (0.02 = 2%)
+    """
+
+    # Values at or below this (in seconds) share the lowest bucket
+    MIN_VALUE = 1e-6
+
+    def __init__(self, relative_accuracy=0.02):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.count = 0
+        self.sum = 0.0
+
+    def add(self, value):
+        index = math.ceil(math.log(max(value, self.MIN_VALUE)) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, other):
+        """Add another sketch's values into this one (both must use the same accuracy)"""
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.sum += other.sum
+
+    def quantile(self, q):
+        """Estimated q-quantile (0 <= q <= 1), None if the sketch is empty"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # Midpoint of the bucket (gamma^(i-1), gamma^i] in relative terms
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+
+class StageTimings:
+    """
+    Quantile sketches for each pipeline stage.
+
+    Quantiles cover the last one to two windows (the current sketch plus the
+    previous one), so they follow changes in load; count and sum are
+    cumulative, as Prometheus summaries expect.
+
+    Args:
+        window: Seconds after which the current sketch is rotated out
+    """
+
+    def __init__(self, window=60.0):
+        self.window = window
+        self._current = {}
+        self._previous = {}
+        self._totals = {}
+        self._rotated_at = time.time()
+
+    def _rotate(self, now):
+        if now - self._rotated_at >= self.window:
+            # After a long idle period the old data is too stale to keep
+            self._previous = self._current if now - self._rotated_at < 2 * self.window else {}
+            self._current = {}
+            self._rotated_at = now
+
+    def record(self, stage, seconds, now=None):
+        """Record one measurement for a stage"""
+        self._rotate(time.time() if now is None else now)
+        sketch = self._current.get(stage)
+        if sketch is None:
+            sketch = self._current[stage] = QuantileSketch()
+        sketch.add(seconds)
+        count, total = self._totals.get(stage, (0, 0.0))
+        self._totals[stage] = (count + 1, total + seconds)
+
+    def record_many(self, stage_times, now=None):
+        """Record a dict of stage -> seconds"""
+        for stage, seconds in stage_times.items():
+            self.record(stage, seconds, now)
+
+    def stages(self):
+        """Stages with data, pipeline stages first"""
+        known = [stage for stage in STAGES if stage in self._totals]
+        return known + sorted(stage for stage in self._totals if stage not in STAGES)
+
+    def recent_sketch(self, stage):
+        """Sketch of the current and previous window for a stage"""
+        self._rotate(time.time())
+        sketch = QuantileSketch()
+        for sketches in (self._previous, self._current):
+            if stage in sketches:
+                sketch.merge(sketches[stage])
+        return sketch
+
+    def totals(self, stage):
+        """(count, sum in seconds) since the start"""
+        return self._totals.get(stage, (0, 0.0))
+
+    def snapshot(self, quantiles=QUANTILES):
+        """
+        JSON-friendly view of every stage.
+
+        Returns:
+            dict: stage -> count, mean_ms and one pXX_ms entry per quantile
+        """
+        snapshot = {}
+        for stage in self.stages():
+            count, total = self.totals(stage)
+            sketch = self.recent_sketch(stage)
+            entry = {'count': count, 'mean_ms': total / count * 1000 if count else 0.0}
+            for q in quantiles:
+                value = sketch.quantile(q)
+                entry[f"p{q * 100:g}_ms"] = value * 1000 if value is not None else None
+            snapshot[stage] = entry
+        return snapshot
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+def render_prometheus(summaries, gauges=(), counters=(), quantiles=QUANTILES):
+    """
+    Render metrics in the Prometheus text exposition format.
+
+    Args:
+        summaries: Iterable of (name, help, label name, StageTimings); every
+            stage becomes one summary series labelled with that label name
+        gauges: Iterable of (name, help, value)
+        counters: Iterable of (name, help, value)
+
+    Returns:
+        str: The exposition text
+    """
+    lines = []
+    for name, help_text, label, timings in summaries:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} summary")
+        for stage in timings.stages():
+            sketch = timings.recent_sketch(stage)
+            count, total = timings.totals(stage)
+            for q in quantiles:
+                value = sketch.quantile(q)
+                if value is not None:
+                    lines.append(f"{name}{_format_labels({label: stage, 'quantile': q})} {value:.6f}")
+            lines.append(f"{name}_sum{_format_labels({label: stage})} {total:.6f}")
+            lines.append(f"{name}_count{_format_labels({label: stage})} {count}")
+    for metric_type, metrics in (("gauge", gauges), ("counter", counters)):
+        for name, help_text, value in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
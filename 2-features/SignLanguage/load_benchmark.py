@@ -0,0 +1,441 @@
+"""
+Multi-peer load benchmark for the MediaPipe WebRTC server.
+
+Starts the aiohttp app in this process, connects N aiortc peers to /offer
+over loopback and streams synthetic (or recorded) video at a fixed
+resolution and frame rate. Landmarks come back on each peer's data channel
+in a binary format, whose frame timestamps give the latency from frame
+arrival at the server to landmark arrival at the client. Reported per
+session and overall:
+
+    fps               landmark frames received per second
+    latency_ms        p50 / p90 / p99 of that latency
+    frames_sent       video frames the peer sent
+    dropped_frames    frames the server's ingest queue discarded
+    video_fps         annotated frames received back (video mode)
+
+plus CPU use and resident memory (this process and its children, i.e. the
+server, its worker processes and the peers) and the server's own
+per-stage percentiles from /sessions. Only the measurement window after
+--warmup seconds is counted.
+
+Everything runs offline on CPU: no STUN servers, no downloads (the
+MediaPipe models ship with the package). Server settings come from the
+environment as usual (HOLISTIC_EXECUTOR, HOLISTIC_WORKERS, ...).
+
+Usage:
+    python load_benchmark.py --peers 4 --duration 30 [--width 1280 --height 720]
+        [--fps 30] [--video clip.mp4] [--mode landmarks_only] [--json]
+        [--output results.json] [--baseline previous.json --tolerance 0.15]
+
+With --baseline the run fails (exit code 1) when overall fps drops or p90
+latency grows by more than the tolerance relative to that earlier result.
+"""
+import argparse
+import asyncio
+import fractions
+import json
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+from startup_benchmark import resident_memory_mb, _child_pids
+
+VIDEO_CLOCK_RATE = 90000
+
+
+def cpu_seconds(pid):
+    """User + system CPU time of a process and all its descendants, None without /proc"""
+    ticks = os.sysconf("SC_CLK_TCK")
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/stat") as stat:
+                # Fields after the command name, which may contain spaces
+                fields = stat.read().rsplit(")", 1)[1].split()
+        except OSError:
+            if current == pid:
+                return None
+            continue
+        total += int(fields[11]) + int(fields[12])
+        pending.extend(_child_pids(current))
+    return total / ticks
+
+
+def synthetic_frames(width, height, count):
+    """
+    Frames of a bright bar sweeping over a gradient, as yuv420p arrays.
+
+    Every frame differs from the previous one, so motion gating does not
+    turn the benchmark into a cache test.
+    """
+    import cv2
+
+    yy, xx = np.mgrid[0:height, 0:width]
+    background = np.dstack([xx * 255 // width, yy * 255 // height,
+                            (xx + yy) * 255 // (width + height)]).astype(np.uint8)
+    bar_width = max(8, width // 16)
+    frames = []
+    for index in range(count):
+        image = background.copy()
+        left = index * (width - bar_width) // max(1, count - 1)
+        image[:, left:left + bar_width] = 255
+        frames.append(cv2.cvtColor(image, cv2.COLOR_BGR2YUV_I420))
+    return frames
+
+
+def recorded_frames(path, width, height, max_frames):
+    """The first max_frames frames of a video, scaled to width x height, as yuv420p arrays"""
+    import av
+
+    frames = []
+    with av.open(path) as container:
+        for frame in container.decode(video=0):
+            frames.append(frame.reformat(width=width, height=height, format="yuv420p").to_ndarray())
+            if len(frames) >= max_frames:
+                break
+    if not frames:
+        raise ValueError(f"No video frames in {path}")
+    return frames
+
+
+def _video_track_class():
+    from aiortc import MediaStreamTrack
+
+    class LoopingVideoTrack(MediaStreamTrack):
+        """Plays a list of yuv420p frames in a loop at a fixed frame rate"""
+
+        kind = "video"
+
+        def __init__(self, frames, fps):
+            super().__init__()
+            self.frames = frames
+            self.fps = fps
+            self.sent = 0
+            self._started = None
+
+        async def recv(self):
+            import av
+
+            if self._started is None:
+                self._started = time.time()
+            delay = self._started + self.sent / self.fps - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            frame = av.VideoFrame.from_ndarray(self.frames[self.sent % len(self.frames)], format="yuv420p")
+            frame.pts = int(self.sent * VIDEO_CLOCK_RATE / self.fps)
+            frame.time_base = fractions.Fraction(1, VIDEO_CLOCK_RATE)
+            self.sent += 1
+            return frame
+
+    return LoopingVideoTrack
+
+
+class PeerStats:
+    """What one peer observed"""
+
+    def __init__(self, index):
+        self.index = index
+        self.session_id = None
+        self.error = None
+        self.track = None
+        self.landmark_times = []     # receive time of every landmark frame
+        self.latencies = []          # receive time - server arrival time, seconds
+        self.video_times = []        # receive time of every returned video frame
+        self.frames_sent_at_start = 0
+        self.frames_sent_at_end = 0
+
+
+async def run_peer(index, url, frames, fps, mode, wire_format, stop_event, stats):
+    """Connect one peer, stream until stop_event is set, then hang up"""
+    import aiohttp
+    from aiortc import RTCPeerConnection, RTCSessionDescription
+    from landmark_protocol import FRAME_MAGIC, decode_frame
+
+    pc = RTCPeerConnection()
+    # The server's landmark channel needs SCTP in the offer
+    pc.createDataChannel("holistic-landmarks")
+
+    @pc.on("datachannel")
+    def on_datachannel(channel):
+        @channel.on("message")
+        def on_message(message):
+            received = time.time()
+            if isinstance(message, bytes) and message[:4] == FRAME_MAGIC:
+                frame, _ = decode_frame(message)
+                stats.landmark_times.append(received)
+                stats.latencies.append(received - frame['timestamp'])
+
+    @pc.on("track")
+    def on_track(track):
+        async def consume():
+            try:
+                while True:
+                    await track.recv()
+                    stats.video_times.append(time.time())
+            except Exception:
+                pass
+        asyncio.ensure_future(consume())
+
+    stats.track = _video_track_class()(frames, fps)
+    pc.addTrack(stats.track)
+    try:
+        await pc.setLocalDescription(await pc.createOffer())
+        async with aiohttp.ClientSession() as session:
+            response = await session.post(url + "/offer", json={
+                "sdp": {"sdp": pc.localDescription.sdp, "type": pc.localDescription.type},
+                "mode": mode,
+                "format": wire_format
+            })
+            answer = await response.json()
+        if response.status != 200:
+            stats.error = f"offer rejected ({response.status}): {answer.get('error')}"
+            return
+        stats.session_id = answer.get("session_id")
+        await pc.setRemoteDescription(RTCSessionDescription(**answer["sdp"]))
+        await stop_event.wait()
+    except Exception as e:
+        stats.error = str(e)
+    finally:
+        await pc.close()
+
+
+async def fetch_sessions(url):
+    """The server's /sessions entries by session id"""
+    import aiohttp
+
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url + "/sessions") as response:
+            return {entry['session_id']: entry for entry in (await response.json())['sessions']}
+
+
+def percentiles(values, quantiles=(50, 90, 99)):
+    if not values:
+        return {f"p{q}": None for q in quantiles}
+    return {f"p{q}": float(np.percentile(values, q)) for q in quantiles}
+
+
+def summarize_peer(stats, window_start, window_end, sessions_before, sessions_after):
+    """Numbers for one peer within the measurement window"""
+    seconds = window_end - window_start
+    in_window = [
+        (t, latency) for t, latency in zip(stats.landmark_times, stats.latencies)
+        if window_start <= t < window_end
+    ]
+    video = [t for t in stats.video_times if window_start <= t < window_end]
+    server = sessions_after.get(stats.session_id, {})
+    dropped = None
+    if server:
+        dropped = server['dropped_frames'] - sessions_before.get(stats.session_id, {}).get('dropped_frames', 0)
+    return {
+        'peer': stats.index,
+        'session_id': stats.session_id,
+        'error': stats.error,
+        'fps': len(in_window) / seconds if seconds > 0 else 0.0,
+        'video_fps': len(video) / seconds if seconds > 0 else 0.0,
+        'latency_ms': {key: value * 1000 if value is not None else None
+                       for key, value in percentiles([latency for _, latency in in_window]).items()},
+        'frames_sent': stats.frames_sent_at_end - stats.frames_sent_at_start,
+        'landmark_frames': len(in_window),
+        'dropped_frames': dropped,
+        'server': {key: server.get(key) for key in (
+            'frame_skip', 'scheduled_fps', 'scheduled_width', 'controller', 'stages'
+        )} if server else None
+    }
+
+
+async def run_benchmark(peers=1, duration=20.0, warmup=5.0, width=640, height=480, fps=30.0,
+                        video=None, mode="landmarks_only", wire_format="f16", ramp=0.5,
+                        host="127.0.0.1", port=0):
+    """
+    Run one benchmark and return its results as a JSON-friendly dict.
+
+    Args:
+        peers: Concurrent peer connections
+        duration: Seconds measured, after warmup
+        warmup: Seconds after the last peer connected that are not measured
+        width, height, fps: Video the peers send
+        video: Optional video file to send instead of the synthetic pattern
+        mode: "landmarks_only" or "video"
+        wire_format: Binary landmark encoding the peers ask for (f32, f16 or i16)
+        ramp: Seconds between peer connections
+        host, port: Where the in-process server listens (port 0 picks a free one)
+    """
+    from aiohttp import web
+    import mediapipe_webrtc_server as server
+
+    if video:
+        frames = recorded_frames(video, width, height, max_frames=int(fps * 10))
+    else:
+        frames = synthetic_frames(width, height, count=int(fps * 2))
+
+    app = server.create_app()
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f"http://{host}:{port}"
+
+    stop_event = asyncio.Event()
+    all_stats = [PeerStats(index) for index in range(peers)]
+    tasks = []
+    # Measurement window, filled in once the peers are up
+    window_start = window_end = time.time()
+    cpu_start = cpu_end = None
+    sessions_before = sessions_after = {}
+    rss_samples = []
+    try:
+        for stats in all_stats:
+            tasks.append(asyncio.ensure_future(
+                run_peer(stats.index, url, frames, fps, mode, wire_format, stop_event, stats)
+            ))
+            await asyncio.sleep(ramp)
+        await asyncio.sleep(warmup)
+        if all(stats.error for stats in all_stats):
+            # Nothing to measure; report why instead of an empty window
+            raise RuntimeError("No peer connected: " + "; ".join(
+                f"peer {stats.index}: {stats.error}" for stats in all_stats
+            ))
+
+        sessions_before = await fetch_sessions(url)
+        window_start = time.time()
+        cpu_start = cpu_seconds(os.getpid())
+        for stats in all_stats:
+            stats.frames_sent_at_start = stats.track.sent if stats.track else 0
+        while time.time() - window_start < duration:
+            rss = resident_memory_mb(os.getpid())
+            if rss is not None:
+                rss_samples.append(rss)
+            await asyncio.sleep(min(0.5, max(0.0, duration - (time.time() - window_start))))
+        window_end = time.time()
+        cpu_end = cpu_seconds(os.getpid())
+        for stats in all_stats:
+            stats.frames_sent_at_end = stats.track.sent if stats.track else 0
+
+        sessions_after = await fetch_sessions(url)
+    finally:
+        stop_event.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await runner.cleanup()
+
+    sessions = [summarize_peer(stats, window_start, window_end, sessions_before, sessions_after)
+                for stats in all_stats]
+    seconds = window_end - window_start
+    latencies = [
+        latency for stats in all_stats
+        for t, latency in zip(stats.landmark_times, stats.latencies) if window_start <= t < window_end
+    ]
+    return {
+        'config': {
+            'peers': peers, 'duration_s': duration, 'warmup_s': warmup, 'width': width, 'height': height,
+            'fps': fps, 'video': video, 'mode': mode, 'format': wire_format,
+            'executor': app["inference_executor"].kind, 'workers': app["inference_executor"].workers,
+            'cpu_count': os.cpu_count()
+        },
+        'overall': {
+            'sessions_connected': sum(1 for stats in all_stats if stats.session_id and not stats.error),
+            'fps': sum(session['fps'] for session in sessions),
+            'fps_per_session': float(np.mean([session['fps'] for session in sessions])) if sessions else 0.0,
+            'min_session_fps': min((session['fps'] for session in sessions), default=0.0),
+            'latency_ms': {key: value * 1000 if value is not None else None
+                           for key, value in percentiles(latencies).items()},
+            'dropped_frames': sum(session['dropped_frames'] or 0 for session in sessions),
+            'cpu_percent': (cpu_end - cpu_start) / seconds * 100
+            if cpu_start is not None and cpu_end is not None and seconds > 0 else None,
+            'rss_mb': {'mean': float(np.mean(rss_samples)), 'max': max(rss_samples)} if rss_samples else None
+        },
+        'sessions': sessions
+    }
+
+
+def compare_to_baseline(result, baseline, tolerance):
+    """List of regressions of overall fps and p90 latency beyond the tolerance"""
+    regressions = []
+    current, previous = result['overall'], baseline['overall']
+    if previous.get('fps') and current['fps'] < previous['fps'] * (1 - tolerance):
+        regressions.append(f"fps {current['fps']:.1f} < baseline {previous['fps']:.1f}")
+    current_p90 = current['latency_ms']['p90']
+    previous_p90 = (previous.get('latency_ms') or {}).get('p90')
+    if previous_p90 and current_p90 is not None and current_p90 > previous_p90 * (1 + tolerance):
+        regressions.append(f"p90 latency {current_p90:.1f}ms > baseline {previous_p90:.1f}ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the landmark server with concurrent WebRTC peers")
+    parser.add_argument("--peers", type=int, default=1, help="Concurrent peer connections")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds measured")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Seconds ignored after the peers connect")
+    parser.add_argument("--width", type=int, default=640, help="Width of the video the peers send")
+    parser.add_argument("--height", type=int, default=480, help="Height of the video the peers send")
+    parser.add_argument("--fps", type=float, default=30.0, help="Frame rate of the video the peers send")
+    parser.add_argument("--video", default=None, help="Send this video file (looped) instead of a synthetic pattern")
+    parser.add_argument("--mode", choices=("landmarks_only", "video"), default="landmarks_only",
+                        help="Session mode the peers request")
+    parser.add_argument("--format", choices=("f32", "f16", "i16"), default="f16",
+                        help="Binary landmark format the peers request")
+    parser.add_argument("--ramp", type=float, default=0.5, help="Seconds between peer connections")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    parser.add_argument("--output", default=None, help="Also write the JSON results to this file")
+    parser.add_argument("--baseline", default=None, help="Earlier JSON result to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Allowed relative fps drop / p90 latency increase versus the baseline")
+    args = parser.parse_args()
+
+    # The peers and the server share this process; keep per-frame and per
+    # connection INFO lines out of the benchmark output
+    for name in ("HolisticSignLanguage", "aiohttp.access", "aioice.ice"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    try:
+        result = asyncio.run(run_benchmark(
+            peers=args.peers, duration=args.duration, warmup=args.warmup,
+            width=args.width, height=args.height, fps=args.fps, video=args.video,
+            mode=args.mode, wire_format=args.format, ramp=args.ramp
+        ))
+    except RuntimeError as e:
+        print(f"Benchmark failed: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(result, json.load(f), args.tolerance)
+        result['regressions'] = regressions
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        overall = result['overall']
+        latency = overall['latency_ms']
+        print(f"{overall['sessions_connected']}/{args.peers} sessions, {args.width}x{args.height}@{args.fps:g} "
+              f"{args.mode}, {result['config']['workers']} {result['config']['executor']} worker(s)")
+        for session in result['sessions']:
+            if session['error']:
+                print(f"  peer {session['peer']}: {session['error']}")
+                continue
+            print(f"  peer {session['peer']}: {session['fps']:5.1f} fps, "
+                  f"p50 {session['latency_ms']['p50'] or 0:6.1f} ms, p90 {session['latency_ms']['p90'] or 0:6.1f} ms, "
+                  f"{session['dropped_frames'] or 0} dropped")
+        print(f"total {overall['fps']:.1f} fps, latency p50/p90/p99 "
+              f"{latency['p50'] or 0:.1f}/{latency['p90'] or 0:.1f}/{latency['p99'] or 0:.1f} ms")
+        if overall['cpu_percent'] is not None:
+            print(f"cpu {overall['cpu_percent']:.0f}%, rss {overall['rss_mb']['mean']:.0f} MB "
+                  f"(max {overall['rss_mb']['max']:.0f} MB)")
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
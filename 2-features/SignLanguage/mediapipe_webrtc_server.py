@@ -1,39 +1,252 @@
+import argparse
 import asyncio
+import importlib
+import importlib.util
 import json
-import cv2
 import numpy as np
 import logging
+import multiprocessing
 import os
+import shutil
+import socket
+import threading
 import time
+import uuid
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
 from aiohttp import web
 from aiohttp_cors import setup as cors_setup, ResourceOptions
 from aiortc import MediaStreamTrack, RTCPeerConnection, RTCSessionDescription
+from aiortc.mediastreams import MediaStreamError
 import av
-import torch  # Added for GPU availability check
-
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("sign_language_server.log"),
-        logging.StreamHandler()
-    ]
+from landmark_protocol import (
+    COMPONENT_SLICES, COMPONENTS, ENCODINGS, FLAG_PREDICTED, FLAG_REUSED,
+    MAX_BATCH_FRAMES, PROTOCOL_VERSION, TOTAL_LANDMARKS, VALUES_PER_LANDMARK, encode_batch, encode_batches
 )
+from latency_metrics import StageTimings, render_prometheus
+from landmark_store import LandmarkRecorder, LandmarkRecording
+from landmark_pubsub import FORMATS as SUBSCRIPTION_FORMATS, LandmarkFrame, LandmarkTopic, pump
+from sign_recognition import RecognitionBatcher, SessionRecognizer, load_backend
+
 logger = logging.getLogger("HolisticSignLanguage")
 
+def configure_logging():
+    """
+    Log to the console and sign_language_server.log. Only the server itself
+    calls this (main() and every server process), so tools that import this
+    module do not write to the server's log file.
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler("sign_language_server.log"),
+            logging.StreamHandler()
+        ]
+    )
+
+class _LazyModule:
+    """
+    Stand-in for a module that is only imported on first attribute access.
+    
+    MediaPipe and OpenCV take most of the import time and memory of this
+    server, and neither is needed to answer /ping. Looked up attributes are
+    cached on the proxy, so after the first call cv2.resize costs the same
+    as with a regular import.
+    """
+    
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+        self.__dict__['_lock'] = threading.Lock()
+    
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            with self._lock:
+                if self._module is None:
+                    started = time.perf_counter()
+                    self.__dict__['_module'] = importlib.import_module(self._name)
+                    logger.info(f"Imported {self._name} in {time.perf_counter() - started:.2f}s")
+                module = self._module
+        value = getattr(module, attr)
+        self.__dict__[attr] = value
+        return value
+
+cv2 = _LazyModule("cv2")
+mp = _LazyModule("mediapipe")
+
+def detect_gpu():
+    """
+    Check for an NVIDIA GPU without importing a deep learning framework.
+    
+    HOLISTIC_GPU=0/1 overrides the check. Otherwise the driver's /proc entry
+    or nvidia-smi on the PATH counts as a GPU.
+    """
+    override = os.environ.get("HOLISTIC_GPU")
+    if override in ("0", "1"):
+        return override == "1"
+    return os.path.exists("/proc/driver/nvidia/version") or shutil.which("nvidia-smi") is not None
+
 # Check if GPU is available
-gpu_available = torch.cuda.is_available()
-logger.info(f"GPU available: {gpu_available}")
+gpu_available = detect_gpu()
+
+# Address the HTTP server listens on
+SERVER_HOST = os.environ.get("HOLISTIC_HOST", "localhost")
+SERVER_PORT = int(os.environ.get("HOLISTIC_PORT", 8765))
+
+# Server processes sharing the port, the session limit of each (0 = no
+# limit) and whether to run the event loops on uvloop. All of these can
+# also be set on the command line.
+SERVER_PROCESSES = int(os.environ.get("HOLISTIC_PROCESSES", 1))
+MAX_SESSIONS = int(os.environ.get("HOLISTIC_MAX_SESSIONS", 0))
+USE_UVLOOP = os.environ.get("HOLISTIC_UVLOOP", "0") == "1"
+
+# Fair sharing of inference capacity between the sessions of one process.
+# Every session gets an equal frame rate share, capped at MAX_SESSION_FPS;
+# new sessions are admitted while each can still get MIN_SESSION_FPS.
+# Offers over the limit wait up to ADMISSION_TIMEOUT seconds in a queue of
+# ADMISSION_QUEUE_SIZE before being rejected.
+MAX_SESSION_FPS = float(os.environ.get("HOLISTIC_MAX_SESSION_FPS", 30))
+MIN_SESSION_FPS = float(os.environ.get("HOLISTIC_MIN_SESSION_FPS", 10))
+ADMISSION_QUEUE_SIZE = int(os.environ.get("HOLISTIC_ADMISSION_QUEUE", 8))
+ADMISSION_TIMEOUT = float(os.environ.get("HOLISTIC_ADMISSION_TIMEOUT", 10))
+
+# Per-session latency budget: the 90th percentile of arrival-to-landmarks
+# latency should stay under LATENCY_BUDGET_MS and the output frame rate at
+# or above TARGET_FPS (0 = no frame rate target). The controller trades
+# processing width, model complexity and frame skipping to get there.
+LATENCY_BUDGET_MS = float(os.environ.get("HOLISTIC_LATENCY_BUDGET_MS", 150))
+TARGET_FPS = float(os.environ.get("HOLISTIC_TARGET_FPS", 15))
+
+# Directory for landmark recordings (see landmark_store). Sessions that ask
+# for "record" in their offer get a recording here; empty disables recording.
+RECORDING_DIR = os.environ.get("HOLISTIC_RECORD_DIR", "")
+
+# Landmark history queries: frames returned at most (longer ranges are
+# downsampled to fit; never more than one binary batch holds) and the size
+# limit of one data channel message
+QUERY_MAX_FRAMES = min(int(os.environ.get("HOLISTIC_QUERY_MAX_FRAMES", 1800)), MAX_BATCH_FRAMES)
+QUERY_MESSAGE_BYTES = 64 * 1024
+
+# Sign recognition model (.npz or .onnx, see sign_recognition); empty
+# disables recognition. Every RECOGNITION_STRIDE frames a session's newest
+# landmark window is classified; requests of all sessions are batched, up
+# to RECOGNITION_BATCH per model call, waiting at most
+# RECOGNITION_DEADLINE_MS for the batch to fill. Glosses below
+# RECOGNITION_THRESHOLD are not reported.
+SIGN_MODEL = os.environ.get("HOLISTIC_SIGN_MODEL", "")
+RECOGNITION_STRIDE = int(os.environ.get("HOLISTIC_RECOGNITION_STRIDE", 8))
+RECOGNITION_BATCH = int(os.environ.get("HOLISTIC_RECOGNITION_BATCH", 64))
+RECOGNITION_DEADLINE_MS = float(os.environ.get("HOLISTIC_RECOGNITION_DEADLINE_MS", 20))
+RECOGNITION_THRESHOLD = float(os.environ.get("HOLISTIC_RECOGNITION_THRESHOLD", 0.6))
+
+# Inference executor configuration. "thread" runs every session pipeline in
+# this process, "process" gives each worker its own interpreter (and GIL) so
+# aggregate throughput scales with the number of cores.
+INFERENCE_EXECUTOR = os.environ.get("HOLISTIC_EXECUTOR", "thread")
+INFERENCE_WORKERS = int(os.environ.get("HOLISTIC_WORKERS", os.cpu_count() or 1))
+
+# How many decoded frames each session may hold while inference is busy.
+# Older frames are dropped so latency stays bounded under overload.
+FRAME_QUEUE_SIZE = int(os.environ.get("HOLISTIC_FRAME_QUEUE", 1))
+
+# Frames of landmark history kept per session (150 = 5 seconds at 30fps)
+HISTORY_FRAMES = int(os.environ.get("HOLISTIC_HISTORY_FRAMES", 150))
 
-# Initialize MediaPipe Holistic
-import mediapipe as mp
-mp_holistic = mp.solutions.holistic
-mp_drawing = mp.solutions.drawing_utils
-mp_drawing_styles = mp.solutions.drawing_styles
+# Width of the returned visualization video (0 = same as the input). Drawing
+# and re-encoding at a lower resolution is much cheaper for large inputs.
+OVERLAY_OUTPUT_WIDTH = int(os.environ.get("HOLISTIC_OVERLAY_WIDTH", 0))
 
-def create_holistic_model(codec_name=None, performance_mode=True):
+# Initialized models kept ready per inference worker. They are warmed with a
+# dummy frame at startup so a new session's first frame is a plain inference.
+MODEL_POOL_SIZE = int(os.environ.get("HOLISTIC_MODEL_POOL", 1))
+
+# Inference workers that warm their pool at startup. 0 warms as many as can
+# have a session at once: the session limit, capped at the worker count (one
+# worker without a limit). Every warm model is a MediaPipe graph built before
+# the server is ready, so warming each of many workers has to be asked for.
+WARM_WORKERS = int(os.environ.get("HOLISTIC_WARM_WORKERS", 0))
+
+# Landmark components a client can ask for. Sessions that skip "face" get a
+# standalone Pose/Hands pipeline instead of the full Holistic graph.
+LANDMARK_COMPONENTS = ("face", "pose", "hands")
+
+# Crop inference to the signer's upper body using the previous frame's pose
+ROI_CROPPING = os.environ.get("HOLISTIC_ROI", "0") == "1"
+
+# Detect the hands a second time on full-resolution crops around the wrists
+# found by the pose, at most HAND_CROP_SIZE pixels wide. Sessions without the
+# face skip hands in the first, low-resolution pass altogether.
+HAND_REFINEMENT = os.environ.get("HOLISTIC_HAND_REFINEMENT", "0") == "1"
+HAND_CROP_SIZE = int(os.environ.get("HOLISTIC_HAND_CROP_SIZE", 256))
+
+# Skip inference on effectively static frames and re-emit the last result.
+# MOTION_REFRESH_INTERVAL bounds how stale a reused result can get (seconds).
+MOTION_GATING = os.environ.get("HOLISTIC_MOTION_GATING", "0") == "1"
+MOTION_THRESHOLD = float(os.environ.get("HOLISTIC_MOTION_THRESHOLD", 2.0))
+MOTION_REFRESH_INTERVAL = float(os.environ.get("HOLISTIC_MOTION_REFRESH", 1.0))
+
+# Run inference on every Nth frame only and extrapolate landmarks in between.
+# N follows the inference time, up to MAX_FRAME_SKIP.
+FRAME_SKIP = os.environ.get("HOLISTIC_FRAME_SKIP", "0") == "1"
+MAX_FRAME_SKIP = int(os.environ.get("HOLISTIC_MAX_FRAME_SKIP", 4))
+
+def parse_components(value):
+    """
+    Normalize a component selection into a sorted tuple.
+    
+    Accepts a list like ["hands", "pose"] or a comma separated string;
+    None or an empty selection means everything.
+    """
+    if value is None:
+        return LANDMARK_COMPONENTS
+    if isinstance(value, str):
+        value = [part for part in value.replace(" ", "").split(",") if part]
+    components = set(value)
+    unknown = components - set(LANDMARK_COMPONENTS)
+    if unknown:
+        raise ValueError(f"Unknown landmark components: {', '.join(sorted(unknown))}")
+    if not components:
+        return LANDMARK_COMPONENTS
+    return tuple(c for c in LANDMARK_COMPONENTS if c in components)
+
+def parse_landmark_query(params):
+    """
+    Validate a landmark history query (data channel JSON or HTTP query string).
+    
+    Every key is optional:
+        from_frame, to_frame    frame id range, inclusive
+        start_time, end_time    time window in seconds since the epoch
+        last_seconds            shorthand for start_time = now - last_seconds
+        last_frames             shorthand for the newest N frames
+        components              subset of face, pose, hands
+        step                    keep every Nth frame
+        max_frames              downsample to at most this many frames
+    Without a range the whole in-memory history is returned.
+    
+    Raises:
+        ValueError: On malformed values
+    """
+    def number(key, cast):
+        value = params.get(key)
+        if value is None or value == "":
+            return None
+        try:
+            return cast(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid {key}: {value!r}")
+    
+    query = {key: number(key, int) for key in ('from_frame', 'to_frame', 'last_frames', 'step', 'max_frames')}
+    query.update({key: number(key, float) for key in ('start_time', 'end_time', 'last_seconds')})
+    for key in ('last_frames', 'step', 'max_frames'):
+        if query[key] is not None and query[key] < 1:
+            raise ValueError(f"{key} must be at least 1")
+    query['components'] = parse_components(params.get('components'))
+    return query
+
+def create_holistic_model(codec_name=None, performance_mode=True, components=LANDMARK_COMPONENTS):
     """
     Create MediaPipe Holistic model with intelligent performance optimization.
     
@@ -43,9 +256,15 @@ def create_holistic_model(codec_name=None, performance_mode=True):
     Note: MediaPipe handles GPU acceleration automatically based on your system
     configuration and build. We focus on the parameters we can actually control.
     
+    Holistic always runs pose, face mesh and both hands. When the client does
+    not need the face, or only needs the face, the cheaper
+    ComponentLandmarkModel (standalone Pose and/or Hands, or Face Mesh) is
+    returned instead; it has the same process() interface.
+    
     Args:
         codec_name: Video codec being used (for logging purposes)
         performance_mode: True for speed optimization, False for maximum accuracy
+        components: Components the session needs, see parse_components()
     """
     # Log GPU availability for monitoring purposes
     if gpu_available:
@@ -53,12 +272,15 @@ def create_holistic_model(codec_name=None, performance_mode=True):
     else:
         logger.info(f"GPU not available. Processing will use CPU. Codec: {codec_name or 'unknown'}")
     
+    if "face" not in components or components == ("face",):
+        return ComponentLandmarkModel(components, performance_mode)
+    
     if performance_mode:
         # Performance-optimized configuration
         # These settings prioritize speed while maintaining detection quality
         # for sign language applications where major gestures are more important
         # than micro-expressions
-        return mp_holistic.Holistic(
+        return mp.solutions.holistic.Holistic(
             static_image_mode=False,        # Video mode - much faster than image mode
             model_complexity=0,             # Lightest model - 3x faster than complexity=2
             smooth_landmarks=False,         # Disable smoothing - reduces processing lag
@@ -70,7 +292,7 @@ def create_holistic_model(codec_name=None, performance_mode=True):
     else:
         # Quality-optimized configuration
         # Use this for comparison or when accuracy is more critical than speed
-        return mp_holistic.Holistic(
+        return mp.solutions.holistic.Holistic(
             static_image_mode=False,
             model_complexity=1,             # Higher quality model
             smooth_landmarks=True,          # Better temporal stability
@@ -80,9 +302,148 @@ def create_holistic_model(codec_name=None, performance_mode=True):
             min_tracking_confidence=0.4     # More sensitive tracking
         )
 
+class ComponentLandmarkModel:
+    """
+    Pose and/or hands without the face mesh, or the face mesh alone.
+    
+    Runs the standalone MediaPipe Pose, Hands or Face Mesh solutions
+    (Holistic is only worth it for the face together with the body, as it
+    places the face mesh from the pose) and returns their
+    output in the same shape as Holistic results (face_landmarks,
+    pose_landmarks, left_hand_landmarks, right_hand_landmarks), so the rest of
+    the pipeline does not care which graph produced it.
+    """
+    
+    def __init__(self, components, performance_mode=True):
+        self.face_model = None
+        self.pose_model = None
+        self.hands_model = None
+        if "face" in components:
+            self.face_model = mp.solutions.face_mesh.FaceMesh(
+                static_image_mode=False,
+                max_num_faces=1,
+                refine_landmarks=False,     # 468 landmarks, as Holistic reports
+                min_detection_confidence=0.6 if performance_mode else 0.5,
+                min_tracking_confidence=0.5 if performance_mode else 0.4
+            )
+        if "pose" in components:
+            self.pose_model = mp.solutions.pose.Pose(
+                static_image_mode=False,
+                model_complexity=0 if performance_mode else 1,
+                smooth_landmarks=not performance_mode,
+                enable_segmentation=False,
+                min_detection_confidence=0.6 if performance_mode else 0.5,
+                min_tracking_confidence=0.5 if performance_mode else 0.4
+            )
+        if "hands" in components:
+            self.hands_model = mp.solutions.hands.Hands(
+                static_image_mode=False,
+                max_num_hands=2,
+                model_complexity=0 if performance_mode else 1,
+                min_detection_confidence=0.6 if performance_mode else 0.5,
+                min_tracking_confidence=0.5 if performance_mode else 0.4
+            )
+    
+    def process(self, rgb_frame):
+        results = {
+            'face_landmarks': None,
+            'pose_landmarks': None,
+            'left_hand_landmarks': None,
+            'right_hand_landmarks': None
+        }
+        if self.face_model is not None:
+            faces = self.face_model.process(rgb_frame).multi_face_landmarks
+            results['face_landmarks'] = faces[0] if faces else None
+        if self.pose_model is not None:
+            results['pose_landmarks'] = self.pose_model.process(rgb_frame).pose_landmarks
+        if self.hands_model is not None:
+            hands = self.hands_model.process(rgb_frame)
+            for landmarks, handedness in zip(hands.multi_hand_landmarks or [], hands.multi_handedness or []):
+                # Hands labels assume a mirrored (selfie) image while Holistic
+                # reports the signer's own left/right, so the labels swap
+                if handedness.classification[0].label == "Right":
+                    results['left_hand_landmarks'] = landmarks
+                else:
+                    results['right_hand_landmarks'] = landmarks
+        return HolisticResultView(**results)
+    
+    def close(self):
+        if self.face_model is not None:
+            self.face_model.close()
+        if self.pose_model is not None:
+            self.pose_model.close()
+        if self.hands_model is not None:
+            self.hands_model.close()
+
+class HolisticResultView:
+    """Holistic-style attribute access over raw MediaPipe landmark lists"""
+    __slots__ = ('face_landmarks', 'pose_landmarks', 'left_hand_landmarks', 'right_hand_landmarks')
+    
+    def __init__(self, face_landmarks, pose_landmarks, left_hand_landmarks, right_hand_landmarks):
+        self.face_landmarks = face_landmarks
+        self.pose_landmarks = pose_landmarks
+        self.left_hand_landmarks = left_hand_landmarks
+        self.right_hand_landmarks = right_hand_landmarks
+
 # Store active peer connections
 pcs = set()
 
+def _landmarks_to_array(landmarks):
+    """Convert a MediaPipe landmark list into an (N, 4) float32 array of x, y, z, visibility"""
+    if not landmarks:
+        return None
+    return np.array(
+        [(landmark.x, landmark.y, landmark.z, landmark.visibility) for landmark in landmarks.landmark],
+        dtype=np.float32
+    )
+
+class HolisticResult:
+    """
+    Lightweight, picklable snapshot of a MediaPipe Holistic result.
+
+    MediaPipe returns protobuf landmark lists that cannot cross a process
+    boundary, so worker pipelines hand back plain NumPy arrays instead.
+    Each attribute is an (N, 4) float32 array or None when not detected.
+    """
+    __slots__ = ('face_landmarks', 'pose_landmarks', 'left_hand_landmarks', 'right_hand_landmarks')
+
+    def __init__(self, face_landmarks=None, pose_landmarks=None,
+                 left_hand_landmarks=None, right_hand_landmarks=None):
+        self.face_landmarks = face_landmarks
+        self.pose_landmarks = pose_landmarks
+        self.left_hand_landmarks = left_hand_landmarks
+        self.right_hand_landmarks = right_hand_landmarks
+
+    @classmethod
+    def from_mediapipe(cls, results, components=LANDMARK_COMPONENTS):
+        """Build a snapshot from raw MediaPipe Holistic results, keeping only the requested components"""
+        return cls(
+            face_landmarks=_landmarks_to_array(results.face_landmarks) if "face" in components else None,
+            pose_landmarks=_landmarks_to_array(results.pose_landmarks) if "pose" in components else None,
+            left_hand_landmarks=_landmarks_to_array(results.left_hand_landmarks) if "hands" in components else None,
+            right_hand_landmarks=_landmarks_to_array(results.right_hand_landmarks) if "hands" in components else None
+        )
+
+    def components(self):
+        """Landmark arrays in wire order: face, pose, left hand, right hand"""
+        return (self.face_landmarks, self.pose_landmarks, self.left_hand_landmarks, self.right_hand_landmarks)
+
+    def map_from_crop(self, left, top, width, height):
+        """
+        Convert landmarks detected on a crop back to full-frame normalized coordinates.
+        
+        Args:
+            left, top, width, height: Crop box, normalized to the full frame
+        """
+        for landmarks in self.components():
+            if landmarks is None:
+                continue
+            landmarks[:, 0] = left + landmarks[:, 0] * width
+            landmarks[:, 1] = top + landmarks[:, 1] * height
+            # MediaPipe's z uses roughly the same scale as x
+            landmarks[:, 2] *= width
+        return self
+
 class PerformanceMonitor:
     """
     A performance monitoring system that helps us understand how our optimizations
@@ -94,6 +455,10 @@ class PerformanceMonitor:
         self.processing_times = deque(maxlen=100)  # Store last 100 processing times
         self.resolution_stats = deque(maxlen=50)   # Track resolution changes
         self.quality_scores = deque(maxlen=100)    # Track detection quality
+        self.frame_latencies = deque(maxlen=100)   # Ingest-to-landmarks latency
+        self.dropped_frames = 0                    # Frames discarded by the ingest queue
+        self.inferred_frames = 0                   # Frames that ran full inference
+        self.reused_frames = 0                     # Frames that re-emitted a previous result
         
     def record_processing_time(self, processing_time):
         """Record how long frame processing took"""
@@ -112,6 +477,27 @@ class PerformanceMonitor:
         """Record detection quality metrics"""
         self.quality_scores.append(score)
         
+    def record_dropped_frame(self):
+        """Record a frame that was dropped because a newer one arrived"""
+        self.dropped_frames += 1
+        
+    def record_inference(self, reused):
+        """Record whether a frame ran inference or reused the previous result"""
+        if reused:
+            self.reused_frames += 1
+        else:
+            self.inferred_frames += 1
+        
+    def record_frame_latency(self, latency):
+        """Record the time from frame arrival until its landmarks were ready"""
+        self.frame_latencies.append(latency)
+        
+    def latency_percentile(self, percentile):
+        """Percentile of the recent frame latencies in seconds, None without data"""
+        if not self.frame_latencies:
+            return None
+        return float(np.percentile(self.frame_latencies, percentile))
+        
     def get_performance_summary(self):
         """Get current performance statistics"""
         if not self.processing_times:
@@ -125,52 +511,346 @@ class PerformanceMonitor:
             "max_processing_ms": max_processing_time * 1000,
             "estimated_fps": 1.0 / avg_processing_time if avg_processing_time > 0 else 0,
             "quality_score": sum(self.quality_scores) / len(self.quality_scores) if self.quality_scores else 0,
-            "resolution_changes": len(self.resolution_stats)
+            "resolution_changes": len(self.resolution_stats),
+            "avg_latency_ms": sum(self.frame_latencies) / len(self.frame_latencies) * 1000 if self.frame_latencies else 0,
+            "p50_latency_ms": (self.latency_percentile(50) or 0) * 1000,
+            "p90_latency_ms": (self.latency_percentile(90) or 0) * 1000,
+            "dropped_frames": self.dropped_frames,
+            "reuse_rate": self.reused_frames / max(1, self.reused_frames + self.inferred_frames)
         }
 
+class LatencyBudgetController:
+    """
+    Keeps a session near its latency and frame rate budget.
+    
+    Settings are a ladder of levels, from the most accurate to the cheapest,
+    each fixing the processing width, model complexity and frame skip. Once
+    a second the controller looks at the smoothed 90th percentile latency
+    and the output frame rate and moves at most one level:
+    
+    - down (cheaper) after 2 evaluations over budget,
+    - up (more accurate) after 5 evaluations comfortably inside it (p90
+      under 60% of the budget and the frame rate target met, within 5%),
+    - never within 3 seconds of the previous change.
+    
+    The asymmetric streaks and the cooldown are the hysteresis that stops it
+    from flapping between two neighbouring levels. The frame rate target
+    never exceeds the camera's own rate: a 12 fps camera cannot deliver 15.
+    
+    Args:
+        latency_budget_ms: Target for the 90th percentile latency
+        target_fps: Minimum output frame rate (0 disables the check)
+        allow_frame_skip: Whether levels with frame skipping may be used
+    """
+    
+    # (processing width, model complexity, frame skip)
+    LEVELS = (
+        (960, 1, 1),
+        (640, 1, 1),
+        (640, 0, 1),
+        (480, 0, 1),
+        (320, 0, 1),
+        (480, 0, 2),
+        (320, 0, 2),
+        (320, 0, 3),
+        (320, 0, 4),
+    )
+    DEFAULT_LEVEL = 2
+    
+    DOWNGRADE_AFTER = 2
+    UPGRADE_AFTER = 5
+    UPGRADE_HEADROOM = 0.6
+    UPGRADE_FPS_SLACK = 0.95
+    COOLDOWN = 3.0
+    SMOOTHING = 0.5
+    
+    def __init__(self, latency_budget_ms=LATENCY_BUDGET_MS, target_fps=TARGET_FPS, allow_frame_skip=False):
+        self.latency_budget = latency_budget_ms / 1000.0
+        self.target_fps = target_fps
+        self.levels = [level for level in self.LEVELS if allow_frame_skip or level[2] == 1]
+        self.level = self.DEFAULT_LEVEL
+        self.smoothed_latency = None
+        self._over_budget = 0
+        self._under_budget = 0
+        self._last_change = 0.0
+    
+    @property
+    def processing_width(self):
+        return self.levels[self.level][0]
+    
+    @property
+    def model_complexity(self):
+        return self.levels[self.level][1]
+    
+    @property
+    def frame_skip(self):
+        return self.levels[self.level][2]
+    
+    def update(self, p90_latency, output_fps, target_fps=None, now=None, input_fps=None):
+        """
+        Feed one evaluation period and possibly change level.
+        
+        Args:
+            p90_latency: 90th percentile frame latency in seconds (None = no data)
+            output_fps: Frames delivered per second over the period
+            target_fps: Frame rate target for this period (defaults to target_fps)
+            input_fps: Frames received from the camera per second (None = unknown)
+        
+        Returns:
+            dict: The new settings and the reason if the level changed, else None
+        """
+        if p90_latency is None:
+            return None
+        now = time.time() if now is None else now
+        target_fps = self.target_fps if target_fps is None else target_fps
+        if input_fps is not None and target_fps > 0:
+            target_fps = min(target_fps, input_fps)
+        self.smoothed_latency = p90_latency if self.smoothed_latency is None else (
+            self.SMOOTHING * self.smoothed_latency + (1 - self.SMOOTHING) * p90_latency
+        )
+        
+        too_slow = self.smoothed_latency > self.latency_budget
+        too_few_frames = target_fps > 0 and output_fps < 0.9 * target_fps
+        comfortable = (self.smoothed_latency < self.UPGRADE_HEADROOM * self.latency_budget and
+                       (target_fps <= 0 or output_fps >= self.UPGRADE_FPS_SLACK * target_fps))
+        
+        self._over_budget = self._over_budget + 1 if (too_slow or too_few_frames) else 0
+        self._under_budget = self._under_budget + 1 if comfortable else 0
+        
+        if now - self._last_change < self.COOLDOWN:
+            return None
+        if self._over_budget >= self.DOWNGRADE_AFTER and self.level < len(self.levels) - 1:
+            reason = "latency_over_budget" if too_slow else "fps_below_target"
+            return self._change_level(self.level + 1, reason, now)
+        if self._under_budget >= self.UPGRADE_AFTER and self.level > 0:
+            return self._change_level(self.level - 1, "within_budget", now)
+        return None
+    
+    def _change_level(self, level, reason, now):
+        self.level = level
+        self._over_budget = 0
+        self._under_budget = 0
+        self._last_change = now
+        return dict(self.get_state(), reason=reason)
+    
+    def get_state(self):
+        return {
+            'level': self.level,
+            'processing_width': self.processing_width,
+            'model_complexity': self.model_complexity,
+            'frame_skip': self.frame_skip,
+            'latency_budget_ms': self.latency_budget * 1000,
+            'smoothed_p90_latency_ms': (self.smoothed_latency or 0) * 1000
+        }
+
+class LatestFrameQueue:
+    """
+    Small bounded frame queue where the newest frame always wins.
+    
+    The ingest task keeps pushing decoded frames while inference is busy; once
+    the queue is full the oldest frame is discarded, so a slow consumer always
+    works on recent video instead of an ever-growing backlog.
+    """
+    
+    def __init__(self, maxsize=1):
+        self._frames = deque(maxlen=max(1, maxsize))
+        self._ready = asyncio.Event()
+        self._error = None
+        
+    def put(self, frame):
+        """Add a frame; returns True if an older frame was dropped to make room"""
+        dropped = len(self._frames) == self._frames.maxlen
+        self._frames.append((frame, time.time()))
+        self._ready.set()
+        return dropped
+        
+    def close(self, error):
+        """Wake the consumer with an error once the source track has ended"""
+        self._error = error
+        self._ready.set()
+        
+    async def get(self):
+        """Wait for the next frame; returns (frame, arrival_time)"""
+        while not self._frames:
+            if self._error is not None:
+                raise self._error
+            self._ready.clear()
+            await self._ready.wait()
+        return self._frames.popleft()
+
 class HolisticLandmarksTracker:
     """
     Enhanced landmarks tracker with quality assessment.
     
     This class not only stores landmark history but also evaluates
     the quality of detections to help us monitor accuracy.
+    
+    History lives in preallocated NumPy ring buffers: one (TOTAL_LANDMARKS, 4)
+    float32 slab per frame (face, pose, left hand, right hand stacked in wire
+    order), a presence mask per component, timestamps, frame ids and quality
+    scores. Every frame is written twice, at slot i and i + history_size, so
+    any window of recent frames is a single contiguous slice and can be
+    returned as a view instead of a copy.
     """
     
-    def __init__(self):
-        # Buffer to store recent frames of landmarks
-        self.landmarks_history = deque(maxlen=30)  # Store up to 30 frames (1 second at 30fps)
+    def __init__(self, history_size=HISTORY_FRAMES):
+        self.history_size = max(1, history_size)
+        capacity = 2 * self.history_size
+        self._landmarks = np.zeros((capacity, TOTAL_LANDMARKS, VALUES_PER_LANDMARK), dtype=np.float32)
+        self._presence = np.zeros((capacity, len(COMPONENTS)), dtype=bool)
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._frame_ids = np.zeros(capacity, dtype=np.int64)
+        self._quality_scores = np.full(capacity, np.nan, dtype=np.float64)
+        self._flags = np.zeros(capacity, dtype=np.uint8)  # landmark_protocol FLAG_* bits
+        self._next_slot = 0   # Slot the next frame goes into, in [0, history_size)
+        self._length = 0      # Number of valid frames in the history
         self.frame_counter = 0
         self.quality_threshold = 0.7  # Minimum quality score to consider detection reliable
+    
+    def __len__(self):
+        return self._length
         
-    def add_landmarks(self, results, quality_score=None):
+    def add_landmarks(self, results, quality_score=None, timestamp=None, flags=0, frame_id=None):
         """
         Add the current frame's landmarks to the history with quality assessment.
         
         Args:
-            results: MediaPipe detection results
+            results: HolisticResult snapshot of the detection
             quality_score: Optional quality assessment score
+            timestamp: Capture time of the frame (defaults to now)
+            flags: FLAG_REUSED / FLAG_PREDICTED when no fresh inference ran
+            frame_id: Id to store (defaults to the tracker's own frame count);
+                must increase from frame to frame
         """
         if not results:
             return None
-            
-        # Extract all landmarks into a standardized format
+        
+        if timestamp is None:
+            timestamp = time.time()
+        if frame_id is None:
+            frame_id = self.frame_counter
+        slot = self._next_slot
+        row = self._landmarks[slot]
+        for bit, (name, _) in enumerate(COMPONENTS):
+            landmarks = getattr(results, name)
+            present = landmarks is not None
+            self._presence[slot, bit] = present
+            if present:
+                row[COMPONENT_SLICES[name]] = landmarks
+            else:
+                row[COMPONENT_SLICES[name]] = 0.0
+        self._timestamps[slot] = timestamp
+        self._frame_ids[slot] = frame_id
+        self._quality_scores[slot] = np.nan if quality_score is None else quality_score
+        self._flags[slot] = flags
+        
+        # Mirror into the second half so windows never wrap around
+        mirror = slot + self.history_size
+        self._landmarks[mirror] = row
+        self._presence[mirror] = self._presence[slot]
+        self._timestamps[mirror] = timestamp
+        self._frame_ids[mirror] = frame_id
+        self._quality_scores[mirror] = self._quality_scores[slot]
+        self._flags[mirror] = flags
+        
         landmarks_frame = {
-            'frame_id': self.frame_counter,
-            'timestamp': time.time(),
-            'quality_score': quality_score,
-            'face_landmarks': self._process_face_landmarks(results.face_landmarks),
-            'pose_landmarks': self._process_pose_landmarks(results.pose_landmarks),
-            'left_hand_landmarks': self._process_hand_landmarks(results.left_hand_landmarks),
-            'right_hand_landmarks': self._process_hand_landmarks(results.right_hand_landmarks)
+            'frame_id': frame_id,
+            'timestamp': timestamp,
+            'quality_score': quality_score
         }
         
-        # Add to history
-        self.landmarks_history.append(landmarks_frame)
+        self._next_slot = (slot + 1) % self.history_size
+        self._length = min(self._length + 1, self.history_size)
         self.frame_counter += 1
         
         return landmarks_frame
     
-    def assess_detection_quality(self, results):
+    def get_window(self, num_frames=None):
+        """
+        Zero-copy view of the most recent frames, oldest first.
+        
+        Returns:
+            dict: landmarks (n, TOTAL_LANDMARKS, 4), presence (n, 4),
+                timestamps (n,), frame_ids (n,) and quality_scores (n,) arrays.
+                All of them are views into the ring buffer, so callers must
+                copy anything they want to keep past the next add_landmarks().
+        """
+        count = self._length if num_frames is None else max(0, min(num_frames, self._length))
+        # Slot of the newest frame, addressed in the mirrored half
+        end = (self._next_slot - 1) % self.history_size + self.history_size + 1
+        window = slice(end - count, end)
+        return {
+            'landmarks': self._landmarks[window],
+            'presence': self._presence[window],
+            'timestamps': self._timestamps[window],
+            'frame_ids': self._frame_ids[window],
+            'quality_scores': self._quality_scores[window],
+            'flags': self._flags[window]
+        }
+    
+    def select(self, first_frame_id=None, last_frame_id=None, start_time=None, end_time=None):
+        """
+        Zero-copy view of the frames inside a frame id and/or time range.
+        
+        Frame ids and timestamps only grow, so both bounds are binary
+        searches over the window; any bound left as None is open.
+        
+        Returns:
+            dict: Same arrays as get_window(), restricted to the range
+        """
+        window = self.get_window()
+        lo, hi = 0, len(window['frame_ids'])
+        if first_frame_id is not None:
+            lo = max(lo, int(np.searchsorted(window['frame_ids'], first_frame_id, side="left")))
+        if last_frame_id is not None:
+            hi = min(hi, int(np.searchsorted(window['frame_ids'], last_frame_id, side="right")))
+        if start_time is not None:
+            lo = max(lo, int(np.searchsorted(window['timestamps'], start_time, side="left")))
+        if end_time is not None:
+            hi = min(hi, int(np.searchsorted(window['timestamps'], end_time, side="right")))
+        hi = max(lo, hi)
+        return {key: values[lo:hi] for key, values in window.items()}
+    
+    def predict_landmarks(self, timestamp, max_extrapolation=1.0):
+        """
+        Estimate landmarks at timestamp from the two most recent inferred frames.
+        
+        Each component seen in both frames is extrapolated linearly; components
+        seen only in the latest frame are held. Extrapolation is capped at
+        max_extrapolation times the gap between the two frames so a stale
+        velocity cannot fling landmarks off screen.
+        
+        Returns:
+            HolisticResult or None when there is no inferred frame yet
+        """
+        window = self.get_window()
+        inferred = np.flatnonzero((window['flags'] & FLAG_PREDICTED) == 0)
+        if len(inferred) == 0:
+            return None
+        
+        latest = inferred[-1]
+        landmarks = window['landmarks'][latest].copy()
+        presence = window['presence'][latest]
+        
+        if len(inferred) >= 2:
+            previous = inferred[-2]
+            gap = window['timestamps'][latest] - window['timestamps'][previous]
+            if gap > 0:
+                ratio = min((timestamp - window['timestamps'][latest]) / gap, max_extrapolation)
+                moving = presence & window['presence'][previous]
+                for bit, (name, _) in enumerate(COMPONENTS):
+                    if moving[bit]:
+                        rows = COMPONENT_SLICES[name]
+                        velocity = landmarks[rows, :3] - window['landmarks'][previous, rows, :3]
+                        landmarks[rows, :3] += velocity * ratio
+        
+        return HolisticResult(**{
+            name: landmarks[COMPONENT_SLICES[name]] if presence[bit] else None
+            for bit, (name, _) in enumerate(COMPONENTS)
+        })
+    
+    @staticmethod
+    def assess_detection_quality(results):
         """
         Evaluate the quality of current detection results.
         
@@ -183,76 +863,1229 @@ class HolisticLandmarksTracker:
         quality_components = []
         
         # Assess pose detection quality
-        if results.pose_landmarks:
+        if results.pose_landmarks is not None:
             # Calculate average visibility of key pose landmarks
             key_pose_indices = [11, 12, 13, 14, 15, 16]  # Shoulders, elbows, wrists
-            if len(results.pose_landmarks.landmark) > max(key_pose_indices):
-                pose_visibility = sum(
-                    results.pose_landmarks.landmark[i].visibility 
-                    for i in key_pose_indices
-                ) / len(key_pose_indices)
+            if len(results.pose_landmarks) > max(key_pose_indices):
+                pose_visibility = float(results.pose_landmarks[key_pose_indices, 3].mean())
                 quality_components.append(pose_visibility)
         
         # Assess hand detection quality (binary - either detected or not)
-        if results.left_hand_landmarks:
+        if results.left_hand_landmarks is not None:
             quality_components.append(1.0)
-        if results.right_hand_landmarks:
+        if results.right_hand_landmarks is not None:
             quality_components.append(1.0)
             
         # Assess face detection quality
-        if results.face_landmarks:
+        if results.face_landmarks is not None:
             quality_components.append(0.8)  # Face detection contributes to overall quality
         
-        # Return average quality score
-        return sum(quality_components) / len(quality_components) if quality_components else 0.0
+        # Return average quality score
+        return sum(quality_components) / len(quality_components) if quality_components else 0.0
+    
+    def _process_face_landmarks(self, landmarks):
+        """Process face landmarks into a list format"""
+        if landmarks is None:
+            return None
+            
+        return [
+            {'x': x, 'y': y, 'z': z, 'visibility': visibility}
+            for x, y, z, visibility in landmarks.tolist()
+        ]
+    
+    def _process_pose_landmarks(self, landmarks):
+        """Process pose landmarks into a list format"""
+        if landmarks is None:
+            return None
+            
+        return [
+            {'x': x, 'y': y, 'z': z, 'visibility': visibility}
+            for x, y, z, visibility in landmarks.tolist()
+        ]
+    
+    def _process_hand_landmarks(self, landmarks):
+        """Process hand landmarks into a list format"""
+        if landmarks is None:
+            return None
+            
+        return [
+            {'x': x, 'y': y, 'z': z}
+            for x, y, z, _ in landmarks.tolist()
+        ]
+    
+    def get_recent_frames(self, num_frames=10):
+        """
+        Get the most recent frames as (frame_id, timestamp, quality_score, components)
+        tuples, where components are per-component array views (or None), ready
+        for landmark_protocol.encode_batch
+        """
+        return self.window_frames(self.get_window(num_frames))
+    
+    @staticmethod
+    def window_frames(window, components=LANDMARK_COMPONENTS, step=1):
+        """
+        Turn window arrays (from get_window, select or a recording) into
+        (frame_id, timestamp, quality_score, components) tuples.
+        
+        Args:
+            window: Dict of landmark arrays
+            components: Components to include; the others are reported as None
+            step: Keep every Nth frame
+        """
+        wanted = [
+            (name == 'face_landmarks' and 'face' in components) or
+            (name == 'pose_landmarks' and 'pose' in components) or
+            (name.endswith('hand_landmarks') and 'hands' in components)
+            for name, _ in COMPONENTS
+        ]
+        frames = []
+        for i in range(0, len(window['frame_ids']), step):
+            quality_score = float(window['quality_scores'][i])
+            frames.append((
+                int(window['frame_ids'][i]),
+                float(window['timestamps'][i]),
+                None if np.isnan(quality_score) else quality_score,
+                tuple(
+                    window['landmarks'][i, COMPONENT_SLICES[name]]
+                    if wanted[bit] and window['presence'][i, bit] else None
+                    for bit, (name, _) in enumerate(COMPONENTS)
+                )
+            ))
+        return frames
+    
+    def get_recent_landmarks(self, num_frames=10):
+        """Get the most recent frames of landmarks in the standardized list format"""
+        return [self._format_frame(*frame) for frame in self.get_recent_frames(num_frames)]
+    
+    def _format_frame(self, frame_id, timestamp, quality_score, components):
+        """Expand a history entry into per-landmark dicts for JSON clients"""
+        face, pose, left_hand, right_hand = components
+        return {
+            'frame_id': frame_id,
+            'timestamp': timestamp,
+            'quality_score': quality_score,
+            'face_landmarks': self._process_face_landmarks(face),
+            'pose_landmarks': self._process_pose_landmarks(pose),
+            'left_hand_landmarks': self._process_hand_landmarks(left_hand),
+            'right_hand_landmarks': self._process_hand_landmarks(right_hand)
+        }
+
+class LandmarkOverlayRenderer:
+    """
+    Vectorized landmark overlay renderer.
+    
+    mp_drawing.draw_landmarks loops over every connection and landmark in
+    Python. Here the connection index arrays are built once, each landmark set
+    is converted to pixel coordinates in a single NumPy operation, and all
+    segments of a component are drawn with one cv2.polylines call.
+    """
+    
+    # (connection colour, line thickness, point colour, point size) in BGR
+    STYLES = {
+        'face_landmarks': ((192, 192, 192), 1, None, 0),
+        'pose_landmarks': ((224, 224, 224), 2, (0, 138, 255), 6),
+        'left_hand_landmarks': ((48, 255, 48), 2, (0, 0, 255), 5),
+        'right_hand_landmarks': ((255, 160, 48), 2, (0, 0, 255), 5),
+    }
+    # Pose landmarks below this visibility are not drawn (same as mp_drawing)
+    VISIBILITY_THRESHOLD = 0.5
+    
+    def __init__(self):
+        self.connections = {
+            'face_landmarks': self._connection_array(mp.solutions.holistic.FACEMESH_CONTOURS),
+            'pose_landmarks': self._connection_array(mp.solutions.holistic.POSE_CONNECTIONS),
+            'left_hand_landmarks': self._connection_array(mp.solutions.holistic.HAND_CONNECTIONS),
+            'right_hand_landmarks': self._connection_array(mp.solutions.holistic.HAND_CONNECTIONS),
+        }
+    
+    @staticmethod
+    def _connection_array(connections):
+        return np.array(sorted(connections), dtype=np.intp)
+    
+    def draw(self, image, results):
+        """
+        Draw every detected component of a HolisticResult onto image in place.
+        
+        Landmarks are normalized, so the image can be any resolution.
+        """
+        height, width = image.shape[:2]
+        scale = np.array([width, height], dtype=np.float32)
+        
+        for name, (line_color, thickness, point_color, point_size) in self.STYLES.items():
+            landmarks = getattr(results, name)
+            if landmarks is None:
+                continue
+            
+            # Pixel coordinates for the whole component in one operation
+            points = np.rint(landmarks[:, :2] * scale).astype(np.int32)
+            connections = self.connections[name]
+            marked_points = points
+            if name == 'pose_landmarks':
+                visible = landmarks[:, 3] >= self.VISIBILITY_THRESHOLD
+                connections = connections[visible[connections[:, 0]] & visible[connections[:, 1]]]
+                marked_points = points[visible]
+            
+            # (K, 2, 2) array of segments, drawn with a single call
+            if len(connections):
+                cv2.polylines(image, points[connections], False, line_color, thickness)
+            
+            # Zero-length segments render as round dots of the given size
+            if point_color is not None and len(marked_points):
+                cv2.polylines(image, np.stack([marked_points, marked_points], axis=1), False, point_color, point_size)
+
+class PoseRegionOfInterest:
+    """
+    Upper-body crop box that follows the signer between frames.
+    
+    Uses the previous frame's nose, shoulder, elbow and wrist landmarks to
+    place a padded box around the signing space, so MediaPipe spends its
+    pixels on the person instead of the background. Whenever the pose is
+    lost the box is cleared and the next frame is processed at full size.
+    """
+    
+    # MediaPipe pose indices: nose, shoulders, elbows, wrists
+    KEY_POINTS = [0, 11, 12, 13, 14, 15, 16]
+    LEFT_SHOULDER = 11
+    RIGHT_SHOULDER = 12
+    
+    def __init__(self, padding=1.0, smoothing=0.5, min_visibility=0.3, max_area=0.8):
+        self.padding = padding                # Padding in shoulder widths (hands reach past the wrists)
+        self.smoothing = smoothing            # Weight of the previous box, damps jitter
+        self.min_visibility = min_visibility
+        self.max_area = max_area              # Larger boxes are not worth cropping
+        self.box = None                       # (left, top, right, bottom), normalized
+    
+    def update(self, pose_landmarks):
+        """Move the box to follow the latest full-frame pose landmarks"""
+        if pose_landmarks is None:
+            self.box = None
+            return
+        
+        key_points = pose_landmarks[self.KEY_POINTS]
+        visible = key_points[key_points[:, 3] >= self.min_visibility, :2]
+        if len(visible) < 3:
+            self.box = None
+            return
+        
+        shoulder_width = abs(pose_landmarks[self.LEFT_SHOULDER, 0] - pose_landmarks[self.RIGHT_SHOULDER, 0])
+        pad = max(shoulder_width * self.padding, 0.05)
+        left, top = visible.min(axis=0) - pad
+        right, bottom = visible.max(axis=0) + pad
+        box = np.clip([left, top, right, bottom], 0.0, 1.0)
+        
+        if self.box is not None:
+            box = self.smoothing * np.asarray(self.box) + (1 - self.smoothing) * box
+        self.box = tuple(float(v) for v in box)
+    
+    def pixel_box(self, width, height):
+        """Current box in pixels as (x0, y0, x1, y1), or None to process the full frame"""
+        if self.box is None:
+            return None
+        left, top, right, bottom = self.box
+        if (right - left) * (bottom - top) > self.max_area:
+            return None
+        x0, y0 = int(left * width), int(top * height)
+        x1, y1 = int(np.ceil(right * width)), int(np.ceil(bottom * height))
+        if x1 - x0 < 32 or y1 - y0 < 32:
+            return None
+        return x0, y0, x1, y1
+
+class HandRefiner:
+    """
+    Second, full-resolution pass for the hands.
+
+    The body is found at the (low) processing width; each hand is then
+    detected again on a crop around its wrist taken from the full-size
+    frame, so a hand that is only a few dozen pixels wide at the processing
+    width gets up to crop_size pixels. The crop is placed with the pose's
+    wrist, index and pinky landmarks and sized from the hand span and the
+    shoulder width. Every side has its own hands model, and its box only
+    moves once the hand drifts out of the middle of it, which lets MediaPipe
+    keep tracking instead of re-running palm detection on every frame.
+
+    A refined hand replaces the one from the first pass; when the crop does
+    not yield a hand near the pose wrist the first pass result is kept.
+    Without a tracked hand every crop runs palm detection, the expensive
+    part, so after a miss a side is only tried again every retry_frames
+    frames (hands resting out of view cost next to nothing).
+    """
+
+    # MediaPipe pose indices per side: wrist, pinky, index (Holistic's left
+    # hand belongs to the pose's left wrist)
+    HAND_POINTS = {'left_hand_landmarks': (15, 17, 19), 'right_hand_landmarks': (16, 18, 20)}
+    LEFT_SHOULDER = 11
+    RIGHT_SHOULDER = 12
+
+    def __init__(self, performance_mode=True, crop_size=HAND_CROP_SIZE, min_visibility=0.3,
+                 span_padding=3.0, shoulder_fraction=0.6, retry_frames=4):
+        self.performance_mode = performance_mode
+        self.crop_size = crop_size                  # Largest side of a crop handed to the model
+        self.min_visibility = min_visibility
+        self.span_padding = span_padding            # Box side in wrist-to-knuckles distances
+        self.shoulder_fraction = shoulder_fraction  # Smallest box side in shoulder widths
+        self.retry_frames = retry_frames            # Frames between attempts on a side that found no hand
+        self.models = {}
+        self.boxes = {}                             # Pixel box per side, kept while the hand stays inside
+        self._skip = {}                             # Frames each side still sits out after a miss
+
+    def _target_box(self, pose, side, width, height):
+        """Square pixel box around one hand (None when the pose wrist is not visible)"""
+        points = pose[list(self.HAND_POINTS[side])]
+        if points[0, 3] < self.min_visibility:
+            return None
+        pixels = points[:, :2] * (width, height)
+        wrist, knuckles = pixels[0], pixels[1:].mean(axis=0)
+        shoulders = pose[[self.LEFT_SHOULDER, self.RIGHT_SHOULDER], :2] * (width, height)
+        side_length = max(
+            self.span_padding * np.linalg.norm(knuckles - wrist),
+            self.shoulder_fraction * np.linalg.norm(shoulders[0] - shoulders[1]),
+            64
+        )
+        center = (wrist + knuckles) / 2
+        return center, min(side_length, width, height)
+
+    def _box(self, side, target, width, height):
+        """Keep the previous box while the hand center stays in its middle half and its size fits"""
+        center, side_length = target
+        previous = self.boxes.get(side)
+        if previous is not None:
+            x0, y0, x1, y1 = previous
+            size = x1 - x0
+            inner = size / 4
+            if (x0 + inner <= center[0] <= x1 - inner and y0 + inner <= center[1] <= y1 - inner
+                    and 0.8 <= side_length / size <= 1.25):
+                return previous
+        half = side_length / 2
+        x0 = int(np.clip(center[0] - half, 0, width - side_length))
+        y0 = int(np.clip(center[1] - half, 0, height - side_length))
+        box = (x0, y0, x0 + int(side_length), y0 + int(side_length))
+        self.boxes[side] = box
+        return box
+
+    def _model(self, side):
+        model = self.models.get(side)
+        if model is None:
+            model = self.models[side] = _model_pool.checkout(performance_mode=self.performance_mode,
+                                                             components=("hands",))
+        return model
+
+    def refine(self, img, results, buffers):
+        """
+        Replace the hands in results with ones detected on full-resolution crops.
+
+        Args:
+            img: Full-size I420Frame
+            results: HolisticResult in full-frame coordinates (needs the pose)
+            buffers: Conversion buffers of the calling pipeline
+
+        Returns:
+            int: Hands that were refined
+        """
+        pose = results.pose_landmarks
+        if pose is None:
+            self.boxes.clear()
+            return 0
+        refined = 0
+        for side in self.HAND_POINTS:
+            target = self._target_box(pose, side, img.width, img.height)
+            if target is None:
+                self.boxes.pop(side, None)
+                continue
+            if self._skip.get(side, 0) > 0:
+                self._skip[side] -= 1
+                continue
+            x0, y0, x1, y1 = box = self._box(side, target, img.width, img.height)
+            scale = min(1.0, self.crop_size / (x1 - x0))
+            crop = img.convert((int((x1 - x0) * scale), int((y1 - y0) * scale)), cv2.COLOR_YUV2RGB_I420,
+                               box, buffers, "hand")
+            found = HolisticResult.from_mediapipe(self._model(side).process(crop), ("hands",))
+            found.map_from_crop(x0 / img.width, y0 / img.height, (x1 - x0) / img.width, (y1 - y0) / img.height)
+
+            # The crop can hold both hands; take the one whose wrist is closest
+            # to this side's pose wrist, if it is close enough
+            wrist = pose[self.HAND_POINTS[side][0], :2]
+            candidates = [hand for hand in (found.left_hand_landmarks, found.right_hand_landmarks) if hand is not None]
+            hand = min(candidates, key=lambda hand: np.linalg.norm(hand[0, :2] - wrist), default=None)
+            if hand is None or np.linalg.norm((hand[0, :2] - wrist) * (img.width, img.height)) > (x1 - x0) / 2:
+                self._skip[side] = self.retry_frames - 1
+                continue
+            setattr(results, side, hand)
+            refined += 1
+        return refined
+
+    def close(self):
+        """Hand the models back to the pool"""
+        for model in self.models.values():
+            _model_pool.checkin(model, self.performance_mode, ("hands",))
+        self.models.clear()
+        self.boxes.clear()
+        self._skip.clear()
+
+class MotionGate:
+    """
+    Cheap change detector that decides when inference can be skipped.
+    
+    Each frame is shrunk to a tiny grayscale thumbnail and compared with the
+    thumbnail of the last frame that actually ran inference. If the mean
+    absolute difference stays below the threshold the scene is considered
+    static and the previous landmarks are reused - but never for longer than
+    refresh_interval seconds, which bounds how stale a result can get.
+    """
+    
+    THUMBNAIL_SIZE = (64, 36)
+    
+    def __init__(self, threshold=MOTION_THRESHOLD, refresh_interval=MOTION_REFRESH_INTERVAL):
+        self.threshold = threshold
+        self.refresh_interval = refresh_interval
+        self._reference = None
+        self._reference_time = 0.0
+        self._candidate = None
+    
+    def should_reuse(self, img):
+        """Returns True if img (BGR, or a luma plane) is close enough to the last inferred frame"""
+        thumbnail = cv2.resize(img, self.THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+        self._candidate = thumbnail if thumbnail.ndim == 2 else cv2.cvtColor(thumbnail, cv2.COLOR_BGR2GRAY)
+        return (
+            self._reference is not None
+            and time.time() - self._reference_time < self.refresh_interval
+            and cv2.absdiff(self._candidate, self._reference).mean() < self.threshold
+        )
+    
+    def mark_inferred(self):
+        """The frame last passed to should_reuse() ran inference - make it the new reference"""
+        self._reference = self._candidate
+        self._reference_time = time.time()
+
+def _reusable_buffer(buffers, name, shape):
+    """
+    Contiguous uint8 array of the given shape backed by buffers[name].
+    
+    The backing array only ever grows, so sizes that change from frame to
+    frame (region of interest crops) do not allocate every time.
+    """
+    size = int(np.prod(shape))
+    flat = buffers.get(name)
+    if flat is None or flat.size < size:
+        flat = buffers[name] = np.empty(size, np.uint8)
+    return flat[:size].reshape(shape)
+
+class I420Frame:
+    """
+    A decoded 4:2:0 frame as zero-copy views of its Y, U and V planes.
+    
+    WebRTC decoders output YUV 4:2:0. Turning that into a full-size BGR
+    array, resizing it and converting it again to RGB reads and writes the
+    whole frame three times; convert() instead scales the planes straight
+    to the size that is needed and converts colour once, at that size, with
+    OpenCV writing into buffers the caller keeps from frame to frame.
+    """
+    
+    def __init__(self, y, u, v):
+        self.y, self.u, self.v = y, u, v
+        self.height, self.width = y.shape
+    
+    @classmethod
+    def from_av(cls, frame):
+        """Wrap the planes of a PyAV frame (converted to yuv420p first if it is not 4:2:0)"""
+        if frame.format.name not in ("yuv420p", "yuvj420p"):
+            frame = frame.reformat(format="yuv420p")
+        return cls(*(
+            np.frombuffer(plane, np.uint8).reshape(plane.height, plane.line_size)[:, :plane.width]
+            for plane in frame.planes
+        ))
+    
+    @classmethod
+    def from_buffer(cls, buffer, width, height):
+        """Planes packed back to back in buffer, as SharedFrameSlot writes them"""
+        chroma_width, chroma_height = (width + 1) // 2, (height + 1) // 2
+        data = np.frombuffer(buffer, np.uint8, count=width * height + 2 * chroma_width * chroma_height)
+        luma = width * height
+        chroma = chroma_width * chroma_height
+        return cls(
+            data[:luma].reshape(height, width),
+            data[luma:luma + chroma].reshape(chroma_height, chroma_width),
+            data[luma + chroma:].reshape(chroma_height, chroma_width)
+        )
+    
+    @property
+    def nbytes(self):
+        return self.y.size + self.u.size + self.v.size
+    
+    def convert(self, size, code, box=None, buffers=None, name="frame"):
+        """
+        Scale the frame (or a region of it) to size and convert it with a
+        cv2.COLOR_YUV2*_I420 code, in a single pass over the source pixels.
+        
+        Args:
+            size: Output (width, height), rounded down to even numbers
+            code: cv2.COLOR_YUV2RGB_I420, cv2.COLOR_YUV2BGR_I420, ...
+            box: Optional (x0, y0, x1, y1) pixel region of the frame
+            buffers: Dict of reusable buffers (see _reusable_buffer)
+            name: Buffer name prefix; results with different names never share memory
+        
+        Returns:
+            ndarray: (height, width, 3) image, backed by buffers when given
+        """
+        buffers = {} if buffers is None else buffers
+        width, height = max(2, size[0] // 2 * 2), max(2, size[1] // 2 * 2)
+        y, u, v = self.y, self.u, self.v
+        if box is not None:
+            x0, y0, x1, y1 = box
+            y = y[y0:y1, x0:x1]
+            u = u[y0 // 2:(y1 + 1) // 2, x0 // 2:(x1 + 1) // 2]
+            v = v[y0 // 2:(y1 + 1) // 2, x0 // 2:(x1 + 1) // 2]
+        
+        # I420 layout: full-size Y rows, then the quarter-size U and V planes
+        i420 = _reusable_buffer(buffers, name + ".i420", (height * 3 // 2, width))
+        flat = i420.reshape(-1)
+        luma = width * height
+        chroma_size = (width // 2, height // 2)
+        cv2.resize(y, (width, height), dst=i420[:height], interpolation=cv2.INTER_AREA)
+        cv2.resize(u, chroma_size, dst=flat[luma:luma * 5 // 4].reshape(height // 2, width // 2),
+                   interpolation=cv2.INTER_AREA)
+        cv2.resize(v, chroma_size, dst=flat[luma * 5 // 4:].reshape(height // 2, width // 2),
+                   interpolation=cv2.INTER_AREA)
+        
+        output = _reusable_buffer(buffers, name + ".out", (height, width, 3))
+        return cv2.cvtColor(i420, code, dst=output)
+
+class SharedI420Frame:
+    """Picklable reference to a frame in a SharedFrameSlot"""
+    
+    __slots__ = ("name", "width", "height")
+    
+    def __init__(self, name, width, height):
+        self.name = name
+        self.width = width
+        self.height = height
+    
+    def __getstate__(self):
+        return self.name, self.width, self.height
+    
+    def __setstate__(self, state):
+        self.name, self.width, self.height = state
+
+class SharedFrameSlot:
+    """
+    Shared memory that carries one session's frames to a worker process.
+    
+    Sending a frame to a process pool pickles it, which copies it several
+    times on both sides. Here the planes are copied once into a segment the
+    worker maps, and only a SharedI420Frame (segment name and frame size)
+    goes through the pipe. A session has at most one frame in flight, so a
+    single segment is enough; it is replaced when a larger frame arrives.
+    """
+    
+    def __init__(self):
+        self._memory = None
+    
+    def put(self, frame):
+        """Copy an I420Frame into the segment and return its reference"""
+        if self._memory is None or self._memory.size < frame.nbytes:
+            self.close()
+            self._memory = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+        target = I420Frame.from_buffer(self._memory.buf, frame.width, frame.height)
+        for source, destination in ((frame.y, target.y), (frame.u, target.u), (frame.v, target.v)):
+            np.copyto(destination, source)
+        del target
+        return SharedI420Frame(self._memory.name, frame.width, frame.height)
+    
+    def close(self):
+        if self._memory is not None:
+            self._memory.close()
+            self._memory.unlink()
+            self._memory = None
+
+class HolisticModelPool:
+    """
+    Initialized MediaPipe models shared by the sessions of one worker.
+    
+    Building a graph and running its first inference (which loads the TFLite
+    models) costs a few hundred milliseconds, so sessions check models out
+    of this pool instead of creating their own, and hand them back when the
+    peer disconnects. Models are keyed by (performance_mode, components) as
+    those are fixed when the graph is built.
+    
+    Returned models get a blank frame first: nothing is detected in it, which
+    drops MediaPipe's tracked landmarks and smoothing state so the next
+    session starts from a fresh detection.
+    """
+    
+    # Frame used to warm and reset models
+    DUMMY_FRAME_SIZE = (256, 256)
+    
+    def __init__(self):
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.capacity = 0
+        self.created = 0
+        self.checkouts = 0
+        self.hits = 0
+    
+    def _blank_frame(self):
+        width, height = self.DUMMY_FRAME_SIZE
+        return np.zeros((height, width, 3), dtype=np.uint8)
+    
+    def warm(self, count, performance_mode=True, components=LANDMARK_COMPONENTS):
+        """Create count models, run a dummy frame through each and park them as idle"""
+        key = (performance_mode, components)
+        for _ in range(count):
+            model = create_holistic_model(performance_mode=performance_mode, components=components)
+            model.process(self._blank_frame())
+            with self._lock:
+                self.capacity += 1
+                self.created += 1
+                self._idle.setdefault(key, []).append(model)
+        logger.info(f"Warmed {count} model(s) (components: {', '.join(components)})")
+    
+    def checkout(self, codec_name=None, performance_mode=True, components=LANDMARK_COMPONENTS):
+        """Take an idle model for a session, creating one if none is available"""
+        key = (performance_mode, components)
+        with self._lock:
+            self.checkouts += 1
+            idle = self._idle.get(key)
+            if idle:
+                self.hits += 1
+                return idle.pop()
+            self.created += 1
+        return create_holistic_model(codec_name, performance_mode=performance_mode, components=components)
+    
+    def checkin(self, model, performance_mode=True, components=LANDMARK_COMPONENTS):
+        """Reset a session's model and keep it for the next one (or close it if the pool is full)"""
+        key = (performance_mode, components)
+        with self._lock:
+            keep = self.capacity > 0 and len(self._idle.get(key, ())) < self.capacity
+        if not keep:
+            model.close()
+            return
+        model.process(self._blank_frame())
+        with self._lock:
+            self._idle.setdefault(key, []).append(model)
+    
+    def get_status(self):
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "idle": sum(len(models) for models in self._idle.values()),
+                "created": self.created,
+                "checkouts": self.checkouts,
+                "hits": self.hits
+            }
+
+# Model pool of this worker. Thread lanes share it; every worker process
+# has its own.
+_model_pool = HolisticModelPool()
+
+def _warm_model_pool(count):
+    """Executor entry point: warm count models in this worker's pool"""
+    _model_pool.warm(count)
+
+def _model_pool_status():
+    """Executor entry point: status of this worker's pool"""
+    return _model_pool.get_status()
+
+class HolisticSessionPipeline:
+    """
+    Per-session processing pipeline that lives inside an inference worker.
+    
+    Everything that touches pixels happens here - resizing, colour conversion,
+    MediaPipe inference and overlay drawing - so the event loop only has to
+    await the result. Each pipeline checks a Holistic model out of the
+    worker's HolisticModelPool for the session's lifetime, which keeps
+    MediaPipe's tracking state tied to a single video stream.
+    """
+    
+    # Overlay renderer shared by every pipeline in this worker; it only holds
+    # the precomputed connection arrays
+    _renderer = None
+    
+    def __init__(self, codec_name=None, performance_mode=True, components=LANDMARK_COMPONENTS,
+                 hand_refinement=False):
+        self.codec_name = codec_name
+        self.performance_mode = performance_mode
+        self.components = components
+        self._select_models(hand_refinement)
+        logger.info(f"Checked out holistic model for codec: {codec_name or 'unknown'} "
+                    f"(components: {', '.join(components)}"
+                    f"{', hand refinement' if self.hand_refiner is not None else ''})")
+        if HolisticSessionPipeline._renderer is None:
+            HolisticSessionPipeline._renderer = LandmarkOverlayRenderer()
+        self.region_of_interest = PoseRegionOfInterest()
+        self.motion_gate = MotionGate()
+        self.last_results = None
+        self.last_quality_score = 0.0
+        self._stage_times = {}
+        # Conversion buffers reused from frame to frame
+        self._buffers = {}
+    
+    def _select_models(self, hand_refinement):
+        """
+        Check out the first pass model and, with hand refinement, the
+        HandRefiner. Refinement needs the pose to place its crops; without
+        the face the first pass leaves the hands to the refiner entirely.
+        """
+        self.hand_refinement = hand_refinement
+        self.hand_refiner = None
+        self.model_components = self.components
+        if hand_refinement and "pose" in self.components and "hands" in self.components:
+            self.hand_refiner = HandRefiner(self.performance_mode)
+            if "face" not in self.components:
+                self.model_components = tuple(c for c in self.components if c != "hands")
+        self.holistic_model = _model_pool.checkout(self.codec_name, self.performance_mode, self.model_components)
+    
+    def _release_models(self):
+        _model_pool.checkin(self.holistic_model, self.performance_mode, self.model_components)
+        if self.hand_refiner is not None:
+            self.hand_refiner.close()
+    
+    def process(self, img, options):
+        """
+        Run inference on a frame and render the visualization.
+        
+        Args:
+            img: Full-size I420Frame; it is only ever converted at the
+                processing and overlay sizes
+            options: Per-frame settings chosen by the video track (processing
+                size, scale factor and the values shown in the debug overlay).
+                If options['results'] is set, inference is skipped and those
+                landmarks are rendered instead.
+            
+        Returns:
+            dict: results (HolisticResult), quality_score, processing_time,
+                crop_box (pixel region that was processed, None for the full
+                frame), reused (True if inference was skipped on a static
+                frame), viz_frame (None when options['render'] is False) and
+                stage_times (seconds per stage: color, which includes scaling,
+                inference, hands (refinement) and draw)
+        """
+        processing_start = time.time()
+        self._stage_times = {}
+        
+        if options.get('results') is not None:
+            # Landmarks supplied by the track (frame skipping) - only render them
+            return self._finish(img, options['results'], options['quality_score'], None, False,
+                                processing_start, options)
+        
+        motion_gating = options.get('motion_gating')
+        if motion_gating and self.motion_gate.should_reuse(img.y) and self.last_results is not None:
+            # Static scene - re-emit the previous landmarks on the current frame
+            return self._finish(img, self.last_results, self.last_quality_score, None, True,
+                                processing_start, options)
+        
+        crop_box = None
+        if options.get('roi'):
+            crop_box = self.region_of_interest.pixel_box(img.width, img.height)
+        
+        # Scaling and the conversion to RGB happen in one pass straight from
+        # the decoder's planes. INTER_AREA is optimal for downscaling as it
+        # properly anti-aliases the image so important details are not lost
+        stage_start = time.perf_counter()
+        if crop_box is not None:
+            processing_size = self._crop_processing_size(crop_box, options['processing_size'])
+        elif options['should_scale']:
+            processing_size = options['processing_size']
+        else:
+            processing_size = (img.width, img.height)
+        processing_img = img.convert(processing_size, cv2.COLOR_YUV2RGB_I420, crop_box, self._buffers, "inference")
+        self._stage_times['color'] = time.perf_counter() - stage_start
+        
+        results = HolisticResult.from_mediapipe(self.process_frame(processing_img), self.components)
+        if crop_box is not None:
+            x0, y0, x1, y1 = crop_box
+            height, width = img.height, img.width
+            results.map_from_crop(x0 / width, y0 / height, (x1 - x0) / width, (y1 - y0) / height)
+        if self.hand_refiner is not None:
+            stage_start = time.perf_counter()
+            self.hand_refiner.refine(img, results, self._buffers)
+            self._stage_times['hands'] = time.perf_counter() - stage_start
+        if options.get('roi'):
+            self.region_of_interest.update(results.pose_landmarks)
+        
+        quality_score = HolisticLandmarksTracker.assess_detection_quality(results)
+        
+        if motion_gating:
+            self.motion_gate.mark_inferred()
+            self.last_results = results
+            self.last_quality_score = quality_score
+        
+        return self._finish(img, results, quality_score, crop_box, False, processing_start, options)
+    
+    def _finish(self, img, results, quality_score, crop_box, reused, processing_start, options):
+        """Render the visualization (if requested) and package the worker output"""
+        # Landmarks-only sessions never look at the pixels again
+        if not options.get('render', True):
+            return {
+                'results': results,
+                'quality_score': quality_score,
+                'processing_time': time.time() - processing_start,
+                'crop_box': crop_box,
+                'reused': reused,
+                'viz_frame': None,
+                'stage_times': self._stage_times
+            }
+        
+        # Create visualization at the requested output size
+        # Note: MediaPipe landmarks are normalized (0-1), so they automatically
+        # scale correctly to whatever size we draw at
+        # The overlay is converted from the planes at its own size. Its buffer
+        # is reused by the next frame, which is fine: the track turns it into
+        # a video frame before it asks for the next one
+        stage_start = time.perf_counter()
+        output_width, output_height = options.get('output_size') or options['original_size']
+        viz_frame = img.convert((min(output_width, img.width), min(output_height, img.height)),
+                                cv2.COLOR_YUV2BGR_I420, buffers=self._buffers, name="overlay")
+        self._renderer.draw(viz_frame, results)
+        
+        processing_time = time.time() - processing_start
+        self._draw_debug_info(viz_frame, results, quality_score, processing_time, options)
+        self._stage_times['draw'] = time.perf_counter() - stage_start
+        
+        return {
+            'results': results,
+            'quality_score': quality_score,
+            'processing_time': processing_time,
+            'crop_box': crop_box,
+            'reused': reused,
+            'viz_frame': viz_frame,
+            'stage_times': self._stage_times
+        }
+    
+    @staticmethod
+    def _crop_processing_size(crop_box, processing_size):
+        """
+        Size the region of interest is processed at.
+        
+        The crop gets the same pixel budget as a full-frame pass at
+        processing_size would, so the signer ends up with more effective
+        resolution for the same inference cost.
+        """
+        x0, y0, x1, y1 = crop_box
+        budget = processing_size[0] * processing_size[1]
+        scale = min(1.0, (budget / ((x1 - x0) * (y1 - y0))) ** 0.5)
+        return max(2, int((x1 - x0) * scale)), max(2, int((y1 - y0) * scale))
+    
+    def process_frame(self, rgb_frame):
+        """
+        Process an RGB frame with MediaPipe Holistic.
+        
+        This method handles the core MediaPipe processing. The frame passed here
+        might be scaled down for performance, but MediaPipe doesn't need to know that.
+        """
+        # Process with the session-specific holistic model
+        inference_start = time.perf_counter()
+        results = self.holistic_model.process(rgb_frame)
+        self._stage_times['inference'] = time.perf_counter() - inference_start
+        return results
+    
+    def _draw_debug_info(self, viz_frame, results, quality_score, processing_time, options):
+        """Add performance and detection status text to the visualization frame"""
+        proc_width, proc_height = options['processing_size']
+        original_width, original_height = options['original_size']
+        debug_info = [
+            f"Frame: {options['frame_counter']} | FPS: {options['current_fps']:.1f}",
+            f"Processing: {proc_width}x{proc_height} ({options['scale_factor']:.2f}x)" if options['should_scale'] else f"Original: {original_width}x{original_height}",
+            f"Quality: {quality_score:.2f} | GPU: {'Available' if gpu_available else 'N/A'}",
+            f"Proc Time: {processing_time*1000:.1f}ms | Target: {options['target_processing_width']}px"
+        ]
+        
+        for i, info in enumerate(debug_info):
+            cv2.putText(
+                viz_frame,
+                info,
+                (10, 30 + i * 25),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.6,
+                (0, 255, 0),
+                2
+            )
+        
+        # Add detection status
+        detection_text = []
+        if results.face_landmarks is not None:
+            detection_text.append("Face")
+        if results.pose_landmarks is not None:
+            detection_text.append("Pose")
+        if results.left_hand_landmarks is not None:
+            detection_text.append("Left Hand")
+        if results.right_hand_landmarks is not None:
+            detection_text.append("Right Hand")
+            
+        status_text = "Detected: " + ", ".join(detection_text) if detection_text else "No landmarks detected"
+        cv2.putText(
+            viz_frame, 
+            status_text, 
+            (10, 30 + len(debug_info) * 25), 
+            cv2.FONT_HERSHEY_SIMPLEX, 
+            0.6, 
+            (0, 255, 255),  # Yellow color for detection status
+            2
+        )
+    
+    def configure(self, performance_mode, components, hand_refinement=False):
+        """Swap models when the session changes its components, model complexity or hand refinement"""
+        if (performance_mode == self.performance_mode and components == self.components
+                and hand_refinement == self.hand_refinement):
+            return
+        self._release_models()
+        self.performance_mode = performance_mode
+        self.components = components
+        self._select_models(hand_refinement)
+        self.motion_gate = MotionGate()
+        self.last_results = None
+        logger.info(f"Switched session pipeline to complexity {0 if performance_mode else 1}, "
+                    f"components: {', '.join(components)}")
+    
+    def close(self):
+        """Hand the models back to the pool"""
+        self._release_models()
+
+# Session pipelines owned by this worker, keyed by session id. In thread mode
+# all lanes share this dict; in process mode every worker process has its own.
+_session_pipelines = {}
+
+# Shared memory segments this worker process has mapped, keyed by session id
+_attached_frames = {}
+
+def _attach_shared_frame(session_id, ref):
+    """Map a session's frame segment (once per segment) and view the frame in it"""
+    memory = _attached_frames.get(session_id)
+    if memory is None or memory.name != ref.name:
+        _detach_shared_frame(session_id)
+        memory = _attached_frames[session_id] = shared_memory.SharedMemory(name=ref.name)
+    return I420Frame.from_buffer(memory.buf, ref.width, ref.height)
+
+def _detach_shared_frame(session_id):
+    memory = _attached_frames.pop(session_id, None)
+    if memory is not None:
+        try:
+            memory.close()
+        except BufferError:
+            # A view is still alive somewhere; the mapping goes with it
+            pass
+
+def _run_session_pipeline(session_id, img, options):
+    """Executor entry point: process one frame for a session, creating its pipeline on first use"""
+    if isinstance(img, SharedI420Frame):
+        img = _attach_shared_frame(session_id, img)
+    components = options.get('components', LANDMARK_COMPONENTS)
+    pipeline = _session_pipelines.get(session_id)
+    if pipeline is None:
+        pipeline = HolisticSessionPipeline(options.get('codec_name'), options.get('performance_mode', True),
+                                           components, options.get('hand_refinement', False))
+        _session_pipelines[session_id] = pipeline
+    else:
+        pipeline.configure(options.get('performance_mode', True), components, options.get('hand_refinement', False))
+    return pipeline.process(img, options)
+
+def _release_session_pipeline(session_id):
+    """Executor entry point: drop a finished session's pipeline and its model"""
+    pipeline = _session_pipelines.pop(session_id, None)
+    if pipeline is not None:
+        pipeline.close()
+    _detach_shared_frame(session_id)
+
+class InferenceExecutor:
+    """
+    Pool of inference workers that keeps MediaPipe off the asyncio event loop.
+    
+    The pool is made of single-worker "lanes". Every session is pinned to one
+    lane for its whole lifetime, so its Holistic model (and tracking state) is
+    only ever touched by one worker, and new sessions go to the least busy lane.
+    
+    The first warm_workers lanes warm model_pool_size models in the
+    background as soon as they start, so the first sessions (which go to
+    those lanes, see _lane_for) do not pay for graph initialization.
+    
+    Args:
+        kind: "thread" for a thread pool, "process" for one process per lane
+        workers: Number of lanes (defaults to the CPU count)
+        model_pool_size: Models to pre-warm per lane (0 disables the pool)
+        warm_workers: Lanes that pre-warm (None = every lane)
+    """
+    
+    def __init__(self, kind="thread", workers=None, model_pool_size=MODEL_POOL_SIZE, warm_workers=None):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown inference executor kind: {kind}")
+        self.kind = kind
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self._lanes = [self._create_lane(i) for i in range(self.workers)]
+        self._lane_sessions = [0] * self.workers
+        self._assignments = {}
+        # Worker processes get frames through shared memory, one slot per session
+        self._frame_slots = {}
+        self.model_pool_size = model_pool_size
+        self.warm_workers = self.workers if warm_workers is None else max(0, min(warm_workers, self.workers))
+        if model_pool_size > 0:
+            for lane in self._lanes[:self.warm_workers]:
+                lane.submit(_warm_model_pool, model_pool_size).add_done_callback(self._log_warm_failure)
+        logger.info(f"Inference executor started: {self.workers} {self.kind} worker(s)")
+    
+    def _create_lane(self, index):
+        if self.kind == "process":
+            # Spawn rather than fork - MediaPipe and the event loop own threads
+            # that must not be duplicated into the children
+            return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"holistic-worker-{index}")
+    
+    @staticmethod
+    def _log_warm_failure(future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Model pool warm-up failed: {future.exception()}")
+    
+    def _lane_for(self, session_id):
+        lane = self._assignments.get(session_id)
+        if lane is None:
+            lane = min(range(self.workers), key=lambda i: self._lane_sessions[i])
+            self._assignments[session_id] = lane
+            self._lane_sessions[lane] += 1
+        return lane
+    
+    async def run(self, session_id, img, options):
+        """Process a frame for a session on its lane and await the result"""
+        lane = self._lane_for(session_id)
+        if self.kind == "process" and isinstance(img, I420Frame):
+            slot = self._frame_slots.get(session_id)
+            if slot is None:
+                slot = self._frame_slots[session_id] = SharedFrameSlot()
+            img = slot.put(img)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._lanes[lane], _run_session_pipeline, session_id, img, options)
+    
+    def release(self, session_id):
+        """Free the lane slot and the worker-side pipeline of a finished session"""
+        lane = self._assignments.pop(session_id, None)
+        if lane is None:
+            return
+        self._lane_sessions[lane] -= 1
+        try:
+            self._lanes[lane].submit(_release_session_pipeline, session_id)
+        except RuntimeError:
+            # Executor already shut down - the worker is gone with its models
+            pass
+        # Unlinking only removes the name; a worker still mapping it keeps its view
+        slot = self._frame_slots.pop(session_id, None)
+        if slot is not None:
+            slot.close()
+    
+    def get_status(self):
+        """Summary of the pool for health checks"""
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "sessions": len(self._assignments),
+            "sessions_per_worker": list(self._lane_sessions)
+        }
+    
+    async def get_model_pool_status(self, timeout=0.25):
+        """
+        Model pool counters, summed over the workers.
+        
+        Worker processes answer between frames, so a worker that is busy
+        warming up or inferring for longer than timeout is left out of the
+        totals (and counted in workers_reporting) rather than stalling the
+        health check.
+        """
+        loop = asyncio.get_running_loop()
+        if self.kind == "thread":
+            # Thread lanes share one pool - read it directly
+            statuses = [_model_pool_status()]
+        else:
+            futures = [loop.run_in_executor(lane, _model_pool_status) for lane in self._lanes]
+            done, _ = await asyncio.wait(futures, timeout=timeout)
+            statuses = [future.result() for future in done if future.exception() is None]
+        keys = ("capacity", "idle", "created", "checkouts", "hits")
+        totals = {key: sum(status[key] for status in statuses) for key in keys}
+        totals["size_per_worker"] = self.model_pool_size
+        totals["warm_workers"] = self.warm_workers
+        totals["workers_reporting"] = self.workers if self.kind == "thread" else len(statuses)
+        return totals
+    
+    def shutdown(self):
+        for lane in self._lanes:
+            lane.shutdown(wait=False, cancel_futures=True)
+        for slot in self._frame_slots.values():
+            slot.close()
+        self._frame_slots.clear()
+
+class SessionScheduler:
+    """
+    Splits one server process's inference capacity fairly between sessions.
+    
+    Capacity is the number of inference workers divided by the smoothed cost
+    of a frame, measured across all sessions. Every admitted session gets the
+    same frame rate share (utilization * capacity / sessions, capped at
+    max_session_fps) and, as the share shrinks, a smaller processing width,
+    so that adding a peer lowers everyone's rate by a predictable amount
+    instead of letting the slowest sessions starve.
+    
+    Admission keeps each share at or above min_session_fps: beyond that,
+    offers wait in a bounded queue for a session to end and are rejected
+    when the queue is full or the wait times out.
+    
+    Args:
+        workers: Inference workers of this process
+        max_sessions: Hard session limit (0 = only capacity based)
+        max_session_fps: Highest frame rate handed to one session
+        min_session_fps: Lowest frame rate a session is admitted with
+        queue_size: Offers allowed to wait for a slot
+        queue_timeout: Seconds an offer waits before it is rejected
+    """
+    
+    # Assumed cost of a frame until real measurements come in (a 640 px
+    # complexity 0 frame on one core takes 20-25 ms)
+    INITIAL_FRAME_COST = 0.025
+    # Keep some headroom for decoding, encoding and the event loop
+    UTILIZATION = 0.85
+    # Processing widths by load (requested fps / available fps)
+    WIDTH_STEPS = ((1.0, 640), (1.5, 480), (float("inf"), 320))
+    
+    def __init__(self, workers, max_sessions=0, max_session_fps=MAX_SESSION_FPS,
+                 min_session_fps=MIN_SESSION_FPS, queue_size=ADMISSION_QUEUE_SIZE,
+                 queue_timeout=ADMISSION_TIMEOUT):
+        self.workers = workers
+        self.max_sessions = max_sessions
+        self.max_session_fps = max_session_fps
+        self.min_session_fps = min_session_fps
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.frame_cost = self.INITIAL_FRAME_COST
+        self._sessions = set()
+        self._waiting = 0
+        # Created by _condition() inside the serving loop: the scheduler is
+        # built before web.run_app starts its loop, and on Python 3.9 an
+        # asyncio.Condition binds to the loop current at construction
+        self._slot_freed = None
+        self._slot_loop = None
+        self.rejected = 0
+    
+    def capacity_fps(self):
+        """Frames per second this process can infer, with headroom"""
+        return self.UTILIZATION * self.workers / self.frame_cost
+    
+    def session_limit(self):
+        """Sessions that fit while each still gets min_session_fps"""
+        limit = max(1, int(self.capacity_fps() / self.min_session_fps))
+        if self.max_sessions:
+            limit = min(limit, self.max_sessions)
+        return limit
+    
+    def _has_slot(self):
+        return len(self._sessions) < self.session_limit()
+    
+    def _condition(self):
+        """Condition that queued offers wait on, bound to the running loop"""
+        loop = asyncio.get_running_loop()
+        if self._slot_loop is not loop:
+            self._slot_freed = asyncio.Condition()
+            self._slot_loop = loop
+        return self._slot_freed
+    
+    async def admit(self, key):
+        """
+        Reserve a session slot, waiting in the queue if necessary.
+        
+        Returns:
+            bool: True if admitted, False if the server is at capacity
+        """
+        if self._has_slot():
+            self._sessions.add(key)
+            return True
+        if self._waiting >= self.queue_size:
+            self.rejected += 1
+            return False
+        self._waiting += 1
+        slot_freed = self._condition()
+        try:
+            async with slot_freed:
+                await asyncio.wait_for(slot_freed.wait_for(self._has_slot), self.queue_timeout)
+                self._sessions.add(key)
+                return True
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            return False
+        finally:
+            self._waiting -= 1
     
-    def _process_face_landmarks(self, landmarks):
-        """Process face landmarks into a list format"""
-        if not landmarks:
-            return None
-            
-        processed_landmarks = []
-        for landmark in landmarks.landmark:
-            processed_landmarks.append({
-                'x': landmark.x,
-                'y': landmark.y,
-                'z': landmark.z,
-                'visibility': landmark.visibility if hasattr(landmark, 'visibility') else 1.0
-            })
-        return processed_landmarks
+    async def release(self, key):
+        """Free a session's slot (safe to call more than once)"""
+        if key not in self._sessions:
+            return
+        self._sessions.discard(key)
+        await self._wake_waiting()
     
-    def _process_pose_landmarks(self, landmarks):
-        """Process pose landmarks into a list format"""
-        if not landmarks:
-            return None
-            
-        processed_landmarks = []
-        for landmark in landmarks.landmark:
-            processed_landmarks.append({
-                'x': landmark.x,
-                'y': landmark.y,
-                'z': landmark.z,
-                'visibility': landmark.visibility
-            })
-        return processed_landmarks
+    async def _wake_waiting(self):
+        """Let queued offers re-check for a slot"""
+        slot_freed = self._condition()
+        async with slot_freed:
+            slot_freed.notify_all()
     
-    def _process_hand_landmarks(self, landmarks):
-        """Process hand landmarks into a list format"""
-        if not landmarks:
-            return None
-            
-        processed_landmarks = []
-        for landmark in landmarks.landmark:
-            processed_landmarks.append({
-                'x': landmark.x,
-                'y': landmark.y,
-                'z': landmark.z
-            })
-        return processed_landmarks
+    def record_frame_cost(self, seconds):
+        """
+        Feed the measured worker time of one frame into the capacity estimate.
+        Cheaper frames can raise the session limit, which admits queued offers.
+        """
+        if seconds > 0:
+            limit = self.session_limit()
+            self.frame_cost = 0.95 * self.frame_cost + 0.05 * seconds
+            if self._waiting and self.session_limit() > limit:
+                asyncio.ensure_future(self._wake_waiting())
     
-    def get_recent_landmarks(self, num_frames=10):
-        """Get the most recent frames of landmarks"""
-        return list(self.landmarks_history)[-num_frames:] if self.landmarks_history else []
+    def allocation(self):
+        """Frame rate and processing width every session should currently use"""
+        sessions = max(1, len(self._sessions))
+        available = self.capacity_fps() / sessions
+        load = self.max_session_fps / available
+        width = next(width for max_load, width in self.WIDTH_STEPS if load <= max_load)
+        return {
+            'fps': min(self.max_session_fps, available),
+            'max_width': width
+        }
+    
+    def get_status(self):
+        allocation = self.allocation()
+        return {
+            "sessions": len(self._sessions),
+            "session_limit": self.session_limit(),
+            "queued": self._waiting,
+            "rejected": self.rejected,
+            "capacity_fps": round(self.capacity_fps(), 1),
+            "frame_cost_ms": round(self.frame_cost * 1000, 1),
+            "session_fps": round(allocation['fps'], 1),
+            "session_max_width": allocation['max_width']
+        }
+
+def _read_recording_range(directory, first_frame, last_frame, start_time, end_time):
+    """Copy a frame id / time range out of a recording (runs off the event loop)"""
+    recording = LandmarkRecording(directory)
+    rows = recording.rows_for_frames(
+        first_frame if first_frame is not None else np.iinfo(np.int64).min,
+        last_frame if last_frame is not None else np.iinfo(np.int64).max
+    )
+    if start_time is not None or end_time is not None:
+        by_time = recording.rows_for_time(
+            start_time if start_time is not None else -np.inf,
+            end_time if end_time is not None else np.inf
+        )
+        rows = slice(max(rows.start, by_time.start), max(max(rows.start, by_time.start), min(rows.stop, by_time.stop)))
+    return {name: np.array(values) for name, values in recording.read(rows).items()}
+
+class ServerMetrics:
+    """
+    Server-wide aggregation of what the sessions measure.
+    
+    Tracks record every stage timing both in their own StageTimings and in
+    the shared one here, so totals survive the sessions that produced them.
+    Served by /metrics.
+    """
+    
+    def __init__(self):
+        self.stage_timings = StageTimings()
+        self.frame_latency = StageTimings()   # Arrival to landmarks, by session mode
+        self.frames = 0
+        self.dropped_frames = 0
+        self.subscriptions = 0
+        self.subscriber_dropped_frames = 0   # Of finished subscriptions
+        self.recognitions = 0
 
 class HolisticVideoTrack(MediaStreamTrack):
     """
@@ -264,14 +2097,71 @@ class HolisticVideoTrack(MediaStreamTrack):
     """
     kind = "video"
     
-    def __init__(self, track, pc):
+    def __init__(self, track, pc, executor, return_video=True, wire_format="json",
+                 overlay_width=OVERLAY_OUTPUT_WIDTH, roi_cropping=ROI_CROPPING, hand_refinement=HAND_REFINEMENT,
+                 motion_gating=MOTION_GATING, frame_skip=FRAME_SKIP,
+                 components=LANDMARK_COMPONENTS, scheduler=None, metrics=None, recording_dir=None,
+                 recognizer=None, session_id=None):
         super().__init__()
         self.track = track
         self.pc = pc
         self.frame_counter = 0
         
-        # Codec detection and model selection
-        self.holistic_model = None
+        # Landmarks-only sessions (return_video=False) have no outgoing video
+        # track, so overlay rendering and re-encoding are skipped entirely
+        self.return_video = return_video
+        self._consumer_task = None
+        
+        # Landmark message format: "json", or a binary encoding from
+        # landmark_protocol ("f32", "f16", "i16") negotiated by the client
+        self.wire_format = wire_format
+        
+        # Visualization output width (0 = input resolution)
+        self.overlay_width = overlay_width
+        
+        # Pose-guided region-of-interest cropping before inference
+        self.roi_cropping = roi_cropping
+        
+        # Second pass for the hands on full-resolution crops (see HandRefiner)
+        self.hand_refinement = hand_refinement
+        
+        # Reuse the previous landmarks while the scene is static
+        self.motion_gating = motion_gating
+        
+        # Landmark components the client asked for (see parse_components)
+        self.components = components
+        
+        # Frame skipping: infer on every Nth frame, extrapolate the rest
+        self.frame_skip = frame_skip
+        self.max_frame_skip = MAX_FRAME_SKIP
+        self.current_frame_skip = 1
+        self._frames_until_inference = 0
+        self._frame_interval = None     # Smoothed time between incoming frames
+        self._inference_time = None     # Smoothed time of a full inference
+        self._last_arrival_time = None
+        
+        # Inference runs on a worker pool; the session id pins this track's
+        # model to a single worker
+        self.executor = executor
+        self.session_id = session_id or uuid.uuid4().hex
+        
+        # Server-wide scheduler that sets this session's frame rate and
+        # processing width (None = run as fast as frames arrive)
+        self.scheduler = scheduler
+        self.scheduled_fps = None
+        self.scheduled_width = None
+        self._last_inference_start = None
+        
+        # Decoupled ingest: a background task drains the incoming track into a
+        # latest-frame-wins queue so frames never pile up inside aiortc
+        # (frame skipping needs room for the frames that arrive during inference)
+        self.frame_queue = LatestFrameQueue(
+            max(FRAME_QUEUE_SIZE, MAX_FRAME_SKIP) if frame_skip else FRAME_QUEUE_SIZE
+        )
+        self._ingest_task = None
+        
+        # Codec detection (the model itself is created in the worker)
+        self.codec_name = None
         self.codec_detected = False
         
         # Performance optimization settings
@@ -279,11 +2169,19 @@ class HolisticVideoTrack(MediaStreamTrack):
         self.target_processing_width = 640    # Ideal width for processing
         self.min_processing_width = 320       # Never go smaller than this
         self.max_processing_width = 1280      # Don't process larger than this
-        self.adaptive_scaling = True          # Enable intelligent scaling
-        self.quality_threshold = 0.6          # Minimum acceptable quality
+        self.adaptive_scaling = True          # Let the latency controller adjust settings
+        self.performance_mode = True          # Model complexity 0 (True) or 1 (False)
         
-        # Performance monitoring
+        # Chooses width, model complexity and frame skip from the latency budget
+        self.latency_controller = LatencyBudgetController(allow_frame_skip=frame_skip)
+        self._apply_controller_settings()
+        
+        # Performance monitoring, with per-stage timings for this session and
+        # the server-wide ServerMetrics (if any)
         self.performance_monitor = PerformanceMonitor()
+        self.stage_timings = StageTimings()
+        self.metrics = metrics
+        self.started_at = time.time()
         self.last_quality_check = time.time()
         self.quality_check_interval = 5.0     # Check quality every 5 seconds
         
@@ -292,10 +2190,32 @@ class HolisticVideoTrack(MediaStreamTrack):
         self.current_fps = 0
         self.processed_frames = 0
         self.current_processing_fps = 0
+        self.received_frames = 0              # Counted by the ingest task, dropped frames included
+        self.input_fps = None
+        self._received_at_fps_start = 0
         
         # Landmarks tracker with quality assessment
         self.landmarks_tracker = HolisticLandmarksTracker()
         
+        # Optional on-disk recording of everything the tracker sees
+        self.recorder = None
+        if recording_dir:
+            self.recorder = LandmarkRecorder(
+                os.path.join(recording_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{self.session_id}"),
+                session={
+                    'session_id': self.session_id,
+                    'mode': "video" if return_video else "landmarks_only",
+                    'components': list(components),
+                    'started_at': time.time()
+                }
+            )
+        
+        # Other consumers of this session's landmarks (WebSocket / SSE subscribers)
+        self.landmark_topic = LandmarkTopic(self.session_id)
+        
+        # Sign recognition over the landmark history (SessionRecognizer or None)
+        self.recognizer = recognizer
+        
         # Create data channel for sending landmarks results
         self.data_channel = pc.createDataChannel("holistic-landmarks")
         logger.info("Enhanced data channel created for holistic landmarks with performance monitoring")
@@ -314,19 +2234,20 @@ class HolisticVideoTrack(MediaStreamTrack):
         Returns:
             tuple: (scale_factor, new_width, new_height, should_scale)
         """
+        # The scheduler may lower the width when the server is busy
+        target_width = self.target_processing_width
+        if self.scheduled_width is not None:
+            target_width = max(self.min_processing_width, min(target_width, self.scheduled_width))
+        
+        # Never process wider than max_processing_width, however large the input
+        target_width = min(target_width, self.max_processing_width)
+        
         # If image is already small enough, don't scale
-        if original_width <= self.target_processing_width:
+        if original_width <= target_width:
             return 1.0, original_width, original_height, False
         
-        # If image is extremely large, cap the processing size
-        if original_width > self.max_processing_width:
-            scale_factor = self.max_processing_width / original_width
-            new_width = self.max_processing_width
-            new_height = int(original_height * scale_factor)
-            return scale_factor, new_width, new_height, True
-        
-        # Calculate scale factor to reach target width
-        scale_factor = self.target_processing_width / original_width
+        # Calculate scale factor to reach target width (keeping the aspect ratio)
+        scale_factor = target_width / original_width
         new_width = int(original_width * scale_factor)
         new_height = int(original_height * scale_factor)
         
@@ -338,133 +2259,185 @@ class HolisticVideoTrack(MediaStreamTrack):
         
         return scale_factor, new_width, new_height, True
     
-    def adaptive_quality_adjustment(self, current_quality, processing_time):
+    def calculate_output_size(self, original_width, original_height):
+        """Size of the returned visualization frame (never larger than the input)"""
+        if not self.overlay_width or self.overlay_width >= original_width:
+            return original_width, original_height
+        scale = self.overlay_width / original_width
+        # Keep dimensions even for the video encoder
+        return self.overlay_width - self.overlay_width % 2, int(original_height * scale) // 2 * 2
+    
+    def _apply_controller_settings(self):
+        """Take over the latency controller's current level"""
+        controller = self.latency_controller
+        self.target_processing_width = max(self.min_processing_width,
+                                           min(controller.processing_width, self.max_processing_width))
+        self.performance_mode = controller.model_complexity == 0
+    
+    def adjust_to_latency_budget(self):
         """
-        Automatically adjust processing parameters based on quality and performance.
+        Let the latency controller re-evaluate this session's settings.
         
-        This is like an automatic transmission that shifts gears based on
-        driving conditions - it optimizes for both performance and smooth operation.
+        Called once a second; any level change is applied right away and
+        announced on the data channel.
         """
         if not self.adaptive_scaling:
             return
+        # Under the scheduler the session cannot go faster than its share
+        target_fps = self.latency_controller.target_fps
+        if self.scheduled_fps:
+            target_fps = min(target_fps, self.scheduled_fps * 0.95)
+        decision = self.latency_controller.update(
+            self.performance_monitor.latency_percentile(90), self.current_fps, target_fps,
+            input_fps=self.input_fps
+        )
+        if decision is None:
+            return
+        self._apply_controller_settings()
+        logger.info(
+            f"Latency controller ({decision['reason']}): width {decision['processing_width']}, "
+            f"complexity {decision['model_complexity']}, frame skip {decision['frame_skip']} "
+            f"(p90 {decision['smoothed_p90_latency_ms']:.0f}ms, budget {decision['latency_budget_ms']:.0f}ms)"
+        )
+        if self.data_channel.readyState == "open":
+            self.data_channel.send(json.dumps(dict(decision, type='quality_adjustment')))
+    
+    async def recv(self):
+        """Return the next frame with the landmark visualization drawn on it"""
+        frame, viz_frame = await self.process_next_frame()
         
-        # If quality is too low, reduce scaling (increase processing resolution)
-        if current_quality < self.quality_threshold and self.target_processing_width < self.max_processing_width:
-            self.target_processing_width = min(
-                self.target_processing_width + 80,  # Increase by small steps
-                self.max_processing_width
-            )
-            logger.info(f"Quality below threshold ({current_quality:.2f}), increasing processing width to {self.target_processing_width}")
+        # Create new video frame with visualization (compression itself
+        # happens later, in aiortc's RTP sender)
+        stage_start = time.perf_counter()
+        new_frame = av.VideoFrame.from_ndarray(viz_frame, format="bgr24")
+        new_frame.pts = frame.pts
+        new_frame.time_base = frame.time_base
+        self._record_stages({'encode': time.perf_counter() - stage_start})
         
-        # If processing is too slow, increase scaling (decrease processing resolution)
-        elif processing_time > 0.1 and self.target_processing_width > self.min_processing_width:  # More than 100ms per frame
-            self.target_processing_width = max(
-                self.target_processing_width - 40,  # Decrease by small steps
-                self.min_processing_width
-            )
-            logger.info(f"Processing too slow ({processing_time*1000:.1f}ms), decreasing processing width to {self.target_processing_width}")
+        return new_frame
     
-    async def recv(self):
+    def start_landmarks_only(self):
+        """Drive the pipeline ourselves for sessions without a return video track"""
+        self._consumer_task = asyncio.ensure_future(self._consume_frames())
+    
+    async def _consume_frames(self):
+        try:
+            while self.readyState == "live":
+                await self.process_next_frame()
+        except MediaStreamError:
+            pass
+        except Exception as e:
+            logger.error(f"Landmarks-only processing stopped: {e}")
+        finally:
+            self.stop()
+    
+    async def process_next_frame(self):
         """
         Enhanced frame processing with intelligent scaling and quality monitoring.
         
         This method is like a smart factory assembly line that automatically
         adjusts its speed and quality controls based on demand and output quality.
+        The heavy lifting (resize, inference, drawing) runs on the inference
+        executor, so the event loop stays free for other peers while we wait.
+        
+        Returns:
+            tuple: (source frame, visualization frame or None in landmarks-only mode)
         """
-        frame = await self.track.recv()
-        self.frame_counter += 1
+        if self._ingest_task is None:
+            self._ingest_task = asyncio.ensure_future(self._ingest_frames())
         
-        # Record frame processing start time
-        processing_start = time.time()
+        if self.scheduler is not None:
+            allocation = self.scheduler.allocation()
+            self.scheduled_fps = allocation['fps']
+            self.scheduled_width = allocation['max_width']
+            if not self.frame_skip:
+                # Hold back until this session's next inference slot; frames
+                # arriving meanwhile are replaced by newer ones in the queue
+                await self._wait_for_inference_slot()
+        
+        frame, arrival_time = await self.frame_queue.get()
+        self.frame_counter += 1
         
-        # Detect codec on first frame and create appropriate model
+        # Detect codec on first frame; the worker creates the matching model
         if not self.codec_detected:
-            codec_name = frame.codec_name if hasattr(frame, 'codec_name') else None
-            self.holistic_model = create_holistic_model(codec_name, performance_mode=True)
+            self.codec_name = frame.codec_name if hasattr(frame, 'codec_name') else None
             self.codec_detected = True
-            logger.info(f"Created optimized holistic model for codec: {codec_name or 'unknown'}")
         
-        # Convert frame to OpenCV format
-        img = frame.to_ndarray(format="bgr24")
-        original_height, original_width = img.shape[:2]
+        # Wrap the decoder's planes; pixels are only converted in the worker,
+        # at the sizes inference and the overlay actually need
+        stage_start = time.perf_counter()
+        img = I420Frame.from_av(frame)
+        stage_times = {'decode': time.perf_counter() - stage_start}
+        original_height, original_width = img.height, img.width
         
         # Calculate optimal processing size
         scale_factor, proc_width, proc_height, should_scale = self.calculate_optimal_processing_size(
             original_width, original_height
         )
         
-        # Process the frame with appropriate scaling
+        options = {
+            'codec_name': self.codec_name,
+            'performance_mode': self.performance_mode,
+            'render': self.return_video,
+            'roi': self.roi_cropping,
+            'hand_refinement': self.hand_refinement,
+            'motion_gating': self.motion_gating,
+            'components': self.components,
+            'should_scale': should_scale,
+            'scale_factor': scale_factor,
+            'processing_size': (proc_width, proc_height),
+            'original_size': (original_width, original_height),
+            'output_size': self.calculate_output_size(original_width, original_height),
+            'frame_counter': self.frame_counter,
+            'current_fps': self.current_fps,
+            'target_processing_width': self.target_processing_width
+        }
+        
+        predicted = None
+        if self.frame_skip:
+            self._update_frame_interval(arrival_time)
+            if self._frames_until_inference > 0:
+                predicted = self.landmarks_tracker.predict_landmarks(arrival_time)
+        
+        if predicted is not None:
+            # Skipped frame: extrapolated landmarks, rendered without inference
+            self._frames_until_inference -= 1
+            output = await self._render_predicted(img, predicted, options)
+        else:
+            self._last_inference_start = time.time()
+            output = await self.executor.run(self.session_id, img, options)
+            if self.scheduler is not None:
+                self.scheduler.record_frame_cost(output['processing_time'])
+            if self.frame_skip:
+                self._update_frame_skip(output['processing_time'])
+        
+        stage_times.update(output.get('stage_times', {}))
+        results = output['results']
+        quality_score = output['quality_score']
+        processing_time = output['processing_time']
+        viz_frame = output['viz_frame']
+        reused = output['reused']
+        if predicted is None:
+            self.performance_monitor.record_inference(reused)
+        landmark_flags = (FLAG_REUSED if reused else 0) | (FLAG_PREDICTED if predicted is not None else 0)
+        
         if should_scale:
-            # Scale down for processing - this is where the magic happens
-            # We use INTER_AREA which is optimal for downscaling as it properly
-            # anti-aliases the image to prevent important details from being lost
-            processing_img = cv2.resize(
-                img, 
-                (proc_width, proc_height), 
-                interpolation=cv2.INTER_AREA
-            )
-            
-            # Process landmarks on the smaller image
-            results = self.process_frame(processing_img)
-            
             # Record resolution statistics
             self.performance_monitor.record_resolution_change(
                 (original_width, original_height),
                 (proc_width, proc_height),
                 scale_factor
             )
-        else:
-            # Process at original size
-            results = self.process_frame(img)
         
-        # Assess detection quality
-        quality_score = self.landmarks_tracker.assess_detection_quality(results)
+        # Record detection quality and processing time
         self.performance_monitor.record_quality_score(quality_score)
-        
-        # Create visualization on original size image
-        # Note: MediaPipe landmarks are normalized (0-1), so they automatically
-        # scale correctly to the original image size
-        viz_frame = img.copy()
-        
-        # Draw landmarks if available
-        if results.face_landmarks:
-            mp_drawing.draw_landmarks(
-                viz_frame,
-                results.face_landmarks,
-                mp_holistic.FACEMESH_CONTOURS,
-                landmark_drawing_spec=None,
-                connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_contours_style()
-            )
-        
-        if results.pose_landmarks:
-            mp_drawing.draw_landmarks(
-                viz_frame,
-                results.pose_landmarks,
-                mp_holistic.POSE_CONNECTIONS,
-                landmark_drawing_spec=mp_drawing_styles.get_default_pose_landmarks_style()
-            )
-            
-        if results.left_hand_landmarks:
-            mp_drawing.draw_landmarks(
-                viz_frame,
-                results.left_hand_landmarks,
-                mp_holistic.HAND_CONNECTIONS,
-                mp_drawing_styles.get_default_hand_landmarks_style(),
-                mp_drawing_styles.get_default_hand_connections_style()
-            )
-            
-        if results.right_hand_landmarks:
-            mp_drawing.draw_landmarks(
-                viz_frame,
-                results.right_hand_landmarks,
-                mp_holistic.HAND_CONNECTIONS,
-                mp_drawing_styles.get_default_hand_landmarks_style(),
-                mp_drawing_styles.get_default_hand_connections_style()
-            )
-        
-        # Record processing time
-        processing_time = time.time() - processing_start
         self.performance_monitor.record_processing_time(processing_time)
+        self.performance_monitor.record_frame_latency(time.time() - arrival_time)
+        if self.metrics is not None:
+            self.metrics.frames += 1
+            self.metrics.frame_latency.record(
+                "video" if self.return_video else "landmarks_only", time.time() - arrival_time
+            )
         
         # Update FPS tracking
         self.processed_frames += 1
@@ -474,6 +2447,9 @@ class HolisticVideoTrack(MediaStreamTrack):
         # Update FPS every second and perform adaptive adjustments
         if elapsed_time > 1.0:
             self.current_fps = self.processed_frames / elapsed_time
+            if self._ingest_task is not None:
+                self.input_fps = (self.received_frames - self._received_at_fps_start) / elapsed_time
+                self._received_at_fps_start = self.received_frames
             self.current_processing_fps = 1.0 / processing_time if processing_time > 0 else 0
             
             # Log performance information
@@ -491,65 +2467,38 @@ class HolisticVideoTrack(MediaStreamTrack):
                     'output_fps': self.current_fps,
                     'processing_fps': self.current_processing_fps,
                     'avg_processing_ms': perf_summary['avg_processing_ms'],
+                    'avg_latency_ms': perf_summary['avg_latency_ms'],
+                    'dropped_frames': perf_summary['dropped_frames'],
+                    'reuse_rate': perf_summary['reuse_rate'],
+                    'frame_skip': self.current_frame_skip,
+                    'scheduled_fps': self.scheduled_fps,
+                    'scheduled_width': self.scheduled_width,
+                    'p90_latency_ms': perf_summary['p90_latency_ms'],
+                    'controller': self.latency_controller.get_state(),
                     'quality_score': perf_summary['quality_score'],
                     'resolution_scale': scale_factor if should_scale else 1.0,
                     'processing_size': f"{proc_width}x{proc_height}",
                     'original_size': f"{original_width}x{original_height}"
                 }))
             
-            # Perform adaptive quality adjustment
-            self.adaptive_quality_adjustment(quality_score, processing_time)
+            # Move towards the latency budget
+            self.adjust_to_latency_budget()
             
             # Reset counters
             self.fps_start_time = current_time
             self.processed_frames = 0
         
-        # Add enhanced debug info to the frame
-        debug_info = [
-            f"Frame: {self.frame_counter} | FPS: {self.current_fps:.1f}",
-            f"Processing: {proc_width}x{proc_height} ({scale_factor:.2f}x)" if should_scale else f"Original: {original_width}x{original_height}",
-            f"Quality: {quality_score:.2f} | GPU: {'Available' if gpu_available else 'N/A'}",
-            f"Proc Time: {processing_time*1000:.1f}ms | Target: {self.target_processing_width}px"
-        ]
-        
-        for i, info in enumerate(debug_info):
-            cv2.putText(
-                viz_frame,
-                info,
-                (10, 30 + i * 25),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.6,
-                (0, 255, 0),
-                2
-            )
-        
-        # Add detection status
-        detection_text = []
-        if results.face_landmarks:
-            detection_text.append("Face")
-        if results.pose_landmarks:
-            detection_text.append("Pose")
-        if results.left_hand_landmarks:
-            detection_text.append("Left Hand")
-        if results.right_hand_landmarks:
-            detection_text.append("Right Hand")
-            
-        status_text = "Detected: " + ", ".join(detection_text) if detection_text else "No landmarks detected"
-        cv2.putText(
-            viz_frame, 
-            status_text, 
-            (10, 30 + len(debug_info) * 25), 
-            cv2.FONT_HERSHEY_SIMPLEX, 
-            0.6, 
-            (0, 255, 255),  # Yellow color for detection status
-            2
-        )
-        
         # Process landmarks and add to tracker with quality score
-        landmarks_frame = self.landmarks_tracker.add_landmarks(results, quality_score)
-        
+        landmarks_frame = self.landmarks_tracker.add_landmarks(
+            results, quality_score, timestamp=arrival_time, flags=landmark_flags, frame_id=self.frame_counter
+        )
+        if self.recorder is not None and landmarks_frame:
+            self.recorder.append_window(self.landmarks_tracker.get_window(1))
+        if self.recognizer is not None and landmarks_frame:
+            self.recognizer.on_frame(self.landmarks_tracker, self.frame_counter, self._send_recognition)
+
         # Log pose landmarks periodically with quality information
-        if results.pose_landmarks and self.frame_counter % 30 == 0:
+        if results.pose_landmarks is not None and self.frame_counter % 30 == 0:
             pose_info = self._get_key_pose_info(results.pose_landmarks)
             logger.info(
                 f"Frame {self.frame_counter}: Pose detected (Quality: {quality_score:.2f}) - " + 
@@ -557,49 +2506,240 @@ class HolisticVideoTrack(MediaStreamTrack):
                 f"R({pose_info['right_wrist_x']:.2f}, {pose_info['right_wrist_y']:.2f})"
             )
         
-        # Send enhanced landmarks data through data channel
-        if self.data_channel.readyState == "open" and landmarks_frame:
-            simplified_data = {
-                'type': 'holistic_landmarks',
-                'frame_id': self.frame_counter,
-                'quality_score': quality_score,
-                'processing_scale': scale_factor if should_scale else 1.0,
-                'has_face': results.face_landmarks is not None,
-                'has_pose': results.pose_landmarks is not None,
-                'has_left_hand': results.left_hand_landmarks is not None, 
-                'has_right_hand': results.right_hand_landmarks is not None
-            }
-            
-            # Add pose info if available
-            if results.pose_landmarks:
-                simplified_data['pose_info'] = self._get_key_pose_info(results.pose_landmarks)
+        # Publish the frame once: the data channel and every subscriber share
+        # one serialization per format
+        stage_start = time.perf_counter()
+        channel_open = self.data_channel.readyState == "open"
+        if landmarks_frame and (channel_open or self.landmark_topic.subscribers):
+            def summary():
+                simplified_data = {
+                    'type': 'holistic_landmarks',
+                    'frame_id': self.frame_counter,
+                    'quality_score': quality_score,
+                    'reused': reused,
+                    'predicted': predicted is not None,
+                    'processing_scale': scale_factor if should_scale else 1.0,
+                    'has_face': results.face_landmarks is not None,
+                    'has_pose': results.pose_landmarks is not None,
+                    'has_left_hand': results.left_hand_landmarks is not None, 
+                    'has_right_hand': results.right_hand_landmarks is not None
+                }
                 
-            self.data_channel.send(json.dumps(simplified_data))
-        
-        # Create new video frame with visualization
-        new_frame = av.VideoFrame.from_ndarray(viz_frame, format="bgr24")
-        new_frame.pts = frame.pts
-        new_frame.time_base = frame.time_base
+                # Add pose info if available
+                if results.pose_landmarks is not None:
+                    simplified_data['pose_info'] = self._get_key_pose_info(results.pose_landmarks)
+                return simplified_data
+            
+            published = LandmarkFrame(
+                self.frame_counter, landmarks_frame['timestamp'], quality_score, results.components(),
+                flags=landmark_flags, summary=summary, formatter=self.landmarks_tracker._format_frame
+            )
+            if channel_open:
+                # Binary clients get every landmark in a packed frame, JSON clients a summary
+                self.data_channel.send(published.serialize(
+                    "summary" if self.wire_format == "json" else self.wire_format
+                ))
+            self.landmark_topic.publish(published)
+        stage_times['serialize'] = time.perf_counter() - stage_start
+        self._record_stages(stage_times)
         
-        return new_frame
+        return frame, viz_frame
+    
+    def _send_recognition(self, message):
+        """Send a sign_recognition message (arrives after the batch it was in has run)"""
+        if self.metrics is not None:
+            self.metrics.recognitions += 1
+        if self.data_channel.readyState == "open":
+            self.data_channel.send(json.dumps(message))
+
+    def _record_stages(self, stage_times):
+        """Add stage timings to this session's and the server's sketches"""
+        self.stage_timings.record_many(stage_times)
+        if self.metrics is not None:
+            self.metrics.stage_timings.record_many(stage_times)
     
-    def process_frame(self, frame):
+    def get_session_info(self):
+        """Per-session view for the /sessions endpoint"""
+        summary = self.performance_monitor.get_performance_summary()
+        return {
+            'session_id': self.session_id,
+            'mode': "video" if self.return_video else "landmarks_only",
+            'wire_format': self.wire_format,
+            'components': list(self.components),
+            'uptime_s': time.time() - self.started_at,
+            'frames': self.frame_counter,
+            'output_fps': self.current_fps,
+            'dropped_frames': self.performance_monitor.dropped_frames,
+            'quality_score': summary.get('quality_score'),
+            'p50_latency_ms': summary.get('p50_latency_ms'),
+            'p90_latency_ms': summary.get('p90_latency_ms'),
+            'frame_skip': self.current_frame_skip,
+            'scheduled_fps': self.scheduled_fps,
+            'scheduled_width': self.scheduled_width,
+            'controller': self.latency_controller.get_state(),
+            'hand_refinement': self.hand_refinement,
+            # A recorder that hit a disk error reports no directory, only the error
+            'recording': self.recorder.directory if self.recorder is not None and self.recorder.recording else None,
+            'recording_error': self.recorder.error if self.recorder is not None else None,
+            'frames_recorded': self.recorder.frames_recorded if self.recorder is not None else 0,
+            'stages': self.stage_timings.snapshot(),
+            'subscribers': self.landmark_topic.get_status(),
+            'recognitions': self.recognizer.recognitions if self.recognizer is not None else None,
+            'recognition_failures': self.recognizer.failures if self.recognizer is not None else None
+        }
+    
+    async def query_landmarks(self, query):
         """
-        Process a frame with MediaPipe Holistic.
+        Answer a landmark history query (see parse_landmark_query).
         
-        This method handles the core MediaPipe processing. The frame passed here
-        might be scaled down for performance, but MediaPipe doesn't need to know that.
+        Frames still in the tracker's ring buffer are served as views into
+        it. If the range starts before the oldest buffered frame and the
+        session is being recorded, the older part is read from the
+        recording on the recorder's writer thread, after any pending chunk
+        has been written.
+        
+        Returns:
+            tuple: (list of (frame_id, timestamp, quality_score, components)
+                tuples, info dict with the source and the step used)
         """
-        # Convert to RGB (MediaPipe requires RGB input)
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        first_frame, last_frame = query['from_frame'], query['to_frame']
+        start_time, end_time = query['start_time'], query['end_time']
+        if query['last_frames'] is not None:
+            first_frame = max(first_frame or 0, self.frame_counter - query['last_frames'] + 1)
+        if query['last_seconds'] is not None:
+            start_time = max(start_time or 0.0, time.time() - query['last_seconds'])
         
-        # Process with the track-specific holistic model
-        results = self.holistic_model.process(rgb_frame)
+        tracker = self.landmarks_tracker
+        windows = []
+        sources = []
+        buffered = tracker.get_window()
+        oldest_frame = int(buffered['frame_ids'][0]) if len(buffered['frame_ids']) else self.frame_counter + 1
+        oldest_time = float(buffered['timestamps'][0]) if len(buffered['timestamps']) else time.time()
+        reaches_back = ((first_frame is not None and first_frame < oldest_frame) or
+                        (start_time is not None and start_time < oldest_time))
+        if reaches_back and self.recorder is not None and self.recorder.error is None:
+            self.recorder.flush()
+            loop = asyncio.get_running_loop()
+            try:
+                windows.append(await loop.run_in_executor(
+                    self.recorder.executor, _read_recording_range, self.recorder.directory,
+                    first_frame, min(last_frame, oldest_frame - 1) if last_frame is not None else oldest_frame - 1,
+                    start_time, end_time
+                ))
+                sources.append("recording")
+            except (OSError, ValueError) as e:
+                # The recording failed to open or write; answer from memory
+                logger.warning(f"Session {self.session_id}: cannot read its recording: {e}")
+        windows.append(tracker.select(first_frame, last_frame, start_time, end_time))
+        sources.append("memory")
         
-        return results
+        source = "+".join(name for name, window in zip(sources, windows) if len(window['frame_ids'])) or "memory"
+        if len(windows) > 1:
+            window = {key: np.concatenate([part[key] for part in windows]) for key in windows[-1]}
+        else:
+            window = windows[0]
+        
+        # Downsample long ranges rather than refusing them
+        total = len(window['frame_ids'])
+        limit = min(query['max_frames'] or QUERY_MAX_FRAMES, QUERY_MAX_FRAMES)
+        step = max(query['step'] or 1, -(-total // limit))
+        frames = HolisticLandmarksTracker.window_frames(window, query['components'], step)
+        return frames, {
+            'source': source,
+            'step': step,
+            'frames': len(frames),
+            'components': list(query['components'])
+        }
+    
+    async def _render_predicted(self, img, predicted, options):
+        """Worker output for a skipped frame: predicted landmarks, no inference"""
+        quality_score = HolisticLandmarksTracker.assess_detection_quality(predicted)
+        if not self.return_video:
+            return {
+                'results': predicted,
+                'quality_score': quality_score,
+                'processing_time': 0.0,
+                'crop_box': None,
+                'reused': False,
+                'viz_frame': None
+            }
+        options['results'] = predicted
+        options['quality_score'] = quality_score
+        return await self.executor.run(self.session_id, img, options)
+    
+    def _update_frame_interval(self, arrival_time):
+        """Track the camera's frame interval with an exponential moving average"""
+        if self._last_arrival_time is not None:
+            interval = arrival_time - self._last_arrival_time
+            if interval > 0:
+                self._frame_interval = interval if self._frame_interval is None else (
+                    0.9 * self._frame_interval + 0.1 * interval
+                )
+        self._last_arrival_time = arrival_time
+    
+    def _update_frame_skip(self, inference_time):
+        """
+        Choose N so one inference fits in the time N camera frames take.
+        
+        This is the latency budget: if inference takes 80 ms and frames
+        arrive every 33 ms, inferring every 3rd frame keeps up with the camera.
+        """
+        self._inference_time = inference_time if self._inference_time is None else (
+            0.8 * self._inference_time + 0.2 * inference_time
+        )
+        if self._frame_interval:
+            # The scheduler's frame rate share is a second budget: at 10 fps
+            # allotted and a 30 fps camera, at most every 3rd frame is inferred
+            budget = self._inference_time
+            if self.scheduled_fps:
+                budget = max(budget, 1.0 / self.scheduled_fps)
+            self.current_frame_skip = max(1, min(
+                self.max_frame_skip,
+                int(np.ceil(budget / self._frame_interval))
+            ))
+        # The latency controller may ask for more skipping than that
+        self.current_frame_skip = min(self.max_frame_skip,
+                                      max(self.current_frame_skip, self.latency_controller.frame_skip))
+        self._frames_until_inference = self.current_frame_skip - 1
+    
+    async def _wait_for_inference_slot(self):
+        """Sleep until 1 / scheduled_fps has passed since the last inference started"""
+        if self._last_inference_start is None or not self.scheduled_fps:
+            return
+        delay = self._last_inference_start + 1.0 / self.scheduled_fps - time.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    
+    async def _ingest_frames(self):
+        """Keep pulling frames from the remote track, keeping only the newest ones"""
+        try:
+            while True:
+                frame = await self.track.recv()
+                self.received_frames += 1
+                if self.frame_queue.put(frame):
+                    self.performance_monitor.record_dropped_frame()
+                    if self.metrics is not None:
+                        self.metrics.dropped_frames += 1
+        except MediaStreamError as e:
+            self.frame_queue.close(e)
+        except Exception as e:
+            logger.error(f"Frame ingest stopped unexpectedly: {e}")
+            self.frame_queue.close(MediaStreamError(str(e)))
+    
+    def stop(self):
+        """Stop the track and release this session's model on the executor"""
+        super().stop()
+        if self._ingest_task is not None:
+            self._ingest_task.cancel()
+        if self._consumer_task is not None and self._consumer_task is not asyncio.current_task():
+            self._consumer_task.cancel()
+        if self.recorder is not None:
+            self.recorder.close()
+        self.landmark_topic.close()
+        self.executor.release(self.session_id)
     
     def _get_key_pose_info(self, pose_landmarks):
-        """Extract key pose information from pose landmarks"""
+        """Extract key pose information from an (N, 4) pose landmark array"""
         # Define key landmark indices (MediaPipe pose model)
         NOSE = 0
         LEFT_SHOULDER = 11
@@ -610,21 +2750,22 @@ class HolisticVideoTrack(MediaStreamTrack):
         RIGHT_WRIST = 16
         
         # Extract key point coordinates
+        points = pose_landmarks[:, :2].tolist()
         return {
-            'nose_x': pose_landmarks.landmark[NOSE].x,
-            'nose_y': pose_landmarks.landmark[NOSE].y,
-            'left_shoulder_x': pose_landmarks.landmark[LEFT_SHOULDER].x,
-            'left_shoulder_y': pose_landmarks.landmark[LEFT_SHOULDER].y,
-            'right_shoulder_x': pose_landmarks.landmark[RIGHT_SHOULDER].x,
-            'right_shoulder_y': pose_landmarks.landmark[RIGHT_SHOULDER].y,
-            'left_elbow_x': pose_landmarks.landmark[LEFT_ELBOW].x,
-            'left_elbow_y': pose_landmarks.landmark[LEFT_ELBOW].y,
-            'right_elbow_x': pose_landmarks.landmark[RIGHT_ELBOW].x,
-            'right_elbow_y': pose_landmarks.landmark[RIGHT_ELBOW].y,
-            'left_wrist_x': pose_landmarks.landmark[LEFT_WRIST].x,
-            'left_wrist_y': pose_landmarks.landmark[LEFT_WRIST].y,
-            'right_wrist_x': pose_landmarks.landmark[RIGHT_WRIST].x,
-            'right_wrist_y': pose_landmarks.landmark[RIGHT_WRIST].y
+            'nose_x': points[NOSE][0],
+            'nose_y': points[NOSE][1],
+            'left_shoulder_x': points[LEFT_SHOULDER][0],
+            'left_shoulder_y': points[LEFT_SHOULDER][1],
+            'right_shoulder_x': points[RIGHT_SHOULDER][0],
+            'right_shoulder_y': points[RIGHT_SHOULDER][1],
+            'left_elbow_x': points[LEFT_ELBOW][0],
+            'left_elbow_y': points[LEFT_ELBOW][1],
+            'right_elbow_x': points[RIGHT_ELBOW][0],
+            'right_elbow_y': points[RIGHT_ELBOW][1],
+            'left_wrist_x': points[LEFT_WRIST][0],
+            'left_wrist_y': points[LEFT_WRIST][1],
+            'right_wrist_x': points[RIGHT_WRIST][0],
+            'right_wrist_y': points[RIGHT_WRIST][1]
         }
 
 # Web server endpoints (unchanged from original)
@@ -634,36 +2775,364 @@ async def index(request):
 
 async def ping(request):
     """Enhanced ping endpoint with performance information."""
+    recognizer = request.app["sign_recognizer"]
     return web.json_response({
         "status": "ok",
         "message": "Optimized Holistic Sign Language Detection Server is running",
         "gpu_available": gpu_available,
         "performance_mode": "enabled",
-        "features": ["resolution_scaling", "adaptive_quality", "performance_monitoring"]
+        "inference_executor": request.app["inference_executor"].get_status(),
+        "model_pool": await request.app["inference_executor"].get_model_pool_status(),
+        "server_process": {
+            "pid": os.getpid(),
+            "sessions": len(pcs),
+            "max_sessions": request.app["max_sessions"]
+        },
+        "scheduler": request.app["session_scheduler"].get_status(),
+        "sign_recognition": recognizer.get_status() if recognizer is not None else None,
+        "features": ["resolution_scaling", "adaptive_quality", "performance_monitoring", "worker_pool_inference", "latest_frame_ingest", "landmarks_only_mode", "binary_landmarks", "vectorized_overlay", "roi_cropping", "hand_refinement", "motion_gating", "frame_skip", "component_selection", "model_pool", "multi_process_serving", "fair_scheduling", "admission_control", "latency_budget_control", "stage_metrics", "session_recording", "landmark_queries", "landmark_subscriptions", "sign_recognition"]
+    })
+
+async def metrics(request):
+    """Server-wide metrics in the Prometheus text format"""
+    server_metrics = request.app["metrics"]
+    scheduler_status = request.app["session_scheduler"].get_status()
+    recognizer = request.app["sign_recognizer"]
+    text = render_prometheus(
+        summaries=[
+            ("holistic_stage_seconds", "Time spent per frame in each pipeline stage", "stage",
+             server_metrics.stage_timings),
+            ("holistic_frame_latency_seconds", "Time from frame arrival until its landmarks are ready", "mode",
+             server_metrics.frame_latency),
+        ],
+        gauges=[
+            ("holistic_sessions", "Active video sessions", len(request.app["holistic_sessions"])),
+            ("holistic_peer_connections", "Open peer connections", len(pcs)),
+            ("holistic_capacity_fps", "Estimated inference capacity in frames per second",
+             scheduler_status["capacity_fps"]),
+            ("holistic_session_fps", "Frame rate share of each session", scheduler_status["session_fps"]),
+            ("holistic_subscribers", "Open landmark subscriptions",
+             sum(len(track.landmark_topic.subscribers) for track in request.app["holistic_sessions"].values())),
+        ],
+        counters=[
+            ("holistic_frames_total", "Frames processed", server_metrics.frames),
+            ("holistic_dropped_frames_total", "Frames dropped by the ingest queues", server_metrics.dropped_frames),
+            ("holistic_rejected_offers_total", "Offers rejected by admission control", scheduler_status["rejected"]),
+            ("holistic_subscriptions_total", "Landmark subscriptions opened", server_metrics.subscriptions),
+            ("holistic_subscriber_dropped_frames_total", "Frames dropped for slow subscribers (closed subscriptions)",
+             server_metrics.subscriber_dropped_frames),
+            ("holistic_recognitions_total", "Sign glosses sent to clients", server_metrics.recognitions),
+            ("holistic_recognition_requests_total", "Landmark windows classified",
+             recognizer.requests if recognizer is not None else 0),
+            ("holistic_recognition_batches_total", "Sign recognition model calls",
+             recognizer.batches if recognizer is not None else 0),
+            ("holistic_recognition_failed_batches_total", "Sign recognition model calls that raised",
+             recognizer.failed_batches if recognizer is not None else 0),
+        ]
+    )
+    return web.Response(body=text.encode("utf-8"),
+                        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+async def sessions(request):
+    """Per-session settings, rates and stage percentiles as JSON"""
+    return web.json_response({
+        "pid": os.getpid(),
+        "sessions": [track.get_session_info() for track in request.app["holistic_sessions"].values()]
+    })
+
+async def session_landmarks(request):
+    """
+    Landmark history of one session: GET /sessions/{session_id}/landmarks
+    with the parse_landmark_query() keys as query parameters (components
+    comma separated). format=json (default) returns frames as JSON, any
+    binary encoding returns one landmark_protocol batch.
+    """
+    track, error = _find_session(request)
+    if error is not None:
+        return error
+    wire_format = request.query.get("format", "json")
+    if wire_format != "json" and wire_format not in ENCODINGS:
+        return web.json_response({"error": f"Unknown landmark format: {wire_format}"}, status=400)
+    try:
+        query = parse_landmark_query(request.query)
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    
+    frames, info = await track.query_landmarks(query)
+    if wire_format != "json":
+        return web.Response(body=encode_batch(frames, encoding=wire_format),
+                            content_type="application/octet-stream",
+                            headers={"X-Landmark-Step": str(info['step']), "X-Landmark-Source": info['source']})
+    return web.json_response(dict(
+        info, session_id=track.session_id,
+        landmarks=[track.landmarks_tracker._format_frame(*frame) for frame in frames]
+    ))
+
+def _new_session_id(app):
+    """Session id, tagged with the server process index when several processes share the port"""
+    session_id = uuid.uuid4().hex
+    if app["process_index"] is not None:
+        session_id = f"p{app['process_index']}-{session_id}"
+    return session_id
+
+def _find_session(request):
+    """
+    Track of the session named in the URL, or an error response.
+    
+    With --processes N the kernel hands each request to any of the
+    processes, but a session only exists in the one that accepted its
+    offer. Requests for another process's session get 421 Misdirected
+    Request instead of a misleading 404.
+    """
+    session_id = request.match_info["session_id"]
+    track = request.app["holistic_sessions"].get(session_id)
+    if track is not None:
+        return track, None
+    owner = session_id.split("-", 1)[0]
+    if request.app["process_index"] is not None and owner != f"p{request.app['process_index']}" \
+            and owner[1:].isdigit():
+        return None, web.json_response({
+            "error": f"Session {session_id} belongs to server process {owner[1:]}; per-session "
+                     f"endpoints are not supported with several server processes (run with --processes 1)",
+            "process": int(owner[1:])
+        }, status=421)
+    return None, web.json_response({"error": "Unknown session"}, status=404)
+
+def _subscription_target(request, text_only=False):
+    """Session track and format of a subscription request, or an error response"""
+    track, error = _find_session(request)
+    if error is not None:
+        return None, None, error
+    fmt = request.query.get("format", "json")
+    formats = ("summary", "json") if text_only else SUBSCRIPTION_FORMATS
+    if fmt not in formats:
+        return None, None, web.json_response({
+            "error": f"Unknown landmark format: {fmt}",
+            "supported_formats": list(formats)
+        }, status=400)
+    return track, fmt, None
+
+async def subscribe_landmarks(request):
+    """
+    Follow a session's landmarks over a WebSocket:
+    GET /sessions/{session_id}/subscribe?format=f16
+    
+    Binary formats arrive as binary messages, JSON formats and control
+    messages (landmarks_dropped, subscription_closed) as text.
+    """
+    track, fmt, error = _subscription_target(request)
+    if error is not None:
+        return error
+    ws = web.WebSocketResponse(heartbeat=20)
+    await ws.prepare(request)
+    subscriber = track.landmark_topic.subscribe(fmt)
+    request.app["metrics"].subscriptions += 1
+    
+    async def send(message):
+        if isinstance(message, bytes):
+            await ws.send_bytes(message)
+        else:
+            await ws.send_str(message)
+    
+    async def notify(control):
+        await ws.send_str(json.dumps(control))
+    
+    writer = asyncio.ensure_future(pump(subscriber, send, notify))
+    # Once the writer is done (session ended, subscriber stalled) hang up;
+    # the heartbeat would otherwise keep an idle client connected forever
+    writer.add_done_callback(lambda _: asyncio.ensure_future(ws.close()))
+    try:
+        # Nothing is expected from the client; reading notices when it leaves
+        async for _ in ws:
+            pass
+    finally:
+        track.landmark_topic.unsubscribe(subscriber)
+        request.app["metrics"].subscriber_dropped_frames += subscriber.dropped
+        try:
+            await asyncio.wait_for(writer, timeout=1.0)
+        except (asyncio.TimeoutError, ConnectionError):
+            writer.cancel()
+        await ws.close()
+    return ws
+
+async def landmark_events(request):
+    """
+    Follow a session's landmarks as Server-Sent Events:
+    GET /sessions/{session_id}/events?format=json (or summary)
+    
+    Frames are "landmarks" events; dropped-frame notices and the end of the
+    session come as "control" events.
+    """
+    track, fmt, error = _subscription_target(request, text_only=True)
+    if error is not None:
+        return error
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
     })
+    await response.prepare(request)
+    subscriber = track.landmark_topic.subscribe(fmt)
+    request.app["metrics"].subscriptions += 1
+    
+    async def send(message):
+        await response.write(b"event: landmarks\ndata: " + message.encode("utf-8") + b"\n\n")
+    
+    async def notify(control):
+        await response.write(b"event: control\ndata: " + json.dumps(control).encode("utf-8") + b"\n\n")
+    
+    try:
+        await pump(subscriber, send, notify)
+    except ConnectionError:
+        pass
+    finally:
+        track.landmark_topic.unsubscribe(subscriber)
+        request.app["metrics"].subscriber_dropped_frames += subscriber.dropped
+    return response
+
+async def _send_landmark_query(channel, track, request_text, wire_format):
+    """
+    Answer "query_landmarks {...}" on a data channel: a landmarks_query
+    header, then the frames split into messages of at most
+    QUERY_MESSAGE_BYTES (binary batches, or landmarks_query_data JSON parts).
+    """
+    try:
+        params = json.loads(request_text) if request_text else {}
+        if not isinstance(params, dict):
+            raise ValueError("Query must be a JSON object")
+        query = parse_landmark_query(params)
+    except ValueError as e:
+        channel.send(json.dumps({'type': 'error', 'message': f"Invalid landmark query: {e}"}))
+        return
+    query_id = params.get('query_id')
+    frames, info = await track.query_landmarks(query)
+    
+    if wire_format != "json":
+        messages = encode_batches(frames, encoding=wire_format, max_bytes=QUERY_MESSAGE_BYTES)
+    else:
+        messages = []
+        part = []
+        size = 0
+        for frame in frames:
+            formatted = json.dumps(track.landmarks_tracker._format_frame(*frame))
+            if part and size + len(formatted) > QUERY_MESSAGE_BYTES:
+                messages.append(part)
+                part, size = [], 0
+            part.append(formatted)
+            size += len(formatted)
+        if part:
+            messages.append(part)
+        messages = [
+            '{"type": "landmarks_query_data", "query_id": %s, "part": %d, "landmarks": [%s]}'
+            % (json.dumps(query_id), index, ", ".join(part))
+            for index, part in enumerate(messages)
+        ]
+    
+    channel.send(json.dumps(dict(info, type='landmarks_query', query_id=query_id,
+                                 format=wire_format, messages=len(messages))))
+    for message in messages:
+        if channel.readyState != "open":
+            break
+        channel.send(message)
+
+def _log_query_failure(task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Error handling query_landmarks request: {task.exception()}")
 
 async def offer(request):
     """Handle WebRTC offer from client."""
     params = await request.json()
     offer = RTCSessionDescription(sdp=params["sdp"]["sdp"], type=params["sdp"]["type"])
     
+    # "video" (default) returns the annotated video; "landmarks_only" only
+    # sends landmarks over the data channel - no overlay, no re-encode
+    mode = params.get("mode", "video")
+    if mode not in ("video", "landmarks_only"):
+        return web.json_response({"error": f"Unknown session mode: {mode}"}, status=400)
+    
+    # Landmark wire format, can be renegotiated later with "set_format"
+    session_options = {"wire_format": params.get("format", "json")}
+    if session_options["wire_format"] != "json" and session_options["wire_format"] not in ENCODINGS:
+        return web.json_response({"error": f"Unknown landmark format: {session_options['wire_format']}"}, status=400)
+    
+    # Landmark components to compute, can be changed later with "set_components"
+    try:
+        session_options["components"] = parse_components(params.get("components"))
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    
+    # Landmark recording must be enabled on the server (HOLISTIC_RECORD_DIR)
+    record = bool(params.get("record", False))
+    if record and not RECORDING_DIR:
+        return web.json_response({"error": "Landmark recording is not enabled on this server"}, status=400)
+    
+    # Sign recognition runs by default when the server has a model
+    # (HOLISTIC_SIGN_MODEL); "recognition": false turns it off
+    sign_recognizer = request.app["sign_recognizer"]
+    recognition = params.get("recognition")
+    if recognition and sign_recognizer is None:
+        return web.json_response({"error": "Sign recognition is not enabled on this server"}, status=400)
+    recognition = sign_recognizer is not None and recognition is not False
+    
+    # Admission control: wait for a slot while the server is full, then give
+    # up with 503 so the client can retry (possibly on another server process)
+    scheduler = request.app["session_scheduler"]
+    admission_key = uuid.uuid4().hex
+    if not await scheduler.admit(admission_key):
+        status = scheduler.get_status()
+        return web.json_response({
+            "error": "Server is at capacity",
+            "sessions": status["sessions"],
+            "session_limit": status["session_limit"],
+            "queued": status["queued"]
+        }, status=503, headers={"Retry-After": "5"})
+    
     # Create a new peer connection
     pc = RTCPeerConnection()
     pcs.add(pc)
+    holistic_tracks = []
     
     @pc.on("connectionstatechange")
     async def on_connectionstatechange():
         logger.info(f"Connection state changed to {pc.connectionState}")
-        if pc.connectionState == "failed":
+        if pc.connectionState in ("failed", "closed"):
+            # Landmarks-only tracks have no sender to stop them for us
+            for holistic_track in holistic_tracks:
+                holistic_track.stop()
+                request.app["holistic_sessions"].pop(holistic_track.session_id, None)
             await pc.close()
             pcs.discard(pc)
+            await scheduler.release(admission_key)
     
     @pc.on("track")
     def on_track(track):
         logger.info(f"Track received: {track.kind}")
         if track.kind == "video":
             # Create optimized Holistic processor
-            pc.addTrack(HolisticVideoTrack(track, pc))
+            holistic_track = HolisticVideoTrack(
+                track, pc, request.app["inference_executor"],
+                return_video=(mode == "video"),
+                wire_format=session_options["wire_format"],
+                overlay_width=int(params.get("overlay_width", OVERLAY_OUTPUT_WIDTH)),
+                roi_cropping=bool(params.get("roi", ROI_CROPPING)),
+                hand_refinement=bool(params.get("hand_refinement", HAND_REFINEMENT)),
+                motion_gating=bool(params.get("motion_gating", MOTION_GATING)),
+                frame_skip=bool(params.get("frame_skip", FRAME_SKIP)),
+                components=session_options["components"],
+                scheduler=scheduler,
+                metrics=request.app["metrics"],
+                recording_dir=RECORDING_DIR if record else None,
+                recognizer=SessionRecognizer(
+                    sign_recognizer, stride=RECOGNITION_STRIDE, threshold=RECOGNITION_THRESHOLD
+                ) if recognition else None,
+                session_id=_new_session_id(request.app)
+            )
+            holistic_tracks.append(holistic_track)
+            request.app["holistic_sessions"][holistic_track.session_id] = holistic_track
+            if holistic_track.return_video:
+                pc.addTrack(holistic_track)
+            else:
+                holistic_track.start_landmarks_only()
     
     # Handle data channels
     @pc.on("datachannel")
@@ -672,47 +3141,107 @@ async def offer(request):
         
         @channel.on("message")
         def on_message(message):
+            if not isinstance(message, str):
+                return
             if message == "ping":
                 channel.send("pong")
+            elif message.startswith("set_format"):
+                # Negotiate the landmark wire format: "set_format f16"
+                requested = message[len("set_format"):].strip() or "json"
+                if requested != "json" and requested not in ENCODINGS:
+                    channel.send(json.dumps({
+                        'type': 'error',
+                        'message': f"Unknown landmark format: {requested}",
+                        'supported_formats': ["json"] + list(ENCODINGS)
+                    }))
+                    return
+                session_options["wire_format"] = requested
+                for holistic_track in holistic_tracks:
+                    holistic_track.wire_format = requested
+                channel.send(json.dumps({
+                    'type': 'format_ack',
+                    'format': requested,
+                    'protocol_version': PROTOCOL_VERSION
+                }))
+            elif message.startswith("set_components"):
+                # Choose the pipeline: "set_components hands,pose"
+                try:
+                    components = parse_components(message[len("set_components"):].strip() or None)
+                except ValueError as e:
+                    channel.send(json.dumps({
+                        'type': 'error',
+                        'message': str(e),
+                        'supported_components': list(LANDMARK_COMPONENTS)
+                    }))
+                    return
+                session_options["components"] = components
+                for holistic_track in holistic_tracks:
+                    holistic_track.components = components
+                channel.send(json.dumps({
+                    'type': 'components_ack',
+                    'components': list(components)
+                }))
             elif message.startswith("get_landmarks"):
                 # Request to get recent landmarks
                 try:
-                    # Find the track
-                    for sender in pc.getSenders():
-                        if sender.track and isinstance(sender.track, HolisticVideoTrack):
-                            # Get landmarks from the track
-                            recent_landmarks = sender.track.landmarks_tracker.get_recent_landmarks(5)
-                            # Send back to client
-                            channel.send(json.dumps({
-                                'type': 'landmarks_history',
-                                'landmarks': recent_landmarks
-                            }))
+                    for holistic_track in holistic_tracks:
+                        if session_options["wire_format"] != "json":
+                            # Binary clients get the history as one packed batch
+                            channel.send(encode_batch(
+                                holistic_track.landmarks_tracker.get_recent_frames(5),
+                                encoding=session_options["wire_format"]
+                            ))
                             break
+                        # Get landmarks from the track
+                        recent_landmarks = holistic_track.landmarks_tracker.get_recent_landmarks(5)
+                        # Send back to client
+                        channel.send(json.dumps({
+                            'type': 'landmarks_history',
+                            'landmarks': recent_landmarks
+                        }))
+                        break
                 except Exception as e:
                     logger.error(f"Error handling get_landmarks request: {e}")
+            elif message.startswith("query_landmarks"):
+                # Time-indexed history: 'query_landmarks {"last_seconds": 5, "components": ["hands"]}'
+                for holistic_track in holistic_tracks:
+                    task = asyncio.ensure_future(_send_landmark_query(
+                        channel, holistic_track, message[len("query_landmarks"):].strip(),
+                        session_options["wire_format"]
+                    ))
+                    task.add_done_callback(_log_query_failure)
+                    break
             elif message.startswith("get_performance"):
                 # Request performance statistics
                 try:
-                    for sender in pc.getSenders():
-                        if sender.track and isinstance(sender.track, HolisticVideoTrack):
-                            perf_summary = sender.track.performance_monitor.get_performance_summary()
-                            channel.send(json.dumps({
-                                'type': 'performance_summary',
-                                'stats': perf_summary
-                            }))
-                            break
+                    for holistic_track in holistic_tracks:
+                        perf_summary = holistic_track.performance_monitor.get_performance_summary()
+                        channel.send(json.dumps({
+                            'type': 'performance_summary',
+                            'stats': perf_summary
+                        }))
+                        break
                 except Exception as e:
                     logger.error(f"Error handling get_performance request: {e}")
     
-    # Set remote description
-    await pc.setRemoteDescription(offer)
-    
-    # Create answer
-    answer = await pc.createAnswer()
-    await pc.setLocalDescription(answer)
+    try:
+        # Set remote description
+        await pc.setRemoteDescription(offer)
+        
+        # Create answer
+        answer = await pc.createAnswer()
+        await pc.setLocalDescription(answer)
+    except Exception:
+        # Negotiation failed - give the admission slot back
+        await pc.close()
+        pcs.discard(pc)
+        await scheduler.release(admission_key)
+        raise
     
     return web.json_response({
-        "sdp": {"sdp": pc.localDescription.sdp, "type": pc.localDescription.type}
+        "sdp": {"sdp": pc.localDescription.sdp, "type": pc.localDescription.type},
+        # Needed to query or subscribe to this session's landmarks
+        "session_id": holistic_tracks[0].session_id if holistic_tracks else None
     })
 
 async def on_shutdown(app):
@@ -720,9 +3249,43 @@ async def on_shutdown(app):
     coros = [pc.close() for pc in pcs]
     await asyncio.gather(*coros)
     pcs.clear()
+    app["inference_executor"].shutdown()
+    if app["sign_recognizer"] is not None:
+        app["sign_recognizer"].shutdown()
 
-if __name__ == "__main__":
+def create_app(executor_kind=INFERENCE_EXECUTOR, inference_workers=INFERENCE_WORKERS,
+               max_sessions=MAX_SESSIONS, model_pool_size=MODEL_POOL_SIZE, sign_model=SIGN_MODEL,
+               process_index=None, warm_workers=WARM_WORKERS):
+    """
+    Build the aiohttp application for one server process.
+    
+    Args:
+        executor_kind: "thread" or "process" inference workers
+        inference_workers: Number of inference workers for this process
+        max_sessions: Peer connections this process accepts (0 = unlimited)
+        model_pool_size: Models to pre-warm per inference worker
+        sign_model: Sign recognition model file ("" = no recognition)
+        process_index: Index of this process when several share the port
+            (tags session ids, see _find_session), None for a single process
+        warm_workers: Inference workers that pre-warm their pool (0 = one per
+            session slot, see WARM_WORKERS)
+    """
     app = web.Application()
+    if not warm_workers:
+        warm_workers = max_sessions or 1
+    app["inference_executor"] = InferenceExecutor(executor_kind, inference_workers, model_pool_size, warm_workers)
+    app["max_sessions"] = max_sessions
+    app["session_scheduler"] = SessionScheduler(app["inference_executor"].workers, max_sessions)
+    app["metrics"] = ServerMetrics()
+    app["holistic_sessions"] = {}
+    app["process_index"] = process_index
+    app["sign_recognizer"] = None
+    if sign_model:
+        app["sign_recognizer"] = RecognitionBatcher(
+            load_backend(sign_model), max_batch=RECOGNITION_BATCH, deadline=RECOGNITION_DEADLINE_MS / 1000
+        )
+        logger.info(f"Sign recognition model {sign_model}: {len(app['sign_recognizer'].labels)} glosses, "
+                    f"{app['sign_recognizer'].window} frame window")
     app.on_shutdown.append(on_shutdown)
     
     # Set up CORS
@@ -745,13 +3308,104 @@ if __name__ == "__main__":
     resource = cors.add(app.router.add_resource("/offer"))
     cors.add(resource.add_route("POST", offer))
     
+    resource = cors.add(app.router.add_resource("/metrics"))
+    cors.add(resource.add_route("GET", metrics))
+    
+    resource = cors.add(app.router.add_resource("/sessions"))
+    cors.add(resource.add_route("GET", sessions))
+    
+    resource = cors.add(app.router.add_resource("/sessions/{session_id}/landmarks"))
+    cors.add(resource.add_route("GET", session_landmarks))
+    
+    resource = cors.add(app.router.add_resource("/sessions/{session_id}/subscribe"))
+    cors.add(resource.add_route("GET", subscribe_landmarks))
+    
+    resource = cors.add(app.router.add_resource("/sessions/{session_id}/events"))
+    cors.add(resource.add_route("GET", landmark_events))
+    return app
+
+def serve(host=SERVER_HOST, port=SERVER_PORT, reuse_port=False, use_uvloop=False, **app_options):
+    """Run one server process until it is interrupted"""
+    configure_logging()
+    if use_uvloop:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    app = create_app(**app_options)
+    logger.info(f"Server process {os.getpid()} listening on {host}:{port}")
+    web.run_app(app, host=host, port=port, reuse_port=reuse_port, print=None)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Holistic sign language landmark server")
+    parser.add_argument("--host", default=SERVER_HOST, help="Address to listen on")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="Port to listen on")
+    parser.add_argument("--processes", type=int, default=SERVER_PROCESSES,
+                        help="Server processes sharing the port through SO_REUSEPORT")
+    parser.add_argument("--executor", choices=("thread", "process"), default=INFERENCE_EXECUTOR,
+                        help="Inference worker kind inside each server process")
+    parser.add_argument("--inference-workers", type=int, default=None,
+                        help="Inference workers per server process (default: CPU count / processes)")
+    parser.add_argument("--max-sessions", type=int, default=MAX_SESSIONS,
+                        help="Peer connections accepted per server process (0 = unlimited)")
+    parser.add_argument("--model-pool", type=int, default=MODEL_POOL_SIZE,
+                        help="Models pre-warmed per inference worker")
+    parser.add_argument("--warm-workers", type=int, default=WARM_WORKERS,
+                        help="Inference workers that pre-warm models (0 = min(--max-sessions, workers), "
+                             "1 without a session limit)")
+    parser.add_argument("--uvloop", action="store_true", default=USE_UVLOOP,
+                        help="Run the event loops on uvloop")
+    parser.add_argument("--sign-model", default=SIGN_MODEL,
+                        help="Sign recognition model (.npz or .onnx) applied to every session")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging()
+    logger.info(f"GPU available: {gpu_available}")
+    processes = max(1, args.processes)
+    if processes > 1 and not hasattr(socket, "SO_REUSEPORT"):
+        logger.warning("SO_REUSEPORT is not available on this platform, running a single server process")
+        processes = 1
+    if processes > 1:
+        logger.warning("Several server processes: per-session HTTP endpoints (/sessions/<id>/...) only "
+                       "answer from the process that owns the session")
+    if args.uvloop and importlib.util.find_spec("uvloop") is None:
+        logger.warning("uvloop is not installed, using the default asyncio event loop")
+        args.uvloop = False
+    if args.sign_model.lower().endswith(".onnx") and importlib.util.find_spec("onnxruntime") is None:
+        logger.warning("onnxruntime is not installed, sign recognition is disabled")
+        args.sign_model = ""
+    inference_workers = args.inference_workers
+    if inference_workers is None:
+        # HOLISTIC_WORKERS still applies per process when set explicitly
+        inference_workers = int(os.environ.get("HOLISTIC_WORKERS", 0)) or max(1, (os.cpu_count() or 1) // processes)
+    
+    serve_options = {
+        "host": args.host,
+        "port": args.port,
+        "reuse_port": processes > 1,
+        "use_uvloop": args.uvloop,
+        "executor_kind": args.executor,
+        "inference_workers": inference_workers,
+        "max_sessions": args.max_sessions,
+        "model_pool_size": args.model_pool,
+        "warm_workers": args.warm_workers,
+        "sign_model": args.sign_model
+    }
+    
     # Start server with enhanced logging
     print("=" * 60)
     print("🚀 Starting OPTIMIZED Holistic Sign Language Detection Server")
     print("=" * 60)
-    print(f"🖥️  Server URL: http://localhost:8765")
+    print(f"🖥️  Server URL: http://{args.host}:{args.port}")
     print(f"⚡ GPU acceleration: {'✅ Available' if gpu_available else '❌ Not available'}")
     print(f"🎯 Performance mode: ✅ Enabled")
+    print(f"🗂️  Server processes: {processes}{' (SO_REUSEPORT)' if processes > 1 else ''}")
+    print(f"🧵 Inference workers per process: {inference_workers} ({args.executor})")
+    print(f"♨️  Pre-warmed models per worker: {args.model_pool} "
+          f"(on {args.warm_workers or min(args.max_sessions or 1, inference_workers)} worker(s))")
+    print(f"👥 Sessions per process: {args.max_sessions or 'unlimited'}")
+    print(f"🔁 Event loop: {'uvloop' if args.uvloop else 'asyncio'}")
+    print(f"🤟 Sign recognition: {args.sign_model or 'disabled'}")
     print(f"📏 Resolution scaling: ✅ Adaptive")
     print(f"📊 Quality monitoring: ✅ Active")
     print("=" * 60)
@@ -762,4 +3416,32 @@ if __name__ == "__main__":
     print("   • Monitor the logs for adaptive adjustments")
     print("=" * 60)
     
-    web.run_app(app, host="localhost", port=8765)
\ No newline at end of file
+    if processes == 1:
+        serve(**serve_options)
+        return
+    
+    # Every process runs its own event loop, inference workers and peer
+    # connections; the kernel spreads incoming connections across them.
+    # A session's /offer and its media (on separate UDP ports) stay in the
+    # process that accepted the offer.
+    context = multiprocessing.get_context("spawn")
+    servers = [
+        context.Process(target=serve, kwargs=dict(serve_options, process_index=i), name=f"holistic-server-{i}")
+        for i in range(processes)
+    ]
+    for server in servers:
+        server.start()
+    try:
+        for server in servers:
+            server.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for server in servers:
+            if server.is_alive():
+                server.terminate()
+        for server in servers:
+            server.join()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+"""
+Server-side sign recognition over sliding windows of landmarks.
+
+Every few frames a session turns the newest frames of its landmark history
+into a normalized feature tensor (build_features) and hands it to the
+server's RecognitionBatcher. The batcher collects the requests of all
+sessions and runs them through the model together once max_batch requests
+are waiting or the oldest has waited deadline seconds, so the model sees
+a few large matrix products instead of many tiny ones. Recognized glosses
+go back to the session's data channel as "sign_recognition" messages.
+
+Features per frame (FEATURES_PER_FRAME values):
+
+    pose    upper body landmarks 0-24, x/y/z relative to the midpoint of the
+            shoulders and divided by the shoulder width
+    hands   per hand, the 21 landmarks relative to its wrist and divided by
+            the wrist to middle knuckle distance (hand shape), followed by
+            the wrist in body coordinates as above (hand location)
+    present 1/0 for pose, left hand, right hand
+
+Missing components are zeros. Windows shorter than the model's length are
+padded at the start with empty frames.
+
+Models (see load_backend):
+
+    .npz    NumPy multilayer perceptron: arrays w0, b0, w1, b1, ... applied to
+            the flattened (window * FEATURES_PER_FRAME) input with ReLU
+            between layers, plus labels (K,) and window (scalar); write one
+            with save_numpy_model()
+    .onnx   ONNX Runtime (optional dependency) model taking a float32
+            (batch, window, FEATURES_PER_FRAME) tensor and returning
+            (batch, K) scores; labels come from a "labels" JSON list in the
+            model metadata or a <model>.labels.txt file next to it
+
+Labels starting with "_" (e.g. "_background") are never reported.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from landmark_protocol import COMPONENT_SLICES
+
+logger = logging.getLogger("HolisticSignRecognition")
+
+# Landmark indices (MediaPipe pose and hand models)
+UPPER_BODY = np.arange(25)
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+WRIST, MIDDLE_KNUCKLE = 0, 9
+HAND_LANDMARKS = 21
+
+POSE_FEATURES = len(UPPER_BODY) * 3
+HAND_FEATURES = HAND_LANDMARKS * 3 + 3
+FEATURES_PER_FRAME = POSE_FEATURES + 2 * HAND_FEATURES + 3
+
+# Presence columns of a landmark window (landmark_protocol order)
+_POSE, _LEFT_HAND, _RIGHT_HAND = 1, 2, 3
+
+
+def _normalized(points, origin, scale):
+    scale = np.where(scale > 1e-6, scale, 1.0)
+    return (points - origin[:, None, :]) / scale[:, None, None]
+
+
+def build_features(window, length):
+    """
+    Feature tensor for the newest frames of a landmark window.
+
+    Args:
+        window: Dict with 'landmarks' (T, TOTAL_LANDMARKS, 4) and 'presence'
+            (T, 4), e.g. HolisticLandmarksTracker.get_window()
+        length: Frames the model expects; older frames are dropped, missing
+            ones padded at the start
+
+    Returns:
+        ndarray: (length, FEATURES_PER_FRAME) float32
+    """
+    landmarks = np.asarray(window['landmarks'][-length:], dtype=np.float32)[..., :3]
+    presence = np.asarray(window['presence'][-length:])
+    frames = len(landmarks)
+    features = np.zeros((length, FEATURES_PER_FRAME), dtype=np.float32)
+    if not frames:
+        return features
+    rows = features[length - frames:]
+
+    pose = landmarks[:, COMPONENT_SLICES['pose_landmarks']]
+    has_pose = presence[:, _POSE]
+    shoulders = pose[:, [LEFT_SHOULDER, RIGHT_SHOULDER]]
+    origin = np.where(has_pose[:, None], shoulders.mean(axis=1), 0.5)
+    body_scale = np.where(has_pose, np.linalg.norm(shoulders[:, 0, :2] - shoulders[:, 1, :2], axis=-1), 1.0)
+    rows[:, :POSE_FEATURES] = (
+        _normalized(pose[:, UPPER_BODY], origin, body_scale) * has_pose[:, None, None]
+    ).reshape(frames, -1)
+
+    offset = POSE_FEATURES
+    for name, bit in (('left_hand_landmarks', _LEFT_HAND), ('right_hand_landmarks', _RIGHT_HAND)):
+        hand = landmarks[:, COMPONENT_SLICES[name]]
+        has_hand = presence[:, bit]
+        wrist = hand[:, WRIST]
+        hand_scale = np.linalg.norm(hand[:, MIDDLE_KNUCKLE, :2] - wrist[:, :2], axis=-1)
+        shape = _normalized(hand, wrist, hand_scale).reshape(frames, -1)
+        location = (wrist - origin) / np.where(body_scale > 1e-6, body_scale, 1.0)[:, None]
+        rows[:, offset:offset + HAND_FEATURES] = np.concatenate([shape, location], axis=1) * has_hand[:, None]
+        offset += HAND_FEATURES
+
+    rows[:, offset:] = presence[:, [_POSE, _LEFT_HAND, _RIGHT_HAND]]
+    return features
+
+
+def _softmax(scores):
+    scores = scores - scores.max(axis=1, keepdims=True)
+    exp = np.exp(scores)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class NumpyBackend:
+    """Multilayer perceptron evaluated with NumPy (see the module docstring for the file layout)"""
+
+    def __init__(self, path):
+        with np.load(path, allow_pickle=False) as data:
+            self.labels = [str(label) for label in data['labels']]
+            self.window = int(data['window'])
+            self.layers = []
+            while f"w{len(self.layers)}" in data:
+                index = len(self.layers)
+                self.layers.append((data[f"w{index}"].astype(np.float32), data[f"b{index}"].astype(np.float32)))
+        if not self.layers:
+            raise ValueError(f"No layers in {path}")
+        expected = self.window * FEATURES_PER_FRAME
+        if self.layers[0][0].shape[0] != expected:
+            raise ValueError(f"{path}: first layer takes {self.layers[0][0].shape[0]} inputs, "
+                             f"window {self.window} needs {expected}")
+        if self.layers[-1][0].shape[1] != len(self.labels):
+            raise ValueError(f"{path}: {self.layers[-1][0].shape[1]} outputs for {len(self.labels)} labels")
+
+    def predict(self, batch):
+        """(B, window, FEATURES_PER_FRAME) features -> (B, K) probabilities"""
+        values = batch.reshape(len(batch), -1)
+        for index, (weights, bias) in enumerate(self.layers):
+            values = values @ weights + bias
+            if index < len(self.layers) - 1:
+                np.maximum(values, 0, out=values)
+        return _softmax(values)
+
+
+class OnnxBackend:
+    """Model run with ONNX Runtime on the CPU"""
+
+    def __init__(self, path, threads=0):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        window = model_input.shape[1]
+        if not isinstance(window, int):
+            raise ValueError(f"{path}: the window dimension of input {self.input_name} must be fixed")
+        self.window = window
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        if "labels" in metadata:
+            self.labels = [str(label) for label in json.loads(metadata["labels"])]
+        else:
+            with open(os.path.splitext(path)[0] + ".labels.txt") as f:
+                self.labels = [line.strip() for line in f if line.strip()]
+
+    def predict(self, batch):
+        """(B, window, FEATURES_PER_FRAME) features -> (B, K) probabilities"""
+        scores = self.session.run(None, {self.input_name: batch.astype(np.float32, copy=False)})[0]
+        # Models may end in a softmax or return raw scores
+        if np.all(scores >= 0) and np.allclose(scores.sum(axis=1), 1.0, atol=1e-3):
+            return scores
+        return _softmax(scores)
+
+
+def load_backend(path):
+    """Model backend for a .npz or .onnx file"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".npz":
+        return NumpyBackend(path)
+    if extension == ".onnx":
+        return OnnxBackend(path)
+    raise ValueError(f"Unknown sign model type: {path} (expected .npz or .onnx)")
+
+
+def save_numpy_model(path, layers, labels, window):
+    """
+    Write a NumpyBackend model.
+
+    Args:
+        path: Output .npz file
+        layers: List of (weights (inputs, outputs), bias (outputs,)) pairs
+        labels: Gloss per output
+        window: Frames per input window
+    """
+    arrays = {'labels': np.array(labels), 'window': np.array(window)}
+    for index, (weights, bias) in enumerate(layers):
+        arrays[f"w{index}"] = np.asarray(weights, dtype=np.float32)
+        arrays[f"b{index}"] = np.asarray(bias, dtype=np.float32)
+    np.savez(path, **arrays)
+
+
+class RecognitionBatcher:
+    """
+    Collects classification requests from every session and runs them in batches.
+
+    Args:
+        backend: NumpyBackend, OnnxBackend or anything with predict(), labels and window
+        max_batch: Requests per model call at most
+        deadline: Seconds the first request of a batch waits for others
+    """
+
+    def __init__(self, backend, max_batch=64, deadline=0.02):
+        self.backend = backend
+        self.max_batch = max(1, max_batch)
+        self.deadline = deadline
+        # One thread: batches run back to back, and requests arriving while
+        # one runs make the next batch larger
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sign-recognition")
+        self._pending = []
+        self._timer = None
+        self.requests = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.largest_batch = 0
+        self.model_seconds = 0.0
+
+    @property
+    def labels(self):
+        return self.backend.labels
+
+    @property
+    def window(self):
+        return self.backend.window
+
+    async def classify(self, features):
+        """Probabilities for one (window, FEATURES_PER_FRAME) feature tensor"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((features, future))
+        self.requests += 1
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.deadline, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch):
+        loop = asyncio.get_running_loop()
+        inputs = np.stack([features for features, _ in batch])
+        try:
+            probabilities, seconds = await loop.run_in_executor(self.executor, self._predict, inputs)
+        except Exception as e:
+            self.failed_batches += 1
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.model_seconds += seconds
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        for (_, future), row in zip(batch, probabilities):
+            if not future.done():
+                future.set_result(row)
+
+    def _predict(self, inputs):
+        started = time.perf_counter()
+        probabilities = self.backend.predict(inputs)
+        return probabilities, time.perf_counter() - started
+
+    def get_status(self):
+        return {
+            'labels': len(self.labels),
+            'window': self.window,
+            'max_batch': self.max_batch,
+            'deadline_ms': self.deadline * 1000,
+            'requests': self.requests,
+            'batches': self.batches,
+            'failed_batches': self.failed_batches,
+            'mean_batch': self.requests / self.batches if self.batches else 0.0,
+            'largest_batch': self.largest_batch,
+            'model_ms_per_request': self.model_seconds / self.requests * 1000 if self.requests else 0.0
+        }
+
+    def shutdown(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class SessionRecognizer:
+    """
+    Sign recognition state of one session.
+
+    Args:
+        batcher: The server's RecognitionBatcher
+        stride: Frames between classifications
+        threshold: Lowest probability reported as a gloss
+        hold: Seconds before the same gloss is reported again
+        top_k: Alternatives included in each message
+    """
+
+    def __init__(self, batcher, stride=8, threshold=0.6, hold=1.0, top_k=3):
+        self.batcher = batcher
+        self.stride = max(1, stride)
+        self.threshold = threshold
+        self.hold = hold
+        self.top_k = top_k
+        self.recognitions = 0
+        self.failures = 0
+        self._frames = 0
+        self._in_flight = False
+        self._last_gloss = None
+        self._last_sent = 0.0
+
+    def on_frame(self, tracker, frame_id, send):
+        """
+        Called after every frame is added to the tracker. Every stride frames
+        (and only with no classification of this session still pending) the
+        newest window is classified in the background; send(message) gets
+        the resulting sign_recognition message.
+        """
+        self._frames += 1
+        if self._in_flight or self._frames % self.stride or self._frames < self.batcher.window // 2:
+            return
+        features = build_features(tracker.get_window(self.batcher.window), self.batcher.window)
+        self._in_flight = True
+        asyncio.ensure_future(self._classify(features, frame_id, send))
+
+    async def _classify(self, features, frame_id, send):
+        try:
+            probabilities = await self.batcher.classify(features)
+        except Exception:
+            # Logged once: a broken model would otherwise flood the log every stride frames
+            self.failures += 1
+            if self.failures == 1:
+                logger.exception("Sign recognition failed; further failures of this session are only counted")
+            return
+        finally:
+            self._in_flight = False
+        order = np.argsort(probabilities)[::-1]
+        best = int(order[0])
+        gloss = self.batcher.labels[best]
+        confidence = float(probabilities[best])
+        now = time.time()
+        if gloss.startswith("_") or confidence < self.threshold:
+            self._last_gloss = None
+            return
+        if gloss == self._last_gloss and now - self._last_sent < self.hold:
+            return
+        self._last_gloss = gloss
+        self._last_sent = now
+        self.recognitions += 1
+        send({
+            'type': 'sign_recognition',
+            'gloss': gloss,
+            'confidence': confidence,
+            'frame_id': frame_id,
+            'alternatives': [
+                {'gloss': self.batcher.labels[int(index)], 'confidence': float(probabilities[index])}
+                for index in order[1:self.top_k]
+            ]
+        })
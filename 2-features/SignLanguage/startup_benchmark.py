@@ -0,0 +1,144 @@
+"""
+Startup benchmark for the MediaPipe WebRTC server.
+
+Starts the server as a fresh process (a cold start) and reports:
+
+    ping_s       time until /ping answers
+    ping_rss_mb  resident memory of the server at that point
+    warm_s       time until every pre-warmed model is ready
+    warm_rss_mb  resident memory once warm, worker processes included
+
+Usage:
+    python startup_benchmark.py [--runs 3] [--port 8790] [--json]
+
+Server settings (HOLISTIC_EXECUTOR, HOLISTIC_WORKERS, HOLISTIC_MODEL_POOL, ...)
+are taken from the environment as usual. RSS is read from /proc, so memory
+figures are only reported on Linux.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mediapipe_webrtc_server.py")
+
+
+def _child_pids(pid):
+    children = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+    except OSError:
+        pass
+    return children
+
+
+def resident_memory_mb(pid):
+    """
+    Resident set size of a process and all its descendants (inference
+    worker processes included) in MB, or None where /proc is unavailable.
+    """
+    total_kb = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except OSError:
+            if current == pid:
+                return None
+            continue
+        pending.extend(_child_pids(current))
+    return total_kb / 1024
+
+
+def fetch_ping(port):
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/ping", timeout=1) as response:
+            return json.load(response)
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return None
+
+
+def measure_startup(port, timeout=120.0, poll_interval=0.01):
+    """Start one server process and time how long it takes to answer and to warm up"""
+    env = dict(os.environ, HOLISTIC_HOST="127.0.0.1", HOLISTIC_PORT=str(port))
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, SERVER_SCRIPT],
+        cwd=os.path.dirname(SERVER_SCRIPT),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    result = {}
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"Server exited with code {server.returncode}")
+            status = fetch_ping(port)
+            if status is None:
+                time.sleep(poll_interval)
+                continue
+            if "ping_s" not in result:
+                result["ping_s"] = time.perf_counter() - started
+                result["ping_rss_mb"] = resident_memory_mb(server.pid)
+            pool = status.get("model_pool", {})
+            workers = status["inference_executor"]["workers"]
+            expected = pool.get("size_per_worker", 0) * pool.get("warm_workers", workers)
+            if pool.get("workers_reporting") == workers and pool.get("capacity", 0) >= expected:
+                result["warm_s"] = time.perf_counter() - started
+                result["warm_rss_mb"] = resident_memory_mb(server.pid)
+                return result
+            time.sleep(poll_interval)
+        raise TimeoutError(f"Server not ready after {timeout:.0f}s")
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+
+def summarize(runs):
+    summary = {}
+    for key in runs[0]:
+        values = [run[key] for run in runs if run[key] is not None]
+        if values:
+            summary[key] = {"median": statistics.median(values), "min": min(values), "max": max(values)}
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold start time and memory of the landmark server")
+    parser.add_argument("--runs", type=int, default=3, help="Number of cold starts to measure")
+    parser.add_argument("--port", type=int, default=8790, help="Port for the benchmarked server")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds to wait for each start")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    runs = [measure_startup(args.port, args.timeout) for _ in range(args.runs)]
+    report = {"runs": runs, "summary": summarize(runs)}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for key, stats in report["summary"].items():
+        unit = "MB" if key.endswith("_mb") else "s"
+        print(f"{key:12s} median {stats['median']:8.2f} {unit}   "
+              f"(min {stats['min']:.2f}, max {stats['max']:.2f})")
+
+
+if __name__ == "__main__":
+    main()
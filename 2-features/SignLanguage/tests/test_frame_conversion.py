@@ -0,0 +1,77 @@
+from multiprocessing import shared_memory
+
+import av
+import cv2
+import numpy as np
+
+from mediapipe_webrtc_server import I420Frame, SharedFrameSlot
+
+
+def gradient(width=64, height=48):
+    x, y = np.meshgrid(np.linspace(0, 255, width), np.linspace(0, 255, height))
+    return np.dstack([x, y, 255 - x]).astype(np.uint8)
+
+
+def to_i420(bgr):
+    height, width = bgr.shape[:2]
+    i420 = cv2.cvtColor(bgr, cv2.COLOR_BGR2YUV_I420).reshape(-1)
+    return I420Frame.from_buffer(i420, width, height)
+
+
+def assert_close(image, expected, tolerance=8):
+    difference = np.abs(image.astype(np.int16) - expected.astype(np.int16))
+    assert difference.mean() < tolerance
+
+
+def test_convert_full_frame_and_rgb():
+    bgr = gradient()
+    frame = to_i420(bgr)
+    assert (frame.width, frame.height, frame.nbytes) == (64, 48, 64 * 48 * 3 // 2)
+    assert_close(frame.convert((64, 48), cv2.COLOR_YUV2BGR_I420), bgr)
+    assert_close(frame.convert((64, 48), cv2.COLOR_YUV2RGB_I420), bgr[:, :, ::-1])
+
+
+def test_convert_scales_and_crops():
+    bgr = gradient()
+    frame = to_i420(bgr)
+    scaled = frame.convert((33, 25), cv2.COLOR_YUV2BGR_I420)
+    assert scaled.shape == (24, 32, 3)    # Rounded down to even sizes
+    assert_close(scaled, cv2.resize(bgr, (32, 24), interpolation=cv2.INTER_AREA))
+    crop = frame.convert((20, 16), cv2.COLOR_YUV2BGR_I420, box=(10, 8, 30, 24))
+    assert crop.shape == (16, 20, 3)
+    assert_close(crop, bgr[8:24, 10:30])
+
+
+def test_convert_reuses_buffers():
+    frame = to_i420(gradient())
+    buffers = {}
+    first = frame.convert((32, 24), cv2.COLOR_YUV2RGB_I420, buffers=buffers)
+    smaller = frame.convert((16, 12), cv2.COLOR_YUV2RGB_I420, buffers=buffers)
+    other = frame.convert((16, 12), cv2.COLOR_YUV2RGB_I420, buffers=buffers, name="crop")
+    assert np.shares_memory(first, smaller)
+    assert not np.shares_memory(smaller, other)
+
+
+def test_from_av_matches_decoder_planes():
+    bgr = gradient()
+    frame = I420Frame.from_av(av.VideoFrame.from_ndarray(bgr, format="bgr24"))
+    assert (frame.width, frame.height) == (64, 48)
+    assert frame.u.shape == (24, 32)
+    assert_close(frame.convert((64, 48), cv2.COLOR_YUV2BGR_I420), bgr)
+
+
+def test_shared_slot_round_trip():
+    frame = to_i420(gradient())
+    slot = SharedFrameSlot()
+    try:
+        ref = slot.put(frame)
+        memory = shared_memory.SharedMemory(name=ref.name)
+        try:
+            shared = I420Frame.from_buffer(memory.buf, ref.width, ref.height)
+            for plane, copy in zip((frame.y, frame.u, frame.v), (shared.y, shared.u, shared.v)):
+                np.testing.assert_array_equal(plane, copy)
+            del shared, plane, copy
+        finally:
+            memory.close()
+    finally:
+        slot.close()
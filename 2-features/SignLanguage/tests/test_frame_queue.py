@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+
+from mediapipe_webrtc_server import LatestFrameQueue
+
+
+def test_latest_frame_queue_keeps_newest():
+    async def scenario():
+        queue = LatestFrameQueue(maxsize=2)
+        assert not queue.put("a")
+        assert not queue.put("b")
+        assert queue.put("c")
+        frames = [(await queue.get())[0], (await queue.get())[0]]
+        queue.close(EOFError())
+        with pytest.raises(EOFError):
+            await queue.get()
+        return frames
+
+    assert asyncio.run(scenario()) == ["b", "c"]
+
+
+def test_latest_frame_queue_wakes_waiting_reader():
+    async def scenario():
+        queue = LatestFrameQueue()
+        reader = asyncio.ensure_future(queue.get())
+        await asyncio.sleep(0.01)
+        assert not reader.done()
+        queue.put("a")
+        frame, arrival_time = await asyncio.wait_for(reader, 1.0)
+        return frame, arrival_time > 0
+
+    assert asyncio.run(scenario()) == ("a", True)
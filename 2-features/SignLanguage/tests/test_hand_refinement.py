@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from mediapipe_webrtc_server import HandRefiner, HolisticResult, I420Frame
+
+WIDTH, HEIGHT = 640, 480
+
+
+def make_pose(wrist=(0.25, 0.5)):
+    pose = np.zeros((33, 4), dtype=np.float32)
+    pose[11] = (0.6, 0.3, 0, 1)     # Shoulders, 128 px apart
+    pose[12] = (0.4, 0.3, 0, 1)
+    pose[15] = (*wrist, 0, 1)       # Left wrist; knuckles 24 px above it
+    pose[17] = (wrist[0], wrist[1] - 0.05, 0, 1)
+    pose[19] = (wrist[0], wrist[1] - 0.05, 0, 1)
+    return pose
+
+
+def blank_frame():
+    return I420Frame.from_buffer(np.zeros(WIDTH * HEIGHT * 3 // 2, np.uint8), WIDTH, HEIGHT)
+
+
+class FakeHandsModel:
+    """Finds one hand whose wrist sits at the given crop coordinates"""
+
+    def __init__(self, wrist=(0.5, 0.5)):
+        self.wrist = wrist
+        self.crops = []
+
+    def process(self, crop):
+        self.crops.append(crop.shape)
+        if self.wrist is None:
+            return SimpleNamespace(left_hand_landmarks=None, right_hand_landmarks=None)
+        points = [SimpleNamespace(x=self.wrist[0], y=self.wrist[1] - 0.1 * (i > 0), z=0.1, visibility=0.0)
+                  for i in range(21)]
+        return SimpleNamespace(left_hand_landmarks=None, right_hand_landmarks=SimpleNamespace(landmark=points))
+
+
+def test_target_box_follows_hand_span_and_shoulders():
+    refiner = HandRefiner()
+    pose = make_pose()
+    center, side_length = refiner._target_box(pose, 'left_hand_landmarks', WIDTH, HEIGHT)
+    np.testing.assert_allclose(center, (160, 228))
+    assert side_length == pytest.approx(0.6 * 128)   # Shoulders beat the 72 px hand span
+    assert refiner._target_box(pose, 'right_hand_landmarks', WIDTH, HEIGHT) is None   # Not visible
+
+
+def test_box_stays_put_until_the_hand_leaves_its_middle():
+    refiner = HandRefiner()
+    side = 'left_hand_landmarks'
+    box = refiner._box(side, ((160, 228), 80), WIDTH, HEIGHT)
+    assert box == (120, 188, 200, 268)
+    assert refiner._box(side, ((170, 235), 82), WIDTH, HEIGHT) is box
+    assert refiner._box(side, ((190, 228), 80), WIDTH, HEIGHT) == (150, 188, 230, 268)
+    # Boxes are clamped inside the frame
+    assert refiner._box(side, ((5, 470), 80), WIDTH, HEIGHT) == (0, 400, 80, 480)
+
+
+def test_refined_hand_is_mapped_back_to_the_frame():
+    refiner = HandRefiner(crop_size=32)
+    model = refiner.models['left_hand_landmarks'] = FakeHandsModel()
+    results = HolisticResult(pose_landmarks=make_pose())
+    assert refiner.refine(blank_frame(), results, {}) == 1
+    x0, y0, x1, y1 = refiner.boxes['left_hand_landmarks']
+    assert model.crops == [(32, 32, 3)]      # Downscaled to crop_size
+    hand = results.left_hand_landmarks
+    np.testing.assert_allclose(hand[0, :2], ((x0 + x1) / 2 / WIDTH, (y0 + y1) / 2 / HEIGHT), atol=1e-6)
+    np.testing.assert_allclose(hand[1, 1], hand[0, 1] - 0.1 * (y1 - y0) / HEIGHT, atol=1e-6)
+    assert hand[0, 2] == pytest.approx(0.1 * (x1 - x0) / WIDTH)
+    refiner.models.clear()
+
+
+def test_missed_hand_keeps_first_pass_and_backs_off():
+    refiner = HandRefiner(retry_frames=3)
+    model = refiner.models['left_hand_landmarks'] = FakeHandsModel(wrist=(0.0, 0.0))   # Far from the pose wrist
+    first_pass = np.full((21, 4), 0.7, dtype=np.float32)
+    frame = blank_frame()
+    for _ in range(4):
+        results = HolisticResult(pose_landmarks=make_pose(), left_hand_landmarks=first_pass)
+        assert refiner.refine(frame, results, {}) == 0
+        assert results.left_hand_landmarks is first_pass
+    # Tried on the first frame, then again only after sitting out two
+    assert len(model.crops) == 2
+    refiner.models.clear()
+
+
+def test_map_from_crop():
+    hand = np.array([[0.5, 0.25, 0.2, 1.0]], dtype=np.float32)
+    result = HolisticResult(left_hand_landmarks=hand).map_from_crop(0.1, 0.2, 0.5, 0.4)
+    np.testing.assert_allclose(result.left_hand_landmarks, [[0.35, 0.3, 0.1, 1.0]])
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from landmark_protocol import (
+    COMPONENTS, FLAG_PREDICTED, FLAG_REUSED, MAX_BATCH_FRAMES, ProtocolError,
+    decode_message, encode_batch, encode_batches, encode_frame
+)
+
+
+def make_components(seed=0, missing=()):
+    rng = np.random.default_rng(seed)
+    return tuple(
+        None if bit in missing else rng.uniform(-1, 1, (count, 4)).astype(np.float32)
+        for bit, (_, count) in enumerate(COMPONENTS)
+    )
+
+
+@pytest.mark.parametrize("encoding, tolerance", [("f32", 0), ("f16", 1e-3), ("i16", 1 / 8192)])
+def test_frame_round_trip(encoding, tolerance):
+    components = make_components(missing=(0,))
+    message = encode_frame(7, 1234.5, 0.75, components, encoding=encoding, flags=FLAG_PREDICTED)
+    [frame] = decode_message(message)
+    assert frame['frame_id'] == 7
+    assert frame['timestamp'] == 1234.5
+    assert frame['quality_score'] == pytest.approx(0.75)
+    assert frame['encoding'] == encoding
+    assert frame['predicted'] and not frame['reused']
+    assert frame['face_landmarks'] is None
+    for (name, _), landmarks in zip(COMPONENTS[1:], components[1:]):
+        np.testing.assert_allclose(frame[name], landmarks, atol=tolerance)
+
+
+def test_batch_round_trip():
+    frames = [(i, 100.0 + i, 0.5, make_components(i), ) for i in range(3)]
+    decoded = decode_message(encode_batch(frames, encoding="f32"))
+    assert [frame['frame_id'] for frame in decoded] == [0, 1, 2]
+    np.testing.assert_array_equal(decoded[2]['pose_landmarks'], frames[2][3][1])
+
+
+def test_batches_split_under_size_limit():
+    frames = [(i, float(i), None, make_components(i)) for i in range(10)]
+    frame_size = len(encode_frame(*frames[0], encoding="f16"))
+    messages = encode_batches(frames, encoding="f16", max_bytes=3 * frame_size + 16)
+    assert len(messages) > 1
+    assert all(len(message) <= 3 * frame_size + 16 for message in messages)
+    decoded = [frame for message in messages for frame in decode_message(message)]
+    assert [frame['frame_id'] for frame in decoded] == list(range(10))
+
+
+def test_reused_flag_and_garbage():
+    [frame] = decode_message(encode_frame(1, 0.0, 0.0, (None,) * 4, flags=FLAG_REUSED))
+    assert frame['reused'] and not frame['predicted']
+    with pytest.raises(ProtocolError):
+        decode_message(b"nope" + bytes(32))
+    with pytest.raises(ProtocolError):
+        decode_message(encode_frame(1, 0.0, 0.0, make_components())[:-10])
+
+
+def test_batch_frame_count_limit():
+    frames = [(i, float(i), None, (None,) * 4) for i in range(MAX_BATCH_FRAMES + 2)]
+    with pytest.raises(ValueError, match="at most"):
+        encode_batch(frames)
+    messages = encode_batches(frames, max_bytes=1 << 30)
+    assert [len(decode_message(message)) for message in messages] == [MAX_BATCH_FRAMES, 2]
@@ -0,0 +1,115 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+from aiohttp import WSMsgType, web
+from aiohttp.test_utils import TestClient, TestServer
+
+from landmark_protocol import decode_message
+from landmark_pubsub import LandmarkFrame, LandmarkTopic, pump
+from mediapipe_webrtc_server import ServerMetrics, subscribe_landmarks
+
+
+def make_frame(frame_id, calls=None):
+    def summary():
+        if calls is not None:
+            calls.append(frame_id)
+        return {'type': 'landmarks', 'frame_id': frame_id}
+    pose = np.full((33, 4), 0.5, dtype=np.float32)
+    return LandmarkFrame(frame_id, 100.0 + frame_id, 0.9, (None, pose, None, None), summary=summary)
+
+
+def test_publish_serializes_each_format_once():
+    calls = []
+    topic = LandmarkTopic("s")
+    first, second, binary = topic.subscribe("summary"), topic.subscribe("summary"), topic.subscribe("f16")
+    topic.publish(make_frame(1, calls))
+    assert calls == [1]
+    assert first._messages[0] is second._messages[0]
+    [frame] = decode_message(binary._messages[0])
+    assert frame['frame_id'] == 1
+    with pytest.raises(ValueError):
+        topic.subscribe("xml")
+
+
+def test_full_subscriber_drops_oldest_and_reports():
+    async def scenario():
+        topic = LandmarkTopic("s")
+        subscriber = topic.subscribe("summary", max_queue=2)
+        for frame_id in range(5):
+            topic.publish(make_frame(frame_id))
+        message, dropped = await subscriber.next()
+        return json.loads(message)['frame_id'], dropped, subscriber.dropped
+
+    assert asyncio.run(scenario()) == (3, 3, 3)
+
+
+def test_stalled_subscriber_is_closed_and_removed():
+    topic = LandmarkTopic("s")
+    subscriber = topic.subscribe("summary", max_queue=1, stall_timeout=5)
+    healthy = topic.subscribe("summary")
+    for now in (0, 1, 2, 10):
+        subscriber.offer("x", now=now)
+    assert subscriber.close_reason == "stalled"
+    topic.publish(make_frame(1))
+    assert topic.subscribers == {healthy}
+    assert asyncio.run(subscriber.next()) is None
+
+
+def test_pump_ends_when_session_closes():
+    async def scenario():
+        topic = LandmarkTopic("s")
+        subscriber = topic.subscribe("summary", max_queue=1)
+        sent, controls = [], []
+
+        async def send(message):
+            sent.append(message)
+
+        async def notify(control):
+            controls.append(control)
+
+        topic.publish(make_frame(1))
+        topic.publish(make_frame(2))
+        topic.close()
+        await asyncio.wait_for(pump(subscriber, send, notify), 1.0)
+        late = topic.subscribe("summary")
+        return len(sent), controls, late.close_reason
+
+    sent, controls, late_reason = asyncio.run(scenario())
+    assert sent == 1
+    assert controls == [
+        {'type': 'landmarks_dropped', 'dropped': 1, 'total_dropped': 1},
+        {'type': 'subscription_closed', 'reason': "session_ended"}
+    ]
+    assert late_reason == "session_ended"
+
+
+class FakeTrack:
+    def __init__(self):
+        self.landmark_topic = LandmarkTopic("s")
+
+
+@pytest.mark.filterwarnings("ignore::aiohttp.web.NotAppKeyWarning")
+def test_websocket_closes_when_subscription_ends():
+    async def scenario():
+        track = FakeTrack()
+        app = web.Application()
+        app["holistic_sessions"] = {"s": track}
+        app["process_index"] = None
+        app["metrics"] = ServerMetrics()
+        app.router.add_get("/sessions/{session_id}/subscribe", subscribe_landmarks)
+        async with TestClient(TestServer(app)) as client:
+            ws = await client.ws_connect("/sessions/s/subscribe?format=summary")
+            while not track.landmark_topic.subscribers:
+                await asyncio.sleep(0.01)
+            track.landmark_topic.publish(make_frame(1))
+            track.landmark_topic.close()
+            messages = []
+            async for message in ws:
+                messages.append(json.loads(message.data))
+            return messages, ws.closed
+
+    messages, closed = asyncio.run(asyncio.wait_for(scenario(), 5.0))
+    assert [message['type'] for message in messages] == ["landmarks", "subscription_closed"]
+    assert closed
@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from landmark_protocol import COMPONENTS, TOTAL_LANDMARKS
+from landmark_store import LandmarkRecorder, LandmarkRecording
+
+
+def record(directory, frames, chunk_frames=4):
+    executor = ThreadPoolExecutor(max_workers=1)
+    recorder = LandmarkRecorder(directory, session={'session_id': "test"}, chunk_frames=chunk_frames,
+                                executor=executor)
+    rng = np.random.default_rng(0)
+    rows = []
+    for frame_id in range(frames):
+        landmarks = rng.random((TOTAL_LANDMARKS, 4)).astype(np.float32)
+        presence = [bool(frame_id % 2), True, False, True]
+        quality = None if frame_id == 3 else frame_id / 10
+        recorder.append(landmarks, presence, 1000.0 + frame_id / 10, frame_id, quality, flags=frame_id % 3)
+        rows.append((landmarks, presence))
+    recorder.close()
+    executor.shutdown(wait=True)
+    return rows
+
+
+def test_round_trip(tmp_path):
+    rows = record(str(tmp_path / "rec"), 10)
+    recording = LandmarkRecording(str(tmp_path / "rec"))
+    assert len(recording) == 10
+    assert recording.meta['session'] == {'session_id': "test"}
+    assert recording.meta['components'] == [[name, count] for name, count in COMPONENTS]
+
+    columns = recording.read(slice(0, 10))
+    np.testing.assert_array_equal(columns['frame_ids'], np.arange(10))
+    np.testing.assert_array_equal(columns['landmarks'][7], rows[7][0])
+    assert list(columns['presence'][5]) == rows[5][1]
+    assert np.isnan(columns['quality_scores'][3])
+    assert columns['quality_scores'][4] == np.float32(0.4)
+    np.testing.assert_array_equal(columns['flags'], np.arange(10) % 3)
+
+
+def test_range_lookup_across_chunks(tmp_path):
+    record(str(tmp_path / "rec"), 10, chunk_frames=3)
+    recording = LandmarkRecording(str(tmp_path / "rec"))
+    assert len(recording.index) == 4
+    assert recording.rows_for_frames(2, 7) == slice(2, 8)
+    assert recording.rows_for_frames(20, 30) == slice(0, 0)
+    assert recording.rows_for_time(1000.25, 1000.55) == slice(3, 6)
+
+
+def test_empty_recording(tmp_path):
+    record(str(tmp_path / "rec"), 0)
+    recording = LandmarkRecording(str(tmp_path / "rec"))
+    assert len(recording) == 0
+    assert recording.rows_for_frames(0, 10) == slice(0, 0)
+
+
+def test_open_failure_is_reported_and_stops_recording(tmp_path, caplog):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    executor = ThreadPoolExecutor(max_workers=1)
+    recorder = LandmarkRecorder(str(blocker / "rec"), executor=executor)
+    executor.submit(lambda: None).result()
+    assert not recorder.recording
+    assert recorder.error.startswith("Opening the recording failed")
+    recorder.append(np.zeros((TOTAL_LANDMARKS, 4)), [False] * 4, 0.0, 0)
+    assert recorder.frames_recorded == 0
+    recorder.close()
+    executor.shutdown(wait=True)
+    assert "stopped" in caplog.text
+
+
+def test_write_failure_keeps_written_chunks(tmp_path):
+    directory = str(tmp_path / "rec")
+    executor = ThreadPoolExecutor(max_workers=1)
+    recorder = LandmarkRecorder(directory, chunk_frames=2, executor=executor)
+    for frame_id in range(2):
+        recorder.append(np.zeros((TOTAL_LANDMARKS, 4)), [False] * 4, float(frame_id), frame_id)
+    executor.submit(lambda: None).result()
+    # The disk goes read-only under the recorder
+    landmarks_file = recorder._files['landmarks']
+    recorder._files['landmarks'] = open(landmarks_file.name, "rb")
+    landmarks_file.close()
+    for frame_id in range(2, 4):
+        recorder.append(np.zeros((TOTAL_LANDMARKS, 4)), [False] * 4, float(frame_id), frame_id)
+    executor.submit(lambda: None).result()
+    assert recorder.error.startswith("Writing a chunk failed")
+    assert recorder._files is None
+    recorder.close()
+    executor.shutdown(wait=True)
+    assert len(LandmarkRecording(directory)) == 2
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from landmark_protocol import FLAG_PREDICTED
+from mediapipe_webrtc_server import HolisticLandmarksTracker, HolisticResult, parse_landmark_query
+
+
+def make_result(value, hands=True):
+    return HolisticResult(
+        pose_landmarks=np.full((33, 4), value, dtype=np.float32),
+        left_hand_landmarks=np.full((21, 4), value, dtype=np.float32) if hands else None
+    )
+
+
+def fill(tracker, frames, start=0):
+    for frame_id in range(start, start + frames):
+        tracker.add_landmarks(make_result(frame_id, hands=frame_id % 2 == 0),
+                              quality_score=frame_id / 100, timestamp=10.0 + frame_id / 10)
+
+
+def test_window_wraps_around_oldest_first():
+    tracker = HolisticLandmarksTracker(history_size=4)
+    fill(tracker, 7)
+    assert len(tracker) == 4
+    window = tracker.get_window()
+    np.testing.assert_array_equal(window['frame_ids'], [3, 4, 5, 6])
+    np.testing.assert_allclose(window['timestamps'], [10.3, 10.4, 10.5, 10.6])
+    assert window['landmarks'][0, 468, 0] == 3      # First pose row
+    assert list(window['presence'][:, 2]) == [False, True, False, True]
+    assert not window['presence'][:, 0].any()       # No face
+    assert (window['landmarks'][0, :468] == 0).all()
+    np.testing.assert_array_equal(tracker.get_window(2)['frame_ids'], [5, 6])
+
+
+def test_window_is_a_view():
+    tracker = HolisticLandmarksTracker(history_size=4)
+    fill(tracker, 5)
+    window = tracker.get_window()
+    assert np.shares_memory(window['landmarks'], tracker._landmarks)
+
+
+def test_partial_history_and_empty_results():
+    tracker = HolisticLandmarksTracker(history_size=8)
+    assert len(tracker.get_window()['frame_ids']) == 0
+    fill(tracker, 3)
+    assert tracker.add_landmarks(None) is None
+    np.testing.assert_array_equal(tracker.get_window(10)['frame_ids'], [0, 1, 2])
+    frames = tracker.get_recent_frames(2)
+    assert [frame[0] for frame in frames] == [1, 2]
+    assert frames[0][3][2] is None and frames[1][3][2] is not None
+
+
+def test_predict_extrapolates_from_inferred_frames():
+    tracker = HolisticLandmarksTracker(history_size=8)
+    assert tracker.predict_landmarks(1.0) is None
+    tracker.add_landmarks(make_result(0.2), timestamp=1.0)
+    tracker.add_landmarks(make_result(0.3), timestamp=1.1)
+    # Predicted frames do not feed later predictions
+    tracker.add_landmarks(make_result(0.9), timestamp=1.15, flags=FLAG_PREDICTED)
+    predicted = tracker.predict_landmarks(1.15)
+    np.testing.assert_allclose(predicted.pose_landmarks[:, :3], 0.35, atol=1e-6)
+    np.testing.assert_allclose(predicted.pose_landmarks[:, 3], 0.3)    # Visibility is held
+    assert predicted.face_landmarks is None
+
+
+def test_predict_caps_extrapolation_and_holds_new_components():
+    tracker = HolisticLandmarksTracker(history_size=8)
+    tracker.add_landmarks(make_result(0.2, hands=False), timestamp=1.0)
+    tracker.add_landmarks(make_result(0.3), timestamp=1.1)
+    predicted = tracker.predict_landmarks(5.0, max_extrapolation=1.0)
+    np.testing.assert_allclose(predicted.pose_landmarks[:, :3], 0.4, atol=1e-6)
+    np.testing.assert_allclose(predicted.left_hand_landmarks, 0.3)
+
+
+def test_select_by_frame_and_time():
+    tracker = HolisticLandmarksTracker(history_size=8)
+    fill(tracker, 12)
+    np.testing.assert_array_equal(tracker.select(first_frame_id=6, last_frame_id=8)['frame_ids'], [6, 7, 8])
+    np.testing.assert_array_equal(tracker.select(start_time=10.95)['frame_ids'], [10, 11])
+    np.testing.assert_array_equal(tracker.select(first_frame_id=5, end_time=10.65)['frame_ids'], [5, 6])
+    assert len(tracker.select(first_frame_id=1, last_frame_id=3)['frame_ids']) == 0  # Evicted
+    assert len(tracker.select(first_frame_id=9, last_frame_id=7)['frame_ids']) == 0
+
+
+def test_select_window_frames_filters_components():
+    tracker = HolisticLandmarksTracker(history_size=8)
+    fill(tracker, 6)
+    frames = tracker.window_frames(tracker.select(first_frame_id=2), components=("hands",), step=2)
+    assert [frame[0] for frame in frames] == [2, 4]
+    face, pose, left_hand, _ = frames[0][3]
+    assert face is None and pose is None and left_hand[0, 0] == 2
+
+
+def test_parse_landmark_query():
+    query = parse_landmark_query({'from_frame': "3", 'last_seconds': "2.5", 'components': "pose,hands"})
+    assert query['from_frame'] == 3 and query['last_seconds'] == 2.5 and query['to_frame'] is None
+    assert query['components'] == ("pose", "hands")
+    with pytest.raises(ValueError):
+        parse_landmark_query({'step': 0})
+    with pytest.raises(ValueError):
+        parse_landmark_query({'from_frame': "soon"})
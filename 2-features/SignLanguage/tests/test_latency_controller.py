@@ -0,0 +1,50 @@
+import pytest
+
+from mediapipe_webrtc_server import LatencyBudgetController
+
+
+def run_controller(controller, p90_latency, output_fps, periods, input_fps=None):
+    for second in range(periods):
+        controller.update(p90_latency, output_fps, now=controller._last_change + 10 + second, input_fps=input_fps)
+
+
+def test_controller_downgrades_over_budget():
+    controller = LatencyBudgetController(latency_budget_ms=150, target_fps=15)
+    level = controller.level
+    decision = controller.update(0.3, 20, now=100)
+    assert decision is None
+    decision = controller.update(0.3, 20, now=101)
+    assert decision['reason'] == "latency_over_budget"
+    assert controller.level == level + 1
+
+
+def test_controller_upgrades_when_comfortable():
+    controller = LatencyBudgetController(latency_budget_ms=150, target_fps=15)
+    level = controller.level
+    run_controller(controller, 0.03, 14.9, 5)
+    assert controller.level == level - 1
+
+
+def test_controller_respects_cooldown():
+    controller = LatencyBudgetController(latency_budget_ms=150, target_fps=15)
+    controller.update(0.3, 20, now=100)
+    controller.update(0.3, 20, now=101)
+    level = controller.level
+    controller.update(0.3, 20, now=102)
+    controller.update(0.3, 20, now=103)
+    assert controller.level == level
+
+
+@pytest.mark.parametrize("camera_fps", [10.0, 12.0, 14.9])
+def test_controller_target_follows_slow_camera(camera_fps):
+    controller = LatencyBudgetController(latency_budget_ms=150, target_fps=15)
+    level = controller.level
+    run_controller(controller, 0.03, camera_fps * 0.99, 5, input_fps=camera_fps)
+    assert controller.level < level
+
+
+def test_controller_downgrades_when_frames_fall_behind_camera():
+    controller = LatencyBudgetController(latency_budget_ms=150, target_fps=15)
+    level = controller.level
+    run_controller(controller, 0.03, 6.0, 2, input_fps=30.0)
+    assert controller.level == level + 1
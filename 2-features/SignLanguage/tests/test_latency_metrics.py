@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from latency_metrics import QuantileSketch, StageTimings, render_prometheus
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    values = np.random.default_rng(0).lognormal(-4, 1, 5000)
+    sketch = QuantileSketch(relative_accuracy=0.02)
+    for value in values:
+        sketch.add(value)
+    for q in (0.5, 0.9, 0.99):
+        assert sketch.quantile(q) == pytest.approx(np.quantile(values, q), rel=0.05)
+
+
+def test_sketch_merge_matches_single_sketch():
+    values = np.random.default_rng(1).uniform(0.001, 0.1, 2000)
+    whole, first, second = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for i, value in enumerate(values):
+        whole.add(value)
+        (first if i % 2 else second).add(value)
+    first.merge(second)
+    assert first.quantile(0.9) == whole.quantile(0.9)
+
+
+def test_stage_timings_snapshot_and_prometheus():
+    timings = StageTimings()
+    for _ in range(10):
+        timings.record_many({'inference': 0.02, 'color': 0.003}, now=100.0)
+    assert timings.stages()[:2] == ['color', 'inference']
+    snapshot = timings.snapshot()
+    assert set(snapshot) == {'color', 'inference'}
+    text = render_prometheus(
+        summaries=[("holistic_stage_seconds", "Stage time", "stage", timings)],
+        gauges=[("holistic_sessions", "Sessions", 2)],
+        counters=[("holistic_frames_total", "Frames", 10)]
+    )
+    assert 'holistic_stage_seconds_count{stage="inference"} 10' in text
+    assert "holistic_sessions 2" in text
+    assert "# TYPE holistic_frames_total counter" in text
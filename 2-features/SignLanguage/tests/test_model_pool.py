@@ -0,0 +1,39 @@
+import threading
+
+import pytest
+
+import mediapipe_webrtc_server as server
+
+
+@pytest.fixture
+def warmed(monkeypatch):
+    """Lane threads that were asked to warm their pool, without building MediaPipe graphs"""
+    lanes = []
+    monkeypatch.setattr(server, "_warm_model_pool", lambda count: lanes.append(threading.current_thread().name))
+    return lanes
+
+
+@pytest.mark.parametrize("max_sessions, warm_workers, expected", [
+    (2, 0, 2),      # One warm worker per session slot
+    (8, 0, 4),      # Capped at the workers
+    (0, 0, 1),      # No session limit: just the first worker
+    (2, 4, 4),      # Warming more is explicit
+])
+@pytest.mark.filterwarnings("ignore::aiohttp.web.NotAppKeyWarning")
+def test_create_app_warms_one_worker_per_session_slot(warmed, max_sessions, warm_workers, expected):
+    app = server.create_app(inference_workers=4, max_sessions=max_sessions, model_pool_size=1,
+                            warm_workers=warm_workers)
+    executor = app["inference_executor"]
+    for lane in executor._lanes:
+        lane.submit(lambda: None).result()
+    executor.shutdown()
+    assert executor.warm_workers == expected
+    assert sorted(warmed) == [f"holistic-worker-{i}_0" for i in range(expected)]
+
+
+def test_executor_without_pool_warms_nothing(warmed):
+    executor = server.InferenceExecutor("thread", workers=2, model_pool_size=0)
+    for lane in executor._lanes:
+        lane.submit(lambda: None).result()
+    executor.shutdown()
+    assert warmed == []
@@ -0,0 +1,57 @@
+import asyncio
+
+from mediapipe_webrtc_server import SessionScheduler
+
+
+def test_scheduler_admits_queued_offer_when_capacity_grows():
+    async def scenario():
+        scheduler = SessionScheduler(workers=1, queue_timeout=2.0)
+        scheduler.frame_cost = 0.05
+        assert scheduler.session_limit() == 1
+        assert await scheduler.admit("a")
+        waiting = asyncio.ensure_future(scheduler.admit("b"))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        for _ in range(60):
+            scheduler.record_frame_cost(0.02)
+        assert scheduler.session_limit() > 1
+        return await asyncio.wait_for(waiting, 1.0)
+
+    assert asyncio.run(scenario())
+
+
+def test_scheduler_release_and_rejection():
+    async def scenario():
+        scheduler = SessionScheduler(workers=1, max_sessions=1, queue_size=1, queue_timeout=0.2)
+        assert await scheduler.admit("a")
+        waiting = asyncio.ensure_future(scheduler.admit("b"))
+        await asyncio.sleep(0.05)
+        assert not await scheduler.admit("c")      # Queue full
+        await scheduler.release("a")
+        assert await waiting
+        assert not await scheduler.admit("d")      # Times out
+        return scheduler.rejected
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_scheduler_cold_limit_allows_several_sessions():
+    assert SessionScheduler(workers=1).session_limit() >= 2
+
+
+def test_scheduler_queues_on_loops_started_after_construction():
+    # Built before the serving loop exists, like create_app does before web.run_app
+    scheduler = SessionScheduler(workers=1, max_sessions=1, queue_timeout=0.1)
+
+    async def scenario(key):
+        assert await scheduler.admit(key)
+        waiting = asyncio.ensure_future(scheduler.admit("next"))
+        await asyncio.sleep(0.01)
+        await scheduler.release(key)
+        assert await waiting
+        assert not await scheduler.admit("late")      # Queued, then times out
+        await scheduler.release("next")
+
+    asyncio.run(scenario("a"))
+    asyncio.run(scenario("b"))
+    assert scheduler.rejected == 2
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+
+import numpy as np
+import pytest
+
+from landmark_protocol import COMPONENT_SLICES, TOTAL_LANDMARKS
+from mediapipe_webrtc_server import HolisticLandmarksTracker, HolisticResult
+from sign_recognition import (
+    FEATURES_PER_FRAME, POSE_FEATURES, RecognitionBatcher, SessionRecognizer, build_features,
+    load_backend, save_numpy_model
+)
+
+
+class FixedBackend:
+    """Returns the same probabilities for every window and remembers the batch sizes"""
+
+    labels = ["_background", "hello", "thanks"]
+    window = 4
+
+    def __init__(self, probabilities=(0.15, 0.8, 0.05), error=None):
+        self.probabilities = np.array(probabilities, dtype=np.float32)
+        self.error = error
+        self.batch_sizes = []
+
+    def predict(self, batch):
+        if self.error is not None:
+            raise self.error
+        self.batch_sizes.append(len(batch))
+        return np.tile(self.probabilities, (len(batch), 1))
+
+
+def test_features_are_body_relative_and_padded():
+    landmarks = np.zeros((2, TOTAL_LANDMARKS, 4), dtype=np.float32)
+    pose = landmarks[:, COMPONENT_SLICES['pose_landmarks']]
+    pose[:, 11, :2] = (0.6, 0.5)     # Shoulders 0.2 apart around (0.5, 0.5)
+    pose[:, 12, :2] = (0.4, 0.5)
+    pose[:, 0, :2] = (0.5, 0.3)      # Nose
+    presence = np.array([[False, True, False, False]] * 2)
+    features = build_features({'landmarks': landmarks, 'presence': presence}, 3)
+    assert features.shape == (3, FEATURES_PER_FRAME)
+    assert not features[0].any()
+    np.testing.assert_allclose(features[1, :3], (0.0, -1.0, 0.0), atol=1e-6)
+    np.testing.assert_array_equal(features[2, -3:], (1, 0, 0))
+    assert not features[2, POSE_FEATURES:-3].any()    # No hands
+
+
+def test_numpy_model_round_trip(tmp_path):
+    rng = np.random.default_rng(0)
+    path = str(tmp_path / "model.npz")
+    save_numpy_model(path, [(rng.normal(size=(2 * FEATURES_PER_FRAME, 8)), np.zeros(8)),
+                            (rng.normal(size=(8, 3)), np.zeros(3))], ["a", "b", "c"], window=2)
+    backend = load_backend(path)
+    assert backend.labels == ["a", "b", "c"] and backend.window == 2
+    probabilities = backend.predict(rng.normal(size=(5, 2, FEATURES_PER_FRAME)).astype(np.float32))
+    assert probabilities.shape == (5, 3)
+    np.testing.assert_allclose(probabilities.sum(axis=1), 1.0, rtol=1e-5)
+    with pytest.raises(ValueError):
+        load_backend(str(tmp_path / "model.pt"))
+
+
+def test_batcher_fills_batches_across_requests():
+    async def scenario():
+        backend = FixedBackend()
+        batcher = RecognitionBatcher(backend, max_batch=2, deadline=0.05)
+        features = np.zeros((4, FEATURES_PER_FRAME), dtype=np.float32)
+        results = await asyncio.gather(*(batcher.classify(features) for _ in range(3)))
+        batcher.shutdown()
+        return backend.batch_sizes, results, batcher.get_status()
+
+    batch_sizes, results, status = asyncio.run(scenario())
+    # Two requests fill a batch at once; the third goes when the deadline passes
+    assert batch_sizes == [2, 1]
+    assert all(row[1] == pytest.approx(0.8) for row in results)
+    assert status['requests'] == 3 and status['batches'] == 2 and status['largest_batch'] == 2
+
+
+def test_batcher_fails_every_request_of_a_failed_batch():
+    async def scenario():
+        batcher = RecognitionBatcher(FixedBackend(error=RuntimeError("bad model")), deadline=0.01)
+        features = np.zeros((4, FEATURES_PER_FRAME), dtype=np.float32)
+        results = await asyncio.gather(batcher.classify(features), batcher.classify(features),
+                                       return_exceptions=True)
+        batcher.shutdown()
+        return results, batcher.failed_batches
+
+    results, failed_batches = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert failed_batches == 1
+
+
+def run_session(backend, frames, stride=2):
+    async def scenario():
+        batcher = RecognitionBatcher(backend, deadline=0.001)
+        recognizer = SessionRecognizer(batcher, stride=stride, hold=60)
+        tracker = HolisticLandmarksTracker(history_size=8)
+        sent = []
+        for frame_id in range(frames):
+            tracker.add_landmarks(HolisticResult(pose_landmarks=np.zeros((33, 4), dtype=np.float32)))
+            recognizer.on_frame(tracker, frame_id, sent.append)
+            await asyncio.sleep(0.02)
+        batcher.shutdown()
+        return recognizer, sent
+
+    return asyncio.run(scenario())
+
+
+def test_session_reports_glosses_once_per_hold():
+    recognizer, sent = run_session(FixedBackend(), 8)
+    assert len(sent) == 1
+    assert sent[0]['gloss'] == "hello" and sent[0]['confidence'] == pytest.approx(0.8)
+    assert [alternative['gloss'] for alternative in sent[0]['alternatives']] == ["_background", "thanks"]
+    _, sent = run_session(FixedBackend(probabilities=(0.9, 0.05, 0.05)), 8)
+    assert sent == []
+
+
+def test_session_logs_the_first_failure_and_counts_the_rest(caplog):
+    with caplog.at_level(logging.ERROR, logger="HolisticSignRecognition"):
+        recognizer, sent = run_session(FixedBackend(error=RuntimeError("bad model")), 8)
+    assert sent == []
+    assert recognizer.failures == 4
+    assert len(caplog.records) == 1
+    assert "bad model" in caplog.text